@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class PhotosstoreConfig(AppConfig):
     name = 'PhotosStore'
+
+    def ready(self):
+        # Registers the signal handlers that keep cached principals and
+        # cached responses in sync with the database, the search triggers
+        # in place after migrations, and the files of cascaded deletes
+        # tombstoned
+        from .helpers import principalCacheHelper, httpCacheHelper, searchHelper, deletionHelper
@@ -2,8 +2,149 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from ..models.album import Album
 from ..models.photo import Photo
+from ..models.photoDerivative import PhotoDerivative
+from ..helpers.serializerHelper import mediaUrl, srcsetsFromRows, serializeImageSummary
+from ..helpers.httpCacheHelper import versionedResponse, albumVersionKey, FEED_VERSION_KEY
+from ..helpers.paginationHelper import encodeCursor, afterCursor, parseLimit
+
+ALBUM_PHOTOS_DEFAULT_LIMIT = 60
+ALBUM_PHOTOS_MAX_LIMIT = 200
+ALBUMS_DEFAULT_LIMIT = 24
+ALBUMS_MAX_LIMIT = 100
+
+# Album details are built from projected rows (values()), never from model
+# instances; these are the only columns they read.
+ALBUM_FIELDS = ("id", "title", "description", "created_at", "user__username")
+ALBUM_PHOTO_FIELDS = (
+  "id", "title", "description", "capture_date", "compressed_image", "original_image", "created_at",
+  "width", "height", "original_size", "compressed_size", "dominant_color", "placeholder"
+)
+DERIVATIVE_FIELDS = ("photo_id", "format", "width", "image")
+ALBUM_LISTING_FIELDS = (
+  "id", "title", "description", "created_at", "updated_at", "photo_count",
+  "user_id", "user__username", "cover_photo_id", "cover_photo__compressed_image"
+)
+COVER_DERIVATIVE = "thumbnail"
+
+def albumQuerySet(album_id: int):
+  return Album.objects.filter(id=album_id).values(*ALBUM_FIELDS)
+
+def albumPhotosQuerySet(album_id: int):
+  return Photo.objects.filter(
+    album_id=album_id,
+    status=Photo.STATUS_READY
+  ).order_by('-created_at', '-id').values(*ALBUM_PHOTO_FIELDS)
+
+def albumsQuerySet(user_id: int = None):
+  # Counts and covers are read from the denormalized columns kept by
+  # albumStatsHelper, so listing never aggregates over photos.
+  albums = Album.objects.order_by('-created_at', '-id')
+  if user_id is not None:
+    albums = albums.filter(user_id=user_id)
+  return albums.values(*ALBUM_LISTING_FIELDS)
+
+def derivativesQuerySet(**filters):
+  # srcsetsFromRows sorts by width itself, so the model ordering is dropped
+  return PhotoDerivative.objects.filter(**filters).order_by().values(*DERIVATIVE_FIELDS)
+
+def serializeAlbum(album: dict) -> dict:
+  return {
+    "id": album["id"],
+    "title": album["title"],
+    "description": album["description"],
+    "uploader": album["user__username"],
+    "created_at": album["created_at"].strftime("%Y-%m-%d")
+  }
+
+def serializeAlbumPhoto(photo: dict, srcsets: dict) -> dict:
+  return {
+    "id": photo["id"],
+    "title": photo["title"],
+    "description": photo["description"],
+    "capture_date": photo["capture_date"].strftime("%Y-%m-%d"),
+    "image": mediaUrl(photo["compressed_image"]),
+    "original_image": mediaUrl(photo["original_image"]),
+    "srcset": srcsets.get(photo["id"], {}),
+    **serializeImageSummary(photo)
+  }
+
+def serializeAlbumListing(album: dict, cover_rows: list) -> dict:
+  cover_rows = [row for row in cover_rows if row["photo_id"] == album["cover_photo_id"]]
+  cover_jpeg = next((row["image"] for row in cover_rows if row["format"] == "jpeg"), None)
+
+  return {
+    "id": album["id"],
+    "title": album["title"],
+    "description": album["description"],
+    "created_at": album["created_at"].strftime("%Y-%m-%d"),
+    "updated_at": album["updated_at"].isoformat(),
+    "photo_count": album["photo_count"],
+    "user": {
+      "id": album["user_id"],
+      "username": album["user__username"]
+    },
+    "cover": {
+      "photo_id": album["cover_photo_id"],
+      "image": mediaUrl(cover_jpeg or album["cover_photo__compressed_image"]),
+      "srcset": srcsetsFromRows(cover_rows).get(album["cover_photo_id"], {})
+    } if album["cover_photo_id"] else None
+  }
+
+def albumDetailsResponse(album: dict, photos: list, srcsets: dict) -> JsonResponse:
+  """
+  Builds the full album details response, which repeats the uploader and album in every photo.
+
+  Args:
+    album (dict): Row from albumQuerySet
+    photos (list): Rows from albumPhotosQuerySet
+    srcsets (dict): Photo id -> srcset, from srcsetsFromRows
+
+  Returns:
+    JsonResponse: The album and all its photos
+  """
+  album_summary = {
+    "id": album["id"],
+    "title": album["title"]
+  }
+
+  return JsonResponse({
+    "success": True,
+    "album": serializeAlbum(album),
+    "photos": [
+      {
+        **serializeAlbumPhoto(photo, srcsets),
+        "uploader": album["user__username"],
+        "album": album_summary
+      }
+      for photo in photos
+    ]
+  })
+
+def albumPageResponse(album: dict, page: list, srcsets: dict, limit: int) -> JsonResponse:
+  """
+  Builds one page of album photos in the compact shape, with the album (and uploader) given once.
+
+  Args:
+    album (dict): Row from albumQuerySet
+    page (list): Up to limit + 1 rows from albumPhotosQuerySet
+    srcsets (dict): Photo id -> srcset, from srcsetsFromRows
+    limit (int): Page size
+
+  Returns:
+    JsonResponse: The album, the page of photos and the next cursor
+  """
+  has_more = len(page) > limit
+  page = page[:limit]
+
+  return JsonResponse({
+    "success": True,
+    "album": serializeAlbum(album),
+    "photos": [serializeAlbumPhoto(photo, srcsets) for photo in page],
+    "next_cursor": encodeCursor(page[-1]["created_at"], page[-1]["id"]) if has_more else None
+  })
 
 @csrf_exempt
+@versionedResponse(lambda request, album_id: [albumVersionKey(album_id)])
 def getAlbumDetails(request, album_id):
   try:
     if request.method != "GET":
@@ -12,43 +153,127 @@ def getAlbumDetails(request, album_id):
         "error": "Method not allowed"
       }, status=405)
 
-    album = Album.objects.select_related('user').get(id=album_id)
-
-    photos = Photo.objects.filter(album=album).all()
-    photo_list = []
-    
-    for photo in photos:
-      photo_list.append({
-        "id": photo.id,
-        "title": photo.title,
-        "description": photo.description,
-        "capture_date": photo.capture_date.strftime("%Y-%m-%d"),
-        "image": photo.compressed_image.url if photo.compressed_image else None,
-        "original_image": photo.original_image.url if photo.original_image else None,
-        "uploader": album.user.username,
-        "album": {
-          "id": album.id,
-          "title": album.title
-        }
-      })
+    album = albumQuerySet(album_id).get()
+
+    cursor = request.GET.get("cursor")
+    limit = request.GET.get("limit")
 
+    # Without paging parameters the full album is returned in the original
+    # shape; clients passing limit/cursor get compact pages.
+    if cursor is None and limit is None:
+      photos = list(albumPhotosQuerySet(album_id))
+      srcsets = srcsetsFromRows(derivativesQuerySet(photo__album_id=album_id, photo__status=Photo.STATUS_READY))
+      return albumDetailsResponse(album, photos, srcsets)
+
+    limit = parseLimit(limit, ALBUM_PHOTOS_DEFAULT_LIMIT, ALBUM_PHOTOS_MAX_LIMIT)
+    page = list(afterCursor(albumPhotosQuerySet(album_id), cursor)[:limit + 1])
+    srcsets = srcsetsFromRows(derivativesQuerySet(photo_id__in=[photo["id"] for photo in page[:limit]]))
+
+    return albumPageResponse(album, page, srcsets, limit)
+
+  except Album.DoesNotExist:
     return JsonResponse({
-      "success": True,
-      "album": {
-        "id": album.id,
-        "title": album.title,
-        "description": album.description,
-        "uploader": album.user.username,
-        "created_at": album.created_at.strftime("%Y-%m-%d")
-      },
-      "photos": photo_list
-    })
+      "success": False,
+      "error": "Album not found"
+    }, status=404)
+  except ValueError as e:
+    return JsonResponse({
+      "success": False,
+      "error": str(e)
+    }, status=400)
+  except Exception as e:
+    return JsonResponse({
+      "success": False,
+      "error": f"An error occurred: {str(e)}"
+    }, status=500)
+
+@csrf_exempt
+@versionedResponse(lambda request, album_id: [albumVersionKey(album_id)])
+async def getAlbumDetailsAsync(request, album_id):
+  try:
+    if request.method != "GET":
+      return JsonResponse({
+        "success": False,
+        "error": "Method not allowed"
+      }, status=405)
+
+    album = await albumQuerySet(album_id).aget()
+
+    cursor = request.GET.get("cursor")
+    limit = request.GET.get("limit")
+
+    if cursor is None and limit is None:
+      photos = [photo async for photo in albumPhotosQuerySet(album_id)]
+      srcsets = srcsetsFromRows([
+        row async for row in derivativesQuerySet(photo__album_id=album_id, photo__status=Photo.STATUS_READY)
+      ])
+      return albumDetailsResponse(album, photos, srcsets)
+
+    limit = parseLimit(limit, ALBUM_PHOTOS_DEFAULT_LIMIT, ALBUM_PHOTOS_MAX_LIMIT)
+    page = [photo async for photo in afterCursor(albumPhotosQuerySet(album_id), cursor)[:limit + 1]]
+    srcsets = srcsetsFromRows([
+      row async for row in derivativesQuerySet(photo_id__in=[photo["id"] for photo in page[:limit]])
+    ])
+
+    return albumPageResponse(album, page, srcsets, limit)
 
   except Album.DoesNotExist:
     return JsonResponse({
       "success": False,
       "error": "Album not found"
     }, status=404)
+  except ValueError as e:
+    return JsonResponse({
+      "success": False,
+      "error": str(e)
+    }, status=400)
+  except Exception as e:
+    return JsonResponse({
+      "success": False,
+      "error": f"An error occurred: {str(e)}"
+    }, status=500)
+
+@csrf_exempt
+@versionedResponse(lambda request: [FEED_VERSION_KEY])
+def getAlbums(request):
+  try:
+    if request.method != "GET":
+      return JsonResponse({
+        "success": False,
+        "error": "Method not allowed"
+      }, status=405)
+
+    user_id = request.GET.get("user_id")
+    if user_id not in (None, ""):
+      if not user_id.isdigit():
+        raise ValueError("user_id must be a positive integer")
+      user_id = int(user_id)
+    else:
+      user_id = None
+
+    limit = parseLimit(request.GET.get("limit"), ALBUMS_DEFAULT_LIMIT, ALBUMS_MAX_LIMIT)
+    page = list(afterCursor(albumsQuerySet(user_id), request.GET.get("cursor"))[:limit + 1])
+
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    # One query for the thumbnails of every cover on the page
+    cover_rows = list(derivativesQuerySet(
+      photo_id__in=[album["cover_photo_id"] for album in page if album["cover_photo_id"]],
+      name=COVER_DERIVATIVE
+    ))
+
+    return JsonResponse({
+      "success": True,
+      "albums": [serializeAlbumListing(album, cover_rows) for album in page],
+      "next_cursor": encodeCursor(page[-1]["created_at"], page[-1]["id"]) if has_more else None
+    })
+
+  except ValueError as e:
+    return JsonResponse({
+      "success": False,
+      "error": str(e)
+    }, status=400)
   except Exception as e:
     return JsonResponse({
       "success": False,
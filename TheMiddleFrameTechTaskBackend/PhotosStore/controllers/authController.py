@@ -1,11 +1,45 @@
 import json
+import math
 
+from django.db import IntegrityError
 from django.http import JsonResponse
-from django.contrib.auth.hashers import make_password, check_password
 from django.views.decorators.csrf import csrf_exempt
 from ..helpers import jsonWebTokenHelper
+from ..helpers.passwordHelper import checkPassword, acheckPassword, hashPassword, PasswordHashingBusy
+from ..helpers.throttleHelper import throttleIp, throttleAccount, athrottleIp, athrottleAccount
 from ..models.user import User
 
+def loginResponse(user_object: User) -> JsonResponse:
+  token = jsonWebTokenHelper.encode({
+    "id": user_object.id
+  })
+  
+  return JsonResponse({
+    "success": True,
+    "token": token,
+    "user": {
+      "id": user_object.id,
+      "username": user_object.username,
+      "email": user_object.email,
+      "role": user_object.role
+    }
+  }, status=200)
+
+def retryLaterResponse(error: str, status: int, retry_after: float) -> JsonResponse:
+  response = JsonResponse({
+    "success": False,
+    "error": error
+  }, status=status)
+  response["Retry-After"] = str(max(1, math.ceil(retry_after)))
+
+  return response
+
+def throttledResponse(retry_after: float) -> JsonResponse:
+  return retryLaterResponse("Too many attempts, please retry later", 429, retry_after)
+
+def hashingBusyResponse(error: PasswordHashingBusy) -> JsonResponse:
+  return retryLaterResponse(str(error), 503, error.retry_after)
+
 @csrf_exempt
 def login(request):
   try:
@@ -26,34 +60,80 @@ def login(request):
         "error": "Email and password are required"
       }, status=400)
 
+    # Checked before any lookup or hashing, so refused attempts cost nothing
+    retry_after = throttleIp(request) or throttleAccount(str(email))
+    if retry_after:
+      return throttledResponse(retry_after)
+
     user_object = User.objects.get(email=email)
 
-    if not check_password(password, user_object.password):
+    if not checkPassword(password, user_object):
       return JsonResponse({
         "success": False,
         "error": "Invalid email or password"
       }, status=401)
     
-    token = jsonWebTokenHelper.encode({
-      "id": user_object.id
-    })
-    
+    return loginResponse(user_object)
+
+  except User.DoesNotExist:
     return JsonResponse({
-      "success": True,
-      "token": token,
-      "user": {
-        "id": user_object.id,
-        "username": user_object.username,
-        "email": user_object.email,
-        "role": user_object.role
-      }
-    }, status=200)
+      "success": False,
+      "error": "Invalid email or password"
+    }, status=401)
+  except PasswordHashingBusy as e:
+    return hashingBusyResponse(e)
+  except Exception as e:
+    return JsonResponse({
+      "success": False,
+      "error": f"An error occurred: {str(e)}"
+    }, status=500)
+
+@csrf_exempt
+async def loginAsync(request):
+  try:
+    if request.method != "POST":
+      return JsonResponse({
+        "success": False,
+        "error": "Method not allowed"
+      }, status=405)
+
+    request_body = json.loads(request.body)
+
+    email = request_body.get("email")
+    password = request_body.get("password")
+
+    if not email or not password:
+      return JsonResponse({
+        "success": False,
+        "error": "Email and password are required"
+      }, status=400)
+
+    # Checked before any lookup or hashing, so refused attempts cost nothing
+    retry_after = await athrottleIp(request) or await athrottleAccount(str(email))
+    if retry_after:
+      return throttledResponse(retry_after)
+
+    user_object = await User.objects.aget(email=email)
+
+    # Password hashing is deliberately slow; it runs on the bounded hashing
+    # pool (hashlib releases the GIL) so the event loop keeps serving others.
+    password_valid = await acheckPassword(password, user_object)
+
+    if not password_valid:
+      return JsonResponse({
+        "success": False,
+        "error": "Invalid email or password"
+      }, status=401)
+    
+    return loginResponse(user_object)
 
   except User.DoesNotExist:
     return JsonResponse({
       "success": False,
       "error": "Invalid email or password"
     }, status=401)
+  except PasswordHashingBusy as e:
+    return hashingBusyResponse(e)
   except Exception as e:
     return JsonResponse({
       "success": False,
@@ -88,6 +168,10 @@ def register(request):
         "success": False,
         "error": "Role must be either 'uploader' or 'buyer'"
       }, status=400)
+
+    retry_after = throttleIp(request)
+    if retry_after:
+      return throttledResponse(retry_after)
     
     if User.objects.filter(email=email).exists():
       return JsonResponse({
@@ -104,7 +188,7 @@ def register(request):
     new_user_object = User.objects.create(
       username=username,
       email=email,
-      password=make_password(password),
+      password=hashPassword(password),
       role=role
     )
 
@@ -123,6 +207,13 @@ def register(request):
       }
     }, status=201)
 
+  except IntegrityError:
+    return JsonResponse({
+      "success": False,
+      "error": "User with this email or username already exists"
+    }, status=409)
+  except PasswordHashingBusy as e:
+    return hashingBusyResponse(e)
   except Exception as e:
     return JsonResponse({
       "success": False,
@@ -0,0 +1,161 @@
+import os
+import mimetypes
+
+from urllib.parse import quote
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.csrf import csrf_exempt
+from ..helpers.mediaHelper import mediaCacheControl, parseRange, FileRange, aiterFile
+from ..storages.objectStorage import ObjectStorage
+
+MEDIA_BLOCK_SIZE = 64 * 1024
+
+def offloadResponse(path: str, full_path: str, content_type: str) -> HttpResponse:
+  """
+  Builds an empty response telling the web server in front to send the file itself.
+
+  Args:
+    path (str): Path of the file below MEDIA_URL
+    full_path (str): Path of the file on disk
+    content_type (str): Content type of the file
+
+  Returns:
+    HttpResponse: Response carrying X-Accel-Redirect or X-Sendfile, or None without offload
+  """
+  if settings.MEDIA_OFFLOAD == "x-accel-redirect":
+    response = HttpResponse(content_type=content_type)
+    response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(path)
+    return response
+
+  if settings.MEDIA_OFFLOAD == "x-sendfile":
+    response = HttpResponse(content_type=content_type)
+    response["X-Sendfile"] = full_path
+    return response
+
+  return None
+
+def mediaStat(path: str):
+  """
+  Looks up a media file, on disk or in the configured storage.
+
+  Args:
+    path (str): Path of the file below MEDIA_URL
+
+  Returns:
+    tuple: (path on disk or None, size, modification time in ns), or None if there is no such file
+  """
+  if not isinstance(default_storage, ObjectStorage):
+    try:
+      full_path = safe_join(settings.MEDIA_ROOT, path)
+      stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+      return None
+
+    return (full_path, stat.st_size, stat.st_mtime_ns) if os.path.isfile(full_path) else None
+
+  try:
+    stat = default_storage.stat(path)
+  except (SuspiciousFileOperation, FileNotFoundError):
+    return None
+
+  return None, stat["size"], int(stat["modified"] * 1e9)
+
+def requestedRange(request, size: int, etag: str, last_modified: float):
+  """
+  Returns the byte range to send, honouring If-Range.
+
+  Args:
+    request (HttpRequest): The request
+    size (int): Size of the file
+    etag (str): Current ETag of the file
+    last_modified (float): Modification time of the file
+
+  Returns:
+    tuple: (start, length), or None for the whole file
+
+  Raises:
+    ValueError: If the range cannot be satisfied
+  """
+  if_range = request.headers.get("If-Range")
+  if if_range and if_range != etag and parse_http_date_safe(if_range) != int(last_modified):
+    # The client's copy is outdated; it gets the whole new file
+    return None
+
+  return parseRange(request.headers.get("Range"), size)
+
+@csrf_exempt
+def serveMedia(request, path):
+  try:
+    if request.method not in ("GET", "HEAD"):
+      return JsonResponse({
+        "success": False,
+        "error": "Method not allowed"
+      }, status=405)
+
+    stat = mediaStat(path)
+    if stat is None:
+      return JsonResponse({
+        "success": False,
+        "error": "File not found"
+      }, status=404)
+
+    full_path, size, modified_ns = stat
+    modified = modified_ns / 1e9
+    etag = f'"{size:x}-{modified_ns:x}"'
+    headers = {
+      "Cache-Control": mediaCacheControl(path),
+      "ETag": etag,
+      "Last-Modified": http_date(modified),
+      "Accept-Ranges": "bytes",
+    }
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(modified))
+    if response is None and full_path:
+      response = offloadResponse(path, full_path, content_type)
+
+    if response is None:
+      try:
+        byte_range = requestedRange(request, size, etag, modified)
+      except ValueError:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+      start, length = byte_range or (0, size)
+      status = 206 if byte_range else 200
+
+      if request.method == "HEAD":
+        response = HttpResponse(content_type=content_type, status=status)
+        response["Content-Length"] = length
+      else:
+        # Object storage streams just the range instead of the whole object
+        file = FileRange(open(full_path, "rb"), start, length) if full_path else default_storage.openRange(path, start, length)
+        if isinstance(request, ASGIRequest):
+          response = StreamingHttpResponse(aiterFile(file, MEDIA_BLOCK_SIZE), content_type=content_type, status=status)
+          response["Content-Length"] = length
+        else:
+          # WSGI servers with a file_wrapper (gunicorn, uWSGI) sendfile() it
+          response = FileResponse(file, content_type=content_type, status=status)
+          response.block_size = MEDIA_BLOCK_SIZE
+          response["Content-Length"] = length
+
+      if byte_range:
+        response["Content-Range"] = f"bytes {start}-{start + length - 1}/{size}"
+
+    for header, value in headers.items():
+      response[header] = value
+
+    return response
+
+  except Exception as e:
+    return JsonResponse({
+      "success": False,
+      "error": f"An error occurred: {str(e)}"
+    }, status=500)
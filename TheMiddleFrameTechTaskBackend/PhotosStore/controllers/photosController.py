@@ -1,13 +1,69 @@
 import json
+import math
 
+from contextlib import nullcontext
 from datetime import datetime
-from django.http import JsonResponse
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from ..models.photo import Photo
 from ..models.album import Album
-from ..helpers.imageHelper import processImageForUpload, createInMemoryUploadedFile, base64ToImageFile
+from ..models.photoJob import PhotoJob
+from ..helpers.imageHelper import base64ToImageFile, readImageHeader, estimateDecodeBytes
+from ..helpers.decodeBudgetHelper import DecodeBudgetExhausted, decodeBudget, peakDecodeBytes
+from ..helpers.photoJobHelper import enqueuePhotoJob
+from ..helpers.blobHelper import hashFile, acquireBlob, shareProcessedFiles
+from ..helpers.deletionHelper import deletePhotos
+from ..helpers.serializerHelper import serializePhoto
+from ..helpers.threadPoolHelper import mapInThreads
+from ..helpers.httpCacheHelper import versionedResponse, bumpContentVersions, albumVersionKey, FEED_VERSION_KEY
+from ..helpers.paginationHelper import encodeCursor, afterCursor, parseLimit, streamJsonArray, astreamJsonArray
+
+FEED_DEFAULT_LIMIT = 50
+FEED_MAX_LIMIT = 200
+FEED_STREAM_CHUNK_SIZE = 500
+STATUS_MAX_IDS = 100
+DELETE_MAX_IDS = 1000
+JOB_ERROR_MESSAGE = "The photo could not be processed"
+RAW_UPLOAD_CHUNK_SIZE = 64 * 1024
+
+def feedQuerySet():
+  return Photo.objects.select_related('user', 'album').prefetch_related('derivatives').filter(
+    status=Photo.STATUS_READY
+  ).order_by('-created_at', '-id')
+
+def feedPageQuerySet(photos, cursor: str, limit: int):
+  """
+  Restricts the feed to the page after a cursor, plus one row to detect more pages.
+
+  Args:
+    photos (QuerySet): Feed queryset from feedQuerySet
+    cursor (str): Cursor of the previous page (may be None)
+    limit (int): Page size
+
+  Returns:
+    QuerySet: Up to limit + 1 photos
+
+  Raises:
+    ValueError: If the cursor is malformed
+  """
+  return afterCursor(photos, cursor)[:limit + 1]
+
+def feedPageResponse(page: list, limit: int) -> JsonResponse:
+  has_more = len(page) > limit
+  page = page[:limit]
+
+  return JsonResponse({
+    "success": True,
+    "photos": [serializePhoto(photo) for photo in page],
+    "next_cursor": encodeCursor(page[-1].created_at, page[-1].id) if has_more else None
+  })
 
 @csrf_exempt
+@versionedResponse(lambda request: [FEED_VERSION_KEY])
 def getPhotos(request):
   try:
     if request.method != "GET":
@@ -16,35 +72,252 @@ def getPhotos(request):
         "error": "Method not allowed"
       }, status=405)
 
-    photos = Photo.objects.select_related('user', 'album').all()
-    data = []
+    photos = feedQuerySet()
 
-    for photo in photos:
-      data.append({
-        "id": photo.id,
-        "title": photo.title,
-        "description": photo.description,
-        "capture_date": photo.capture_date.strftime("%Y-%m-%d"),
-        "image": photo.compressed_image.url if photo.compressed_image else None,
-        "original_image": photo.original_image.url if photo.original_image else None,
-        "user": {
-          "id": photo.user.id,
-          "username": photo.user.username
-        },
-        "album": {
-          "id": photo.album.id,
-          "title": photo.album.title
-        } if photo.album else None
-      })
+    cursor = request.GET.get("cursor")
+    limit = request.GET.get("limit")
+
+    # Without paging parameters the full feed is streamed row by row so
+    # memory stays flat no matter how large the catalog grows.
+    if cursor is None and limit is None:
+      return StreamingHttpResponse(
+        streamJsonArray(photos.iterator(chunk_size=FEED_STREAM_CHUNK_SIZE), serializePhoto),
+        content_type="application/json"
+      )
+
+    limit = parseLimit(limit, FEED_DEFAULT_LIMIT, FEED_MAX_LIMIT)
+    page = list(feedPageQuerySet(photos, cursor, limit))
+
+    return feedPageResponse(page, limit)
+
+  except ValueError as e:
+    return JsonResponse({
+      "success": False,
+      "error": str(e)
+    }, status=400)
+  except Exception as e:
+    return JsonResponse({
+      "success": False,
+      "error": f"An error occurred: {str(e)}"
+    }, status=500)
+
+@csrf_exempt
+@versionedResponse(lambda request: [FEED_VERSION_KEY])
+async def getPhotosAsync(request):
+  try:
+    if request.method != "GET":
+      return JsonResponse({
+        "success": False,
+        "error": "Method not allowed"
+      }, status=405)
+
+    photos = feedQuerySet()
+
+    cursor = request.GET.get("cursor")
+    limit = request.GET.get("limit")
+
+    if cursor is None and limit is None:
+      return StreamingHttpResponse(
+        astreamJsonArray(photos.aiterator(chunk_size=FEED_STREAM_CHUNK_SIZE), serializePhoto),
+        content_type="application/json"
+      )
+
+    limit = parseLimit(limit, FEED_DEFAULT_LIMIT, FEED_MAX_LIMIT)
+    page = [photo async for photo in feedPageQuerySet(photos, cursor, limit)]
 
-    return JsonResponse(data, safe=False)
+    return feedPageResponse(page, limit)
 
+  except ValueError as e:
+    return JsonResponse({
+      "success": False,
+      "error": str(e)
+    }, status=400)
   except Exception as e:
     return JsonResponse({
       "success": False,
       "error": f"An error occurred: {str(e)}"
     }, status=500)
 
+def parsePhotoMetadata(photo: dict) -> tuple:
+  """
+  Validates the metadata sent along with an uploaded photo.
+
+  Args:
+    photo (dict): Metadata with title, description and capture_date
+
+  Returns:
+    tuple: (title, description, capture_date)
+
+  Raises:
+    ValueError: If a field is missing or malformed
+  """
+  title = (photo.get("title") or "").strip()
+  description = (photo.get("description") or "").strip()
+  capture_date_str = (photo.get("capture_date") or "").strip()
+
+  if not title:
+    raise ValueError("Title is required")
+  if not description:
+    raise ValueError("Description is required")
+  if not capture_date_str:
+    raise ValueError("Capture date is required")
+
+  try:
+    capture_date = datetime.strptime(capture_date_str, "%Y-%m-%d").date()
+  except ValueError:
+    raise ValueError("Capture date must be in YYYY-MM-DD format")
+
+  return title, description, capture_date
+
+def prepareUploadedPhoto(photo_file, photo: dict) -> dict:
+  """
+  Validates the metadata and image header of an uploaded photo and hashes its original.
+
+  Nothing is written to the database or to storage, so the photos of a batch
+  are prepared concurrently.
+
+  Args:
+    photo_file: Django file holding the original image
+    photo (dict): Metadata with title, description and capture_date
+
+  Returns:
+    dict: The file, its SHA-256, dimensions, estimated decode memory and the validated metadata
+
+  Raises:
+    ValueError: If the metadata is invalid, or the file is not an image or has too many pixels
+  """
+  title, description, capture_date = parsePhotoMetadata(photo)
+  header = readImageHeader(photo_file)
+
+  return {
+    "file": photo_file,
+    "sha256": hashFile(photo_file),
+    "width": header["width"],
+    "height": header["height"],
+    "decode_bytes": estimateDecodeBytes(
+      header["width"],
+      header["height"],
+      header["format"],
+      max(settings.PHOTO_DERIVATIVE_WIDTHS.values())
+    ),
+    "title": title,
+    "description": description,
+    "capture_date": capture_date
+  }
+
+def storeUploadedPhotos(user, prepared_photos: list, album) -> list:
+  """
+  Stores the originals of prepared photos and queues their processing if needed.
+
+  Args:
+    user (User): Uploader
+    prepared_photos (list): Results of prepareUploadedPhoto
+    album (Album): Album the photos belong to (may be None)
+
+  Returns:
+    list: Summaries of the created photos for the upload response
+
+  Raises:
+    DecodeBudgetExhausted: If inline jobs could not get decode memory in time; nothing is stored then
+  """
+  if not prepared_photos:
+    return []
+
+  workers = settings.PHOTO_UPLOAD_WORKERS if settings.PHOTO_JOBS_INLINE else 1
+
+  # Inline jobs decode in this process: the memory of the decodes in flight
+  # at once is reserved before anything is stored, so a refused upload can
+  # simply be retried
+  reservation = decodeBudget().reserve(
+    peakDecodeBytes([prepared["decode_bytes"] for prepared in prepared_photos], workers),
+    settings.IMAGE_DECODE["WAIT_SECONDS"]
+  ) if settings.PHOTO_JOBS_INLINE else nullcontext()
+
+  with reservation:
+    return storePreparedPhotos(user, prepared_photos, album, workers)
+
+def storePreparedPhotos(user, prepared_photos: list, album, workers: int) -> list:
+  """
+  Creates the photos of an upload and queues (or, inline, runs) their jobs on `workers` threads.
+  """
+  with transaction.atomic():
+    # Identical bytes (e.g. a retried batch) share one stored original, and
+    # reuse the processed files of an earlier photo when there is one.
+    new_photos = []
+    for prepared in prepared_photos:
+      blob = acquireBlob(prepared["file"], prepared["sha256"])
+      new_photos.append(Photo(
+        user=user,
+        title=prepared["title"],
+        description=prepared["description"],
+        capture_date=prepared["capture_date"],
+        original_image=blob.file.name,
+        blob=blob,
+        width=prepared["width"],
+        height=prepared["height"],
+        status=Photo.STATUS_PROCESSING,
+        album=album
+      ))
+
+    new_photos = Photo.objects.bulk_create(new_photos)
+
+    # bulk_create does not send post_save, which is what normally
+    # invalidates the cached feed and album responses.
+    bumpContentVersions([FEED_VERSION_KEY] + ([albumVersionKey(album.id)] if album else []))
+
+  def queuePhoto(new_photo):
+    job = None if shareProcessedFiles(new_photo) else enqueuePhotoJob(new_photo)
+
+    return {
+      "id": new_photo.id,
+      "title": new_photo.title,
+      "status": new_photo.status,
+      "job_id": job.id if job else None
+    }
+
+  # Inline jobs render the derivatives right here, so they get the pool too;
+  # queueing a job for the worker is a single insert.
+  return mapInThreads(queuePhoto, new_photos, workers)
+
+def decodeBusyResponse(error: DecodeBudgetExhausted) -> JsonResponse:
+  response = JsonResponse({
+    "success": False,
+    "error": str(error)
+  }, status=503)
+  response["Retry-After"] = str(max(1, math.ceil(error.retry_after)))
+
+  return response
+
+def uploadResponse(created_photos: list, errors: list) -> JsonResponse:
+  """
+  Builds the response of an upload request from its per-photo results.
+
+  Args:
+    created_photos (list): Summaries of the stored photos
+    errors (list): Per-photo error messages
+
+  Returns:
+    JsonResponse: 201 when at least one photo was stored, 400 otherwise
+  """
+  if errors and not created_photos:
+    return JsonResponse({
+      "success": False,
+      "error": "Failed to upload photos",
+      "errors": errors
+    }, status=400)
+  
+  response_data = {
+    "success": True,
+    "message": f"Successfully uploaded {len(created_photos)} photo(s)",
+    "photos": created_photos
+  }
+  
+  if errors:
+    response_data["warnings"] = errors
+  
+  status_code = 201 if created_photos else 400
+  return JsonResponse(response_data, status=status_code)
+
 @csrf_exempt
 def uploadPhotos(request):  
   try:
@@ -60,9 +333,23 @@ def uploadPhotos(request):
         "error": "Only uploaders can upload photos"
       }, status=403)
     
-    data = json.loads(request.body)
+    photo_files = None
+
+    # Multipart uploads carry the images as binary parts and the JSON body
+    # shape (minus the base64 data) in a "metadata" field. Files are spooled
+    # straight to temporary files instead of being held in memory.
+    if request.content_type == "multipart/form-data":
+      request.upload_handlers = [TemporaryFileUploadHandler(request)]
+      data = json.loads(request.POST.get("metadata") or "{}")
+      photo_files = request.FILES.getlist("photos")
+    else:
+      data = json.loads(request.body)
+
     photos = data.get("photos", [])
 
+    if photo_files is not None and len(photo_files) > len(photos):
+      photos = photos + [{}] * (len(photo_files) - len(photos))
+
     album_id = data.get("album_id")
     new_album_data = data.get("album")
     
@@ -85,85 +372,49 @@ def uploadPhotos(request):
           "error": "Album title is required to create a new collection"
         }, status=400)
 
-    created_photos = []
-    errors = []
-    
-    for index, photo in enumerate(photos):
-      encoded_photo = photo.get("photo")
-
-      if not encoded_photo:
-        errors.append(f"Photo {index + 1}: Photo (base64) is required")
-        continue
+    def preparePhoto(item):
+      index, photo = item
 
       try:
-        filename = photo.get("filename", f"photo_{index + 1}.jpg")
-        photo_file = base64ToImageFile(encoded_photo, filename)
+        if photo_files is not None:
+          photo_file = photo_files[index] if index < len(photo_files) else None
+
+          if not photo_file:
+            return f"Photo {index + 1}: Photo file is required"
+        else:
+          encoded_photo = photo.get("photo")
+
+          if not encoded_photo:
+            return f"Photo {index + 1}: Photo (base64) is required"
+
+          filename = photo.get("filename", f"photo_{index + 1}.jpg")
+          photo_file = base64ToImageFile(encoded_photo, filename)
+
+        return prepareUploadedPhoto(photo_file, photo)
+
       except ValueError as e:
-        errors.append(f"Photo {index + 1}: {str(e)}")
-        continue
-
-      title = photo.get("title", "").strip()
-      description = photo.get("description", "").strip()
-      capture_date_str = photo.get("capture_date", "").strip()
-
-      if not title:
-        errors.append(f"Photo {index + 1}: Title is required")
-        continue
-      if not description:
-        errors.append(f"Photo {index + 1}: Description is required")
-        continue
-      if not capture_date_str:
-        errors.append(f"Photo {index + 1}: Capture date is required")
-        continue
-
-      capture_date = datetime.strptime(capture_date_str, "%Y-%m-%d").date()
-      
-      watermark_image = processImageForUpload(photo_file)
-      compressed_file = createInMemoryUploadedFile(
-        watermark_image,
-        photo_file.name
-      )
-      
-      photo_file.seek(0)
-      
-      new_photo = Photo.objects.create(
-        user=request.user_obj,
-        title=title,
-        description=description,
-        capture_date=capture_date,
-        original_image=photo_file,
-        compressed_image=compressed_file,
-        album=target_album
-      )
-      created_photos.append({
-        "id": new_photo.id,
-        "title": new_photo.title
-      })
-    
-    if errors and not created_photos:
-      return JsonResponse({
-        "success": False,
-        "error": "Failed to upload photos",
-        "errors": errors
-      }, status=400)
-    
-    response_data = {
-      "success": True,
-      "message": f"Successfully uploaded {len(created_photos)} photo(s)",
-      "photos": created_photos
-    }
-    
-    if errors:
-      response_data["warnings"] = errors
+        return f"Photo {index + 1}: {str(e)}"
+
+    # Photos are decoded and hashed concurrently (hashlib releases the GIL on
+    # large buffers); the rows are then written together in one transaction.
+    results = mapInThreads(preparePhoto, list(enumerate(photos)), settings.PHOTO_UPLOAD_WORKERS)
+
+    errors = [result for result in results if isinstance(result, str)]
+    created_photos = storeUploadedPhotos(
+      request.user_obj,
+      [result for result in results if isinstance(result, dict)],
+      target_album
+    )
     
-    status_code = 201 if created_photos else 400
-    return JsonResponse(response_data, status=status_code)
+    return uploadResponse(created_photos, errors)
 
   except Album.DoesNotExist:
     return JsonResponse({
       "success": False,
       "error": "Selected album not found or not yours"
     }, status=404)
+  except DecodeBudgetExhausted as e:
+    return decodeBusyResponse(e)
   except json.JSONDecodeError:
       return JsonResponse({
         "success": False,
@@ -175,6 +426,149 @@ def uploadPhotos(request):
       "error": f"An error occurred: {str(e)}"
     }, status=500)
 
+@csrf_exempt
+def uploadPhotoRaw(request):
+  try:
+    if request.method != "PUT":
+      return JsonResponse({
+        "success": False,
+        "error": "Method not allowed"
+      }, status=405)
+    
+    if request.user_role != "uploader":
+      return JsonResponse({
+        "success": False,
+        "error": "Only uploaders can upload photos"
+      }, status=403)
+
+    if not request.content_type.startswith("image/"):
+      return JsonResponse({
+        "success": False,
+        "error": "Content-Type must be an image type (e.g. image/jpeg)"
+      }, status=415)
+
+    max_bytes = settings.PHOTO_UPLOAD_MAX_BYTES
+    content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+
+    if content_length > max_bytes:
+      return JsonResponse({
+        "success": False,
+        "error": f"Photo exceeds the {max_bytes} byte upload limit"
+      }, status=413)
+
+    target_album = None
+    album_id = request.GET.get("album_id")
+
+    if album_id:
+      target_album = Album.objects.get(id=album_id, user=request.user_obj)
+
+    extension = request.content_type.split("/", 1)[1].split("+")[0]
+    filename = request.GET.get("filename") or f"photo.{extension}"
+
+    # The body is copied to a temporary file chunk by chunk, so the request
+    # is never fully buffered in memory.
+    photo_file = TemporaryUploadedFile(filename, request.content_type, content_length, None)
+    try:
+      received = 0
+      while True:
+        chunk = request.read(RAW_UPLOAD_CHUNK_SIZE)
+        if not chunk:
+          break
+        received += len(chunk)
+        if received > max_bytes:
+          return JsonResponse({
+            "success": False,
+            "error": f"Photo exceeds the {max_bytes} byte upload limit"
+          }, status=413)
+        photo_file.write(chunk)
+
+      if not received:
+        return JsonResponse({
+          "success": False,
+          "error": "Photo body is empty"
+        }, status=400)
+
+      photo_file.size = received
+      photo_file.seek(0)
+
+      try:
+        prepared_photo = prepareUploadedPhoto(photo_file, request.GET)
+      except ValueError as e:
+        return uploadResponse([], [f"Photo 1: {str(e)}"])
+
+      return uploadResponse(storeUploadedPhotos(request.user_obj, [prepared_photo], target_album), [])
+
+    finally:
+      photo_file.close()
+
+  except Album.DoesNotExist:
+    return JsonResponse({
+      "success": False,
+      "error": "Selected album not found or not yours"
+    }, status=404)
+  except DecodeBudgetExhausted as e:
+    return decodeBusyResponse(e)
+  except Exception as e:
+    return JsonResponse({
+      "success": False,
+      "error": f"An error occurred: {str(e)}"
+    }, status=500)
+
+@csrf_exempt
+def getPhotosStatus(request):
+  try:
+    if request.method != "GET":
+      return JsonResponse({
+        "success": False,
+        "error": "Method not allowed"
+      }, status=405)
+
+    try:
+      photo_ids = [int(photo_id) for photo_id in request.GET.get("ids", "").split(",") if photo_id.strip()]
+    except ValueError:
+      return JsonResponse({
+        "success": False,
+        "error": "ids must be a comma separated list of photo ids"
+      }, status=400)
+
+    if not photo_ids or len(photo_ids) > STATUS_MAX_IDS:
+      return JsonResponse({
+        "success": False,
+        "error": f"Between 1 and {STATUS_MAX_IDS} photo ids are required"
+      }, status=400)
+
+    # Photos of other users are left out, as if they did not exist
+    latest_jobs = {}
+    for job in PhotoJob.objects.filter(photo_id__in=photo_ids, photo__user_id=request.user_obj.id).order_by("created_at"):
+      latest_jobs[job.photo_id] = job
+
+    statuses = []
+    for photo in Photo.objects.filter(id__in=photo_ids, user_id=request.user_obj.id).only("id", "status", "compressed_image"):
+      job = latest_jobs.get(photo.id)
+      statuses.append({
+        "id": photo.id,
+        "status": photo.status,
+        "image": photo.compressed_image.url if photo.compressed_image else None,
+        "job": {
+          "id": job.id,
+          "status": job.status,
+          "attempts": job.attempts,
+          # job.error is the raw exception, for operators only
+          "error": JOB_ERROR_MESSAGE if job.error else None
+        } if job else None
+      })
+
+    return JsonResponse({
+      "success": True,
+      "photos": statuses
+    })
+
+  except Exception:
+    return JsonResponse({
+      "success": False,
+      "error": "An error occurred"
+    }, status=500)
+
 @csrf_exempt
 def deletePhoto(request, photo_id):
   try:
@@ -189,19 +583,20 @@ def deletePhoto(request, photo_id):
         "error": "Only uploaders can delete photos"
       }, status=403)
 
-    photo = Photo.objects.get(id=photo_id)
+    photo = Photo.objects.filter(id=photo_id).values("user_id").first()
 
-    if photo.user.id != request.user_obj.id:
+    if photo is None:
+      return JsonResponse({
+        "success": False,
+        "error": "Photo not found"
+      }, status=404)
+    if photo["user_id"] != request.user_obj.id:
       return JsonResponse({
         "success": False,
         "error": "You do not have permission to delete this photo"
       }, status=403)
-    if photo.original_image:
-      photo.original_image.delete(save=False)
-    if photo.compressed_image:
-      photo.compressed_image.delete(save=False)
 
-    photo.delete()
+    deletePhotos(Photo.objects.filter(id=photo_id))
 
     return JsonResponse({
       "success": True,
@@ -212,4 +607,81 @@ def deletePhoto(request, photo_id):
     return JsonResponse({
       "success": False,
       "error": f"An error occurred: {str(e)}"
-    }, status=500)
\ No newline at end of file
+    }, status=500)
+
+@csrf_exempt
+def bulkDeletePhotos(request):
+  """
+  Deletes many of the user's photos, or a whole album with its photos, in one request.
+
+  The body is either {"photo_ids": [...]} or {"album_id": id}. Rows are
+  deleted with a fixed number of statements and the files are left to
+  collectmediagarbage; ids that are not the user's photos are reported
+  back instead of failing the request.
+  """
+  try:
+    if request.method != "POST":
+      return JsonResponse({
+        "success": False,
+        "error": "Method not allowed"
+      }, status=405)
+    if request.user_role != "uploader":
+      return JsonResponse({
+        "success": False,
+        "error": "Only uploaders can delete photos"
+      }, status=403)
+
+    data = json.loads(request.body or "{}")
+    album_id = data.get("album_id")
+
+    if album_id is not None:
+      # bool is a subclass of int, so true would otherwise stand for album 1
+      if type(album_id) is not int:
+        raise ValueError("album_id must be an album id")
+
+      album = Album.objects.filter(id=album_id).values("user_id").first()
+      if album is None:
+        return JsonResponse({
+          "success": False,
+          "error": "Album not found"
+        }, status=404)
+      if album["user_id"] != request.user_obj.id:
+        return JsonResponse({
+          "success": False,
+          "error": "You do not have permission to delete this album"
+        }, status=403)
+
+      deleted = deletePhotos(Photo.objects.filter(album_id=album_id), Album.objects.filter(id=album_id))
+
+      return JsonResponse({
+        "success": True,
+        "deleted": deleted,
+        "album_id": album_id
+      }, status=200)
+
+    photo_ids = data.get("photo_ids")
+    if not isinstance(photo_ids, list) or not all(type(photo_id) is int for photo_id in photo_ids):
+      raise ValueError("photo_ids must be a list of photo ids, or album_id an album id")
+    if not photo_ids or len(photo_ids) > DELETE_MAX_IDS:
+      raise ValueError(f"Between 1 and {DELETE_MAX_IDS} photo ids are required")
+
+    photos = Photo.objects.filter(id__in=photo_ids, user_id=request.user_obj.id)
+    found = set(photos.values_list("id", flat=True))
+    deleted = deletePhotos(photos) if found else 0
+
+    return JsonResponse({
+      "success": True,
+      "deleted": deleted,
+      "not_found": sorted(set(photo_ids) - found)
+    }, status=200)
+
+  except ValueError as e:
+    return JsonResponse({
+      "success": False,
+      "error": str(e)
+    }, status=400)
+  except Exception as e:
+    return JsonResponse({
+      "success": False,
+      "error": f"An error occurred: {str(e)}"
+    }, status=500)
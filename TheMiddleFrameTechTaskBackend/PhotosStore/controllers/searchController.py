@@ -0,0 +1,104 @@
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from ..models.photo import Photo
+from ..helpers.searchHelper import rankedMatches
+from ..helpers.serializerHelper import serializePhoto
+from ..helpers.httpCacheHelper import versionedResponse, FEED_VERSION_KEY
+from ..helpers.paginationHelper import encodeRankCursor, decodeRankCursor, parseLimit
+from .albumsController import albumsQuerySet, derivativesQuerySet, serializeAlbumListing, COVER_DERIVATIVE
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+SEARCH_MAX_QUERY_LENGTH = 200
+SEARCH_TYPES = ["photos", "albums"]
+
+def photoResults(matches: list) -> list:
+  """
+  Serializes matched photos in the feed representation, keeping the rank order.
+
+  Args:
+    matches (list): (id, rank) tuples from rankedMatches
+
+  Returns:
+    list: Serialized photos, each with its rank
+  """
+  photos = Photo.objects.select_related("user", "album").prefetch_related("derivatives").in_bulk(
+    [photo_id for photo_id, _ in matches]
+  )
+
+  return [
+    {**serializePhoto(photos[photo_id]), "rank": rank}
+    for photo_id, rank in matches if photo_id in photos
+  ]
+
+def albumResults(matches: list) -> list:
+  """
+  Serializes matched albums in the album listing representation, keeping the rank order.
+
+  Args:
+    matches (list): (id, rank) tuples from rankedMatches
+
+  Returns:
+    list: Serialized albums, each with its rank
+  """
+  albums = {album["id"]: album for album in albumsQuerySet().filter(id__in=[album_id for album_id, _ in matches])}
+  cover_rows = list(derivativesQuerySet(
+    photo_id__in=[album["cover_photo_id"] for album in albums.values() if album["cover_photo_id"]],
+    name=COVER_DERIVATIVE
+  ))
+
+  return [
+    {**serializeAlbumListing(albums[album_id], cover_rows), "rank": rank}
+    for album_id, rank in matches if album_id in albums
+  ]
+
+@csrf_exempt
+@versionedResponse(lambda request: [FEED_VERSION_KEY])
+def search(request):
+  try:
+    if request.method != "GET":
+      return JsonResponse({
+        "success": False,
+        "error": "Method not allowed"
+      }, status=405)
+
+    query = request.GET.get("q", "").strip()
+    search_type = request.GET.get("type", "photos")
+
+    if not query:
+      raise ValueError("Search query is required")
+    if len(query) > SEARCH_MAX_QUERY_LENGTH:
+      raise ValueError(f"Search query must be at most {SEARCH_MAX_QUERY_LENGTH} characters")
+    if search_type not in SEARCH_TYPES:
+      raise ValueError(f"type must be one of: {', '.join(SEARCH_TYPES)}")
+
+    limit = parseLimit(request.GET.get("limit"), SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT)
+    cursor = request.GET.get("cursor")
+    after = decodeRankCursor(cursor) if cursor else None
+
+    # Only ready photos are searchable; albums are listed regardless of content
+    if search_type == "photos":
+      matches = rankedMatches("photos", query, after, limit + 1, "t.status = %s", [Photo.STATUS_READY])
+    else:
+      matches = rankedMatches("albums", query, after, limit + 1)
+
+    has_more = len(matches) > limit
+    matches = matches[:limit]
+
+    return JsonResponse({
+      "success": True,
+      "query": query,
+      search_type: photoResults(matches) if search_type == "photos" else albumResults(matches),
+      "next_cursor": encodeRankCursor(matches[-1][1], matches[-1][0]) if has_more else None
+    })
+
+  except ValueError as e:
+    return JsonResponse({
+      "success": False,
+      "error": str(e)
+    }, status=400)
+  except Exception as e:
+    return JsonResponse({
+      "success": False,
+      "error": f"An error occurred: {str(e)}"
+    }, status=500)
@@ -1,5 +1,21 @@
 from . import jsonWebTokenHelper
 from . import imageHelper
+from . import paginationHelper
+from . import blobHelper
+from . import photoJobHelper
+from . import serializerHelper
+from . import logWriterHelper
+from . import principalCacheHelper
+from . import httpCacheHelper
+from . import threadPoolHelper
+from . import benchmarkHelper
+from . import albumStatsHelper
+from . import searchHelper
+from . import mediaHelper
+from . import deletionHelper
+from . import passwordHelper
+from . import throttleHelper
+from . import decodeBudgetHelper
 
-__all__ = ['jsonWebTokenHelper', 'imageHelper']
+__all__ = ['jsonWebTokenHelper', 'imageHelper', 'paginationHelper', 'blobHelper', 'photoJobHelper', 'serializerHelper', 'logWriterHelper', 'principalCacheHelper', 'httpCacheHelper', 'threadPoolHelper', 'benchmarkHelper', 'albumStatsHelper', 'searchHelper', 'mediaHelper', 'deletionHelper', 'passwordHelper', 'throttleHelper', 'decodeBudgetHelper']
 
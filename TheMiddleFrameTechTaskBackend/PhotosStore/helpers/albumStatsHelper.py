@@ -0,0 +1,55 @@
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from ..models.album import Album
+from ..models.photo import Photo
+
+def latestReadyPhoto():
+  """
+  Subquery selecting the id of the newest ready photo of the outer album, which is its cover.
+  """
+  return Subquery(
+    Photo.objects.filter(
+      album_id=OuterRef("id"),
+      status=Photo.STATUS_READY
+    ).order_by("-created_at", "-id").values("id")[:1]
+  )
+
+def updateAlbumStats(album_id: int, ready_delta: int):
+  """
+  Applies a change in an album's ready photos to its denormalized count and cover.
+
+  Call it in the same transaction as the photo change (after it), so the
+  cover subquery sees the new status and the content version bumped by the
+  photo's post_save covers the new counters.
+
+  Args:
+    album_id (int): Album of the changed photos (None is ignored)
+    ready_delta (int): Ready photos added (positive) or removed (negative)
+  """
+  if album_id is None:
+    return
+
+  Album.objects.filter(id=album_id).update(
+    photo_count=Greatest(F("photo_count") + ready_delta, Value(0)),
+    cover_photo_id=latestReadyPhoto(),
+    updated_at=timezone.now()
+  )
+
+def refreshAlbumStats(album_ids: list):
+  """
+  Recomputes the count and cover of albums from their photos, for bulk inserts and deletes that bypass updateAlbumStats.
+
+  Args:
+    album_ids (list): Ids of the albums to refresh
+  """
+  ready_count = Photo.objects.filter(
+    album_id=OuterRef("id"),
+    status=Photo.STATUS_READY
+  ).order_by().values("album_id").annotate(total=Count("id")).values("total")
+
+  Album.objects.filter(id__in=album_ids).update(
+    photo_count=Coalesce(Subquery(ready_count), Value(0)),
+    cover_photo_id=latestReadyPhoto(),
+    updated_at=timezone.now()
+  )
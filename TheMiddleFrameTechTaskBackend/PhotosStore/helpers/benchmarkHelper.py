@@ -0,0 +1,87 @@
+import resource
+import statistics
+
+from io import BytesIO
+from PIL import Image
+
+# Seeded benchmark users share this email domain (which identifies them for
+# --reset) and password.
+BENCHMARK_EMAIL_DOMAIN = "benchmark.local"
+BENCHMARK_PASSWORD = "benchmark-password"
+
+def createSyntheticJpeg(width: int, height: int, quality: int = 92, seed: int = 0) -> bytes:
+  """
+  Creates a photo-like JPEG (gradient plus smooth texture) of the given size.
+
+  Args:
+    width (int): Image width in pixels
+    height (int): Image height in pixels
+    quality (int): JPEG quality of the generated file
+    seed (int): Varies the texture, so different seeds give different bytes
+
+  Returns:
+    bytes: Encoded JPEG
+  """
+  gradient = Image.linear_gradient("L").resize((width, height)).rotate(seed * 37 % 360)
+  texture_size = (max(1, width // 8), max(1, height // 8))
+  channels = [
+    Image.blend(gradient, Image.effect_noise(texture_size, sigma + seed).resize((width, height), Image.Resampling.BICUBIC), 0.5)
+    for sigma in (48, 64, 80)
+  ]
+
+  output = BytesIO()
+  Image.merge("RGB", channels).save(output, format="JPEG", quality=quality)
+  return output.getvalue()
+
+def peakRssKb(reset: bool = False) -> int:
+  """
+  Returns the peak resident set size of the current process in KiB.
+
+  On Linux the per-process high-water mark (VmHWM) is used and can be reset;
+  elsewhere ru_maxrss is the best available approximation.
+
+  Args:
+    reset (bool): Reset the high-water mark to the current RSS first
+
+  Returns:
+    int: Peak RSS in KiB
+  """
+  try:
+    if reset:
+      with open("/proc/self/clear_refs", "w") as clear_refs:
+        clear_refs.write("5")
+
+    with open("/proc/self/status") as status:
+      for line in status:
+        if line.startswith("VmHWM:"):
+          return int(line.split()[1])
+
+  except OSError:
+    pass
+
+  return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def percentile(samples: list, fraction: float) -> float:
+  ordered = sorted(samples)
+  return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def summarizeLatencies(samples: list) -> dict:
+  """
+  Summarizes request latencies.
+
+  Args:
+    samples (list): Latencies in milliseconds
+
+  Returns:
+    dict: Mean, p50, p95, p99 and max in milliseconds
+  """
+  if not samples:
+    return {"mean_ms": None, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+
+  return {
+    "mean_ms": round(statistics.mean(samples), 3),
+    "p50_ms": round(percentile(samples, 0.50), 3),
+    "p95_ms": round(percentile(samples, 0.95), 3),
+    "p99_ms": round(percentile(samples, 0.99), 3),
+    "max_ms": round(max(samples), 3),
+  }
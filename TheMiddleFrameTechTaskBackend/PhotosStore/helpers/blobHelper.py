@@ -0,0 +1,121 @@
+import hashlib
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from ..models.photo import Photo
+from ..models.imageBlob import ImageBlob
+from ..models.photoDerivative import PhotoDerivative
+from .albumStatsHelper import updateAlbumStats
+
+def hashFile(file) -> str:
+  """
+  Computes the SHA-256 of a Django file without loading it all in memory.
+
+  Args:
+    file: Django File / UploadedFile
+
+  Returns:
+    str: Hex digest of the file contents
+  """
+  digest = hashlib.sha256()
+  file.seek(0)
+  for chunk in file.chunks():
+    digest.update(chunk)
+  file.seek(0)
+
+  return digest.hexdigest()
+
+def acquireBlob(photo_file, sha256: str = None) -> ImageBlob:
+  """
+  Returns the blob holding these exact bytes, storing them only if they are new.
+
+  The blob's reference count is incremented for the caller, who must attach
+  it to a photo (or release it).
+
+  Args:
+    photo_file: Django file holding the uploaded original
+    sha256 (str): Digest of photo_file if already computed
+
+  Returns:
+    ImageBlob: The shared blob
+  """
+  sha256 = sha256 or hashFile(photo_file)
+
+  while True:
+    blob = ImageBlob.objects.filter(sha256=sha256).first()
+
+    if blob is None:
+      blob = ImageBlob(sha256=sha256, size=photo_file.size, ref_count=1)
+      blob.file.save(photo_file.name, photo_file, save=False)
+
+      try:
+        with transaction.atomic():
+          blob.save()
+        return blob
+
+      except IntegrityError:
+        # Someone stored the same bytes concurrently; use theirs.
+        blob.file.delete(save=False)
+        continue
+
+    # The update misses if the last reference was released in the meantime,
+    # in which case the bytes are stored again.
+    if ImageBlob.objects.filter(id=blob.id).update(ref_count=F("ref_count") + 1):
+      return blob
+
+# Photo fields describing the image itself, identical for every photo of a blob
+SUMMARY_FIELDS = ["width", "height", "original_size", "compressed_size", "dominant_color", "placeholder"]
+
+def shareProcessedFiles(photo: Photo) -> bool:
+  """
+  Reuses the compressed image and derivatives of a processed photo with the same blob.
+
+  Args:
+    photo (Photo): Newly created photo attached to a blob
+
+  Returns:
+    bool: True if the files were shared and the photo is ready, False if it still needs processing
+  """
+  source = Photo.objects.filter(
+    blob_id=photo.blob_id,
+    status=Photo.STATUS_READY
+  ).exclude(id=photo.id).prefetch_related("derivatives").first()
+
+  if source is None or not source.compressed_image:
+    return False
+
+  was_ready = photo.status == Photo.STATUS_READY
+
+  with transaction.atomic():
+    PhotoDerivative.objects.bulk_create([
+      PhotoDerivative(
+        photo=photo,
+        name=derivative.name,
+        format=derivative.format,
+        width=derivative.width,
+        height=derivative.height,
+        image=derivative.image.name
+      )
+      for derivative in source.derivatives.all()
+    ])
+
+    photo.compressed_image = source.compressed_image.name
+    for field in SUMMARY_FIELDS:
+      setattr(photo, field, getattr(source, field))
+    photo.status = Photo.STATUS_READY
+    photo.save(update_fields=["compressed_image", "status", *SUMMARY_FIELDS])
+    updateAlbumStats(photo.album_id, 0 if was_ready else 1)
+
+  return True
+
+def deleteDerivatives(photo: Photo):
+  """
+  Removes the derivative rows of a photo.
+
+  Their files are tombstoned by deletionHelper and deleted by
+  collectmediagarbage once no other photo shares them.
+
+  Args:
+    photo (Photo): Photo whose derivatives are deleted
+  """
+  photo.derivatives.all().delete()
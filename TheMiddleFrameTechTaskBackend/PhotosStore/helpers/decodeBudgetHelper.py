@@ -0,0 +1,93 @@
+import time
+import threading
+
+from contextlib import contextmanager
+from django.conf import settings
+
+class DecodeBudgetExhausted(Exception):
+  """
+  Raised when image decodes in flight use the whole memory budget for longer than the wait allowed.
+  """
+
+  def __init__(self, retry_after: int):
+    super().__init__("Too many images being processed, please retry shortly")
+    self.retry_after = retry_after
+
+class MemoryBudget:
+  """
+  Counts the bytes reserved by work in flight against a fixed capacity.
+
+  A reservation larger than the whole capacity is admitted once nothing else
+  holds the budget, so it runs alone rather than never.
+  """
+
+  def __init__(self, capacity: int):
+    self.capacity = capacity
+    self.used = 0
+    self.condition = threading.Condition()
+
+  def fits(self, cost: int) -> bool:
+    return self.used + cost <= self.capacity or self.used == 0
+
+  def acquire(self, cost: int, timeout: float = None) -> bool:
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    with self.condition:
+      while not self.fits(cost):
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+          return False
+        self.condition.wait(remaining)
+
+      self.used += cost
+      return True
+
+  def release(self, cost: int):
+    with self.condition:
+      self.used -= cost
+      self.condition.notify_all()
+
+  @contextmanager
+  def reserve(self, cost: int, timeout: float = None):
+    """
+    Holds part of the budget for the duration of a with block.
+
+    Args:
+      cost (int): Bytes to reserve
+      timeout (float): Seconds to wait for room; None waits as long as needed
+
+    Raises:
+      DecodeBudgetExhausted: If there was no room within timeout
+    """
+    if not self.acquire(cost, timeout):
+      raise DecodeBudgetExhausted(settings.IMAGE_DECODE["RETRY_AFTER"])
+
+    try:
+      yield
+    finally:
+      self.release(cost)
+
+decode_budget = None
+decode_budget_lock = threading.Lock()
+
+def decodeBudget() -> MemoryBudget:
+  # One budget per process, shared by every thread decoding images in it
+  global decode_budget
+
+  with decode_budget_lock:
+    if decode_budget is None:
+      decode_budget = MemoryBudget(settings.IMAGE_DECODE["MEMORY_BUDGET"])
+    return decode_budget
+
+def peakDecodeBytes(costs: list, concurrency: int) -> int:
+  """
+  Returns the most memory a set of decodes can use when run concurrency at a time.
+
+  Args:
+    costs (list): Estimated bytes of each decode
+    concurrency (int): Decodes in flight at once
+
+  Returns:
+    int: Sum of the largest costs that can be in flight together
+  """
+  return sum(sorted(costs, reverse=True)[:max(1, concurrency)])
@@ -0,0 +1,237 @@
+from datetime import timedelta
+from django.core.exceptions import EmptyResultSet
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from ..models.album import Album
+from ..models.photo import Photo
+from ..models.photoJob import PhotoJob
+from ..models.photoDerivative import PhotoDerivative
+from ..models.imageBlob import ImageBlob
+from ..models.fileTombstone import FileTombstone
+from .albumStatsHelper import refreshAlbumStats
+from .httpCacheHelper import bumpContentVersions, albumVersionKey, FEED_VERSION_KEY
+
+def tombstoneFiles(querysets: list):
+  """
+  Records the file names selected by querysets as tombstones, in one INSERT ... SELECT each.
+
+  Names are copied inside the database, so deleting a large album never
+  loads its file names into memory.
+
+  Args:
+    querysets (list): Querysets of a single column of file names (e.g. values_list("file_name"))
+  """
+  now = timezone.now()
+
+  with connection.cursor() as cursor:
+    for names in querysets:
+      try:
+        sql, params = names.order_by().distinct().query.sql_with_params()
+      except EmptyResultSet:
+        # e.g. filtered on an empty id list: there is nothing to record
+        continue
+
+      cursor.execute(
+        f"INSERT INTO {FileTombstone._meta.db_table} (name, created_at) "
+        f"SELECT names.file_name, %s FROM ({sql}) names WHERE names.file_name <> ''",
+        [now, *params]
+      )
+
+# Photos handled per round of statements, which keeps every IN list within
+# the bound-parameter limits of the database
+DELETE_BATCH_SIZE = 1000
+
+def deleteRows(model, column: str, ids: list):
+  """
+  Deletes the rows of a model whose column is in ids, with one plain DELETE.
+
+  This deliberately bypasses QuerySet.delete(): its collector would load
+  every row and send post_delete for each (see releaseDeletedPhoto), which
+  tombstones files and releases blob references one row at a time, on top of
+  the set-wise bookkeeping deletePhotos has already done. Callers delete
+  dependent rows first, so no foreign key is left dangling.
+
+  Args:
+    model: Model whose table is deleted from
+    column (str): Column matched against ids
+    ids (list): Values to delete
+
+  Returns:
+    int: Number of rows deleted
+  """
+  if not ids:
+    return 0
+
+  with connection.cursor() as cursor:
+    cursor.execute(
+      f"DELETE FROM {connection.ops.quote_name(model._meta.db_table)} "
+      f"WHERE {connection.ops.quote_name(column)} IN ({', '.join(['%s'] * len(ids))})",
+      ids
+    )
+    return cursor.rowcount
+
+def deletePhotoBatch(photo_ids: list) -> set:
+  """
+  Deletes one batch of photos with a fixed number of statements, tombstoning their files.
+
+  Args:
+    photo_ids (list): Ids of the photos (at most DELETE_BATCH_SIZE)
+
+  Returns:
+    set: Ids of the albums the photos belonged to
+  """
+  photos = Photo.objects.filter(id__in=photo_ids)
+  derivatives = PhotoDerivative.objects.filter(photo_id__in=photo_ids)
+  album_ids = set(photos.exclude(album=None).order_by().values_list("album_id", flat=True).distinct())
+
+  tombstoneFiles([
+    photos.annotate(file_name=F("original_image")).values_list("file_name"),
+    photos.annotate(file_name=F("compressed_image")).values_list("file_name"),
+    derivatives.annotate(file_name=F("image")).values_list("file_name"),
+  ])
+
+  # Each blob loses one reference per deleted photo attached to it
+  blob_ids = list(photos.exclude(blob=None).order_by().values_list("blob_id", flat=True).distinct())
+  released = photos.filter(blob_id=OuterRef("id")).order_by().values("blob_id").annotate(total=Count("id")).values("total")
+  ImageBlob.objects.filter(id__in=blob_ids).update(ref_count=Greatest(F("ref_count") - Subquery(released), Value(0)))
+
+  deleteRows(PhotoDerivative, "photo_id", photo_ids)
+  deleteRows(PhotoJob, "photo_id", photo_ids)
+  Album.objects.filter(cover_photo_id__in=photo_ids).update(cover_photo=None)
+  deleteRows(Photo, "id", photo_ids)
+
+  unused_blobs = ImageBlob.objects.filter(id__in=blob_ids, ref_count=0)
+  tombstoneFiles([unused_blobs.annotate(file_name=F("file")).values_list("file_name")])
+  deleteRows(ImageBlob, "id", list(unused_blobs.values_list("id", flat=True)))
+
+  return album_ids
+
+def deletePhotos(photos, delete_albums=None) -> int:
+  """
+  Deletes photos (and optionally albums) with a fixed number of statements per batch, whatever their count.
+
+  Rows are deleted set-wise without per-object signals. Their files are
+  tombstoned for collectmediagarbage instead of being unlinked here, blob
+  references are released, and album counters and cached responses are
+  updated.
+
+  Albums being deleted are locked first, so no photo can be added to them
+  meanwhile; the photo ids are then read once and every later statement
+  works on exactly those photos.
+
+  Args:
+    photos (QuerySet): Photos to delete (e.g. Photo.objects.filter(album_id=3))
+    delete_albums (QuerySet): Albums to delete with them, once their photos are gone
+
+  Returns:
+    int: Number of photos deleted
+  """
+  with transaction.atomic():
+    deleted_album_ids = []
+    if delete_albums is not None:
+      deleted_album_ids = list(delete_albums.select_for_update().order_by("id").values_list("id", flat=True))
+
+    photo_ids = list(photos.order_by("id").values_list("id", flat=True))
+
+    album_ids = set()
+    for start in range(0, len(photo_ids), DELETE_BATCH_SIZE):
+      album_ids |= deletePhotoBatch(photo_ids[start:start + DELETE_BATCH_SIZE])
+
+    for start in range(0, len(deleted_album_ids), DELETE_BATCH_SIZE):
+      deleteRows(Album, "id", deleted_album_ids[start:start + DELETE_BATCH_SIZE])
+    album_ids |= set(deleted_album_ids)
+
+    refreshAlbumStats(album_ids - set(deleted_album_ids))
+    bumpContentVersions([FEED_VERSION_KEY] + [albumVersionKey(album_id) for album_id in sorted(album_ids)])
+
+  return len(photo_ids)
+
+def isFileReferenced(names: set) -> set:
+  """
+  Returns which of the given file names are still used by a photo, derivative or blob.
+
+  Args:
+    names (set): Storage names
+
+  Returns:
+    set: The names still referenced
+  """
+  names = list(names)
+  return (
+    set(Photo.objects.filter(original_image__in=names).values_list("original_image", flat=True)) |
+    set(Photo.objects.filter(compressed_image__in=names).values_list("compressed_image", flat=True)) |
+    set(PhotoDerivative.objects.filter(image__in=names).values_list("image", flat=True)) |
+    set(ImageBlob.objects.filter(file__in=names).values_list("file", flat=True))
+  )
+
+def collectGarbage(batch_size: int, grace_seconds: int) -> tuple:
+  """
+  Deletes the files of one batch of tombstones that nothing references any more.
+
+  A file is only removed if no photo, derivative or blob references it.
+  What keeps a shared original safe is the blob row: it is locked while
+  references are checked, and an upload taking a reference updates that
+  row, so it either commits before the check (and the file is kept) or
+  waits for it. Tombstones younger than the grace period are left alone,
+  which merely gives readers of a just-released file time to finish; it
+  guarantees nothing on its own.
+
+  The batch is claimed with SKIP LOCKED, so concurrent collectors work on
+  different tombstones. Files are only deleted once the tombstones are gone
+  for good: a crash in between leaves an orphaned file, never a row
+  pointing at a missing one.
+
+  Args:
+    batch_size (int): Tombstones handled per call
+    grace_seconds (int): Minimum age of a tombstone
+
+  Returns:
+    tuple: (tombstones processed, files deleted)
+  """
+  cutoff = timezone.now() - timedelta(seconds=grace_seconds)
+
+  with transaction.atomic():
+    tombstones = list(
+      FileTombstone.objects.select_for_update(skip_locked=True)
+      .filter(created_at__lte=cutoff)
+      .order_by("created_at", "id")
+      .values_list("id", "name")[:batch_size]
+    )
+    if not tombstones:
+      return 0, 0
+
+    names = {name for _, name in tombstones}
+    list(ImageBlob.objects.select_for_update().filter(file__in=names).values_list("id", flat=True))
+    unused = names - isFileReferenced(names)
+
+    FileTombstone.objects.filter(id__in=[tombstone_id for tombstone_id, _ in tombstones]).delete()
+
+  for name in unused:
+    default_storage.delete(name)
+
+  return len(tombstones), len(unused)
+
+@receiver(post_delete, sender=Photo)
+def releaseDeletedPhoto(sender, instance, **kwargs):
+  # Photos deleted through the ORM (e.g. cascading from an album or user)
+  # release their blob and leave their files to the collector.
+  FileTombstone.objects.bulk_create([
+    FileTombstone(name=name)
+    for name in (instance.original_image.name, instance.compressed_image.name) if name
+  ])
+
+  if instance.blob_id:
+    ImageBlob.objects.filter(id=instance.blob_id).update(ref_count=Greatest(F("ref_count") - 1, Value(0)))
+    unused_blobs = ImageBlob.objects.filter(id=instance.blob_id, ref_count=0)
+    tombstoneFiles([unused_blobs.annotate(file_name=F("file")).values_list("file_name")])
+    unused_blobs.delete()
+
+@receiver(post_delete, sender=PhotoDerivative)
+def releaseDeletedDerivative(sender, instance, **kwargs):
+  if instance.image.name:
+    FileTombstone.objects.create(name=instance.image.name)
@@ -0,0 +1,314 @@
+import random
+import hashlib
+
+from asgiref.sync import iscoroutinefunction
+from functools import wraps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from ..models.user import User
+from ..models.album import Album
+from ..models.photo import Photo
+from ..models.contentVersion import ContentVersion
+
+FEED_VERSION_KEY = "feed"
+
+def albumVersionKey(album_id: int) -> str:
+  return f"album:{album_id}"
+
+def feedStripeKeys() -> list:
+  # Every photo or album write bumps the feed, so its version is striped over
+  # several rows (summed when read) instead of all writers locking one row
+  return [f"{FEED_VERSION_KEY}:{stripe}" for stripe in range(settings.RESPONSE_CACHE["FEED_VERSION_STRIPES"])]
+
+def bumpContentVersions(keys: list):
+  """
+  Increments the version of every key, invalidating responses built from it.
+
+  The feed version is bumped on one of its stripes, picked at random.
+
+  Args:
+    keys (list): Content version keys (e.g. ["feed", "album:3"])
+  """
+  now = timezone.now()
+
+  for key in keys:
+    if key == FEED_VERSION_KEY:
+      key = random.choice(feedStripeKeys())
+
+    updated = ContentVersion.objects.filter(key=key).update(version=F("version") + 1, updated_at=now)
+    if updated:
+      continue
+
+    try:
+      with transaction.atomic():
+        ContentVersion.objects.create(key=key, version=1)
+    except IntegrityError:
+      ContentVersion.objects.filter(key=key).update(version=F("version") + 1, updated_at=now)
+
+def storedVersionKeys(keys: list) -> list:
+  # The rows holding the versions of keys, with the feed expanded to its stripes
+  stored = []
+  for key in keys:
+    stored += feedStripeKeys() if key == FEED_VERSION_KEY else [key]
+  return stored
+
+def combineVersions(keys: list, rows: dict) -> list:
+  """
+  Folds the stored version rows back into one version per requested key.
+
+  Args:
+    keys (list): Content version keys
+    rows (dict): Rows of storedVersionKeys(keys) by key, as (version, updated_at)
+
+  Returns:
+    list: (key, version, updated_at) tuples in the order of keys; unknown keys have version 0
+  """
+  versions = []
+  for key in keys:
+    found = [rows[stored] for stored in storedVersionKeys([key]) if stored in rows]
+    timestamps = [updated_at for _, updated_at in found]
+    versions.append((key, sum(version for version, _ in found), max(timestamps) if timestamps else None))
+  return versions
+
+def loadContentVersions(keys: list) -> list:
+  """
+  Reads the current versions of keys from the database.
+
+  Args:
+    keys (list): Content version keys
+
+  Returns:
+    list: (key, version, updated_at) tuples in the order of keys; unknown keys have version 0
+  """
+  rows = {
+    key: (version, updated_at)
+    for key, version, updated_at in ContentVersion.objects.filter(key__in=storedVersionKeys(keys)).values_list("key", "version", "updated_at")
+  }
+  return combineVersions(keys, rows)
+
+async def aloadContentVersions(keys: list) -> list:
+  """
+  Async counterpart of loadContentVersions.
+  """
+  rows = {
+    key: (version, updated_at)
+    async for key, version, updated_at in ContentVersion.objects.filter(key__in=storedVersionKeys(keys)).values_list("key", "version", "updated_at")
+  }
+  return combineVersions(keys, rows)
+
+def getContentVersions(request, keys: list) -> list:
+  """
+  Loads the current versions of keys, once per request.
+
+  Args:
+    request (HttpRequest): The request the versions are validated for
+    keys (list): Content version keys
+
+  Returns:
+    list: (key, version, updated_at) tuples in the order of keys; unknown keys have version 0
+  """
+  if getattr(request, "content_versions", None) is None:
+    request.content_versions = loadContentVersions(keys)
+
+  return request.content_versions
+
+async def agetContentVersions(request, keys: list) -> list:
+  """
+  Async counterpart of getContentVersions; later sync calls reuse its result.
+
+  Args:
+    request (HttpRequest): The request the versions are validated for
+    keys (list): Content version keys
+
+  Returns:
+    list: (key, version, updated_at) tuples in the order of keys; unknown keys have version 0
+  """
+  if getattr(request, "content_versions", None) is None:
+    request.content_versions = await aloadContentVersions(keys)
+
+  return request.content_versions
+
+def versionedEtag(request, keys: list) -> str:
+  """
+  Builds a strong ETag from the content versions and the full request path.
+
+  Responses are deterministic for a given path and set of versions, so the
+  same ETag always denotes byte-identical content.
+
+  Args:
+    request (HttpRequest): The request being answered
+    keys (list): Content version keys the response depends on
+
+  Returns:
+    str: Unquoted ETag value
+  """
+  versions = ".".join(str(version) for _, version, _ in getContentVersions(request, keys))
+  path_hash = hashlib.sha1(request.get_full_path().encode("utf-8")).hexdigest()[:16]
+  return f"{versions}-{path_hash}"
+
+def versionedLastModified(request, keys: list):
+  """
+  Returns the most recent update time among the content versions.
+
+  Args:
+    request (HttpRequest): The request being answered
+    keys (list): Content version keys the response depends on
+
+  Returns:
+    datetime: Last modification time, or None if nothing was ever written
+  """
+  timestamps = [updated_at for _, _, updated_at in getContentVersions(request, keys) if updated_at]
+  return max(timestamps) if timestamps else None
+
+def dropValidators(response):
+  # The response may not match the versions its ETag and Last-Modified were
+  # computed from, so it is sent without them (and never answered with a 304)
+  del response["ETag"]
+  del response["Last-Modified"]
+
+def versionedResponse(version_keys):
+  """
+  Adds ETag/Last-Modified validation and response caching to a public GET view.
+
+  Conditional requests whose validators still match get a 304 without running
+  the view. Other successful, non-streaming responses are cached under their
+  versioned ETag, so bumping a content version makes every response that
+  depends on it unreachable without explicit deletes. Both sync and async
+  views can be decorated.
+
+  The versions are read before the view runs its queries, so they are read
+  again once a response has been rendered: if a write was committed in
+  between, the body may be newer than the validators, and the response is
+  sent without them and not cached. Streamed bodies are only read after the
+  headers are sent, so streamed responses never carry validators.
+
+  Args:
+    version_keys: Callable (request, *args, **kwargs) -> list of content version keys
+  """
+  def etag(request, *args, **kwargs):
+    return versionedEtag(request, version_keys(request, *args, **kwargs))
+
+  def lastModified(request, *args, **kwargs):
+    return versionedLastModified(request, version_keys(request, *args, **kwargs))
+
+  def freshlyRendered(request, response) -> bool:
+    return request.method == "GET" and response.status_code == 200 and not getattr(response, "from_response_cache", False)
+
+  def cachedResponse(cached) -> HttpResponse:
+    content, content_type = cached
+    response = HttpResponse(content, content_type=content_type)
+    response.from_response_cache = True
+    return response
+
+  def decorator(view):
+    if iscoroutinefunction(view):
+      return asyncVersionedView(view)
+
+    @condition(etag_func=etag, last_modified_func=lastModified)
+    @wraps(view)
+    def conditionalView(request, *args, **kwargs):
+      if request.method != "GET":
+        return view(request, *args, **kwargs)
+
+      cached = caches[settings.RESPONSE_CACHE["CACHE"]].get(f"response:{etag(request, *args, **kwargs)}")
+      response = cachedResponse(cached) if cached is not None else view(request, *args, **kwargs)
+
+      patch_cache_control(response, public=True, no_cache=True)
+      return response
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+      response = conditionalView(request, *args, **kwargs)
+      if not freshlyRendered(request, response):
+        return response
+
+      keys = version_keys(request, *args, **kwargs)
+      if response.streaming or loadContentVersions(keys) != getContentVersions(request, keys):
+        dropValidators(response)
+      else:
+        caches[settings.RESPONSE_CACHE["CACHE"]].set(
+          f"response:{etag(request, *args, **kwargs)}",
+          (response.content, response["Content-Type"]),
+          settings.RESPONSE_CACHE["TIMEOUT"]
+        )
+
+      return response
+
+    return wrapper
+
+  def asyncVersionedView(view):
+    @condition(etag_func=etag, last_modified_func=lastModified)
+    @wraps(view)
+    async def conditionalView(request, *args, **kwargs):
+      if request.method != "GET":
+        return await view(request, *args, **kwargs)
+
+      cached = await caches[settings.RESPONSE_CACHE["CACHE"]].aget(f"response:{etag(request, *args, **kwargs)}")
+      response = cachedResponse(cached) if cached is not None else await view(request, *args, **kwargs)
+
+      patch_cache_control(response, public=True, no_cache=True)
+      return response
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+      # condition() computes the validators synchronously, so the versions
+      # are loaded here first and only read from the request afterwards.
+      keys = version_keys(request, *args, **kwargs)
+      await agetContentVersions(request, keys)
+
+      response = await conditionalView(request, *args, **kwargs)
+      if not freshlyRendered(request, response):
+        return response
+
+      if response.streaming or await aloadContentVersions(keys) != request.content_versions:
+        dropValidators(response)
+      else:
+        await caches[settings.RESPONSE_CACHE["CACHE"]].aset(
+          f"response:{etag(request, *args, **kwargs)}",
+          (response.content, response["Content-Type"]),
+          settings.RESPONSE_CACHE["TIMEOUT"]
+        )
+
+      return response
+
+    return wrapper
+
+  return decorator
+
+@receiver(post_save, sender=Photo)
+@receiver(post_delete, sender=Photo)
+def invalidatePhotoResponses(sender, instance, **kwargs):
+  keys = [FEED_VERSION_KEY]
+  if instance.album_id:
+    keys.append(albumVersionKey(instance.album_id))
+  bumpContentVersions(keys)
+
+@receiver(post_save, sender=Album)
+@receiver(post_delete, sender=Album)
+def invalidateAlbumResponses(sender, instance, **kwargs):
+  bumpContentVersions([FEED_VERSION_KEY, albumVersionKey(instance.id)])
+
+@receiver(pre_save, sender=User)
+def rememberStoredUsername(sender, instance, update_fields=None, **kwargs):
+  # Lets invalidateUploaderResponses tell whether the username really changed
+  if instance.pk is None or (update_fields is not None and "username" not in update_fields):
+    instance.stored_username = instance.username
+  else:
+    instance.stored_username = User.objects.filter(pk=instance.pk).values_list("username", flat=True).first()
+
+@receiver(post_save, sender=User)
+def invalidateUploaderResponses(sender, instance, created, **kwargs):
+  # Usernames appear in the feed and in album details; other fields do not
+  if created or getattr(instance, "stored_username", None) == instance.username:
+    return
+
+  album_ids = Album.objects.filter(user_id=instance.id).values_list("id", flat=True)
+  bumpContentVersions([FEED_VERSION_KEY] + [albumVersionKey(album_id) for album_id in album_ids])
@@ -1,24 +1,126 @@
-import sys
 import os
 import base64
 
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
 from io import BytesIO
+from django.conf import settings
 from django.core.files.uploadedfile import InMemoryUploadedFile
 
-def compressImage(image: InMemoryUploadedFile, max_width: int = 1200, quality: int = 85) -> BytesIO:
+# Bytes Pillow allocates per decoded pixel (RGB and RGBA both use 4), and how
+# many full-size bitmaps a decode holds at once (e.g. a mode conversion)
+BYTES_PER_PIXEL = 4
+DECODE_COPIES = 2
+
+class ImageTooLarge(ValueError):
   """
-  Compresses an image to a maximum width while maintaining aspect ratio.
-  
+  Raised when an image has more pixels than IMAGE_DECODE["MAX_PIXELS"].
+  """
+
+  def __init__(self, width: int, height: int):
+    max_pixels = settings.IMAGE_DECODE["MAX_PIXELS"]
+    super().__init__(f"Image is {width}x{height}, above the limit of {max_pixels / 1e6:g} megapixels")
+
+def openImage(image) -> Image.Image:
+  """
+  Opens an image, reading only its header, and enforces the maximum pixel count.
+
+  Args:
+    image: Django uploaded file, file object or path
+
+  Returns:
+    Image.Image: Lazily loaded image
+
+  Raises:
+    ImageTooLarge: If the image has too many pixels
+    ValueError: If the file is not an image Pillow can read
+  """
+  try:
+    img = Image.open(image)
+  except Image.DecompressionBombError:
+    raise ValueError(f"Image is above the limit of {settings.IMAGE_DECODE['MAX_PIXELS'] / 1e6:g} megapixels")
+  except (Image.UnidentifiedImageError, OSError):
+    raise ValueError("File is not a supported image")
+
+  width, height = img.size
+  if width * height > settings.IMAGE_DECODE["MAX_PIXELS"]:
+    raise ImageTooLarge(width, height)
+
+  return img
+
+def draftScale(width: int, image_format: str, max_width: int) -> int:
+  # Mirrors loadImage: JPEGs at least twice as wide as max_width are decoded
+  # at the largest 1/2, 1/4 or 1/8 scale that stays at least max_width wide
+  if image_format != "JPEG" or width < max_width * 2:
+    return 1
+
+  scale = 1
+  while scale < 8 and width // (scale * 2) >= max_width:
+    scale *= 2
+
+  return scale
+
+def estimateDecodeBytes(width: int, height: int, image_format: str, max_width: int) -> int:
+  """
+  Estimates the peak memory of decoding an image with loadImage, from its header alone.
+
+  Args:
+    width (int): Width of the image
+    height (int): Height of the image
+    image_format (str): Pillow format name (e.g. "JPEG"), or None if unknown
+    max_width (int): Width the image is decoded for
+
+  Returns:
+    int: Bytes
+  """
+  scale = draftScale(width, image_format, max_width)
+  decoded_pixels = -(-width // scale) * -(-height // scale)
+
+  return decoded_pixels * BYTES_PER_PIXEL * DECODE_COPIES
+
+def readImageHeader(image_file) -> dict:
+  """
+  Reads the dimensions and format of an uploaded image without decoding it.
+
+  Args:
+    image_file: Django uploaded file
+
+  Returns:
+    dict: width, height and format
+
+  Raises:
+    ImageTooLarge: If the image has too many pixels
+    ValueError: If the file is not an image Pillow can read
+  """
+  image_file.seek(0)
+  try:
+    img = openImage(image_file)
+    return {"width": img.width, "height": img.height, "format": img.format}
+  finally:
+    image_file.seek(0)
+
+def loadImage(image: InMemoryUploadedFile, max_width: int = 1200) -> Image.Image:
+  """
+  Decodes an image once, already scaled down to a maximum width.
+
+  JPEG sources that are at least twice as wide as max_width are decoded at a
+  reduced scale (1/2, 1/4 or 1/8) so the full-size bitmap is never allocated.
+
   Args:
     image: PIL Image object or Django uploaded file
-    max_width (int): Maximum width for the compressed image (default: 1200px)
-    quality (int): JPEG quality (1-100, default: 85)
-  
+    max_width (int): Maximum width of the returned image (default: 1200px)
+
   Returns:
-    BytesIO: Compressed image as BytesIO object
+    Image.Image: RGB image no wider than max_width
   """
-  img = Image.open(image) if not isinstance(image, Image.Image) else image
+  img = openImage(image) if not isinstance(image, Image.Image) else image
+
+  width, height = img.size
+  if width > max_width:
+    target_size = (max_width, max(1, int(height * max_width / width)))
+
+    if img.format == "JPEG" and width >= max_width * 2:
+      img.draft("RGB", target_size)
 
   if img.mode != 'RGB':
     img = img.convert('RGB')
@@ -26,14 +128,104 @@ def compressImage(image: InMemoryUploadedFile, max_width: int = 1200, quality: i
   width, height = img.size
   if width > max_width:
     ratio = max_width / width
-    img = img.resize((max_width, int(height * ratio)), Image.Resampling.LANCZOS)
+    img = img.resize((max_width, int(height * ratio)), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+  return img
+
+def encodeJpeg(img: Image.Image, quality: int = 85) -> BytesIO:
+  """
+  Encodes an image as an optimized JPEG.
+
+  Args:
+    img (Image.Image): Image to encode
+    quality (int): JPEG quality (1-100, default: 85)
 
+  Returns:
+    BytesIO: Encoded image as BytesIO object
+  """
   output = BytesIO()
   img.save(output, format='JPEG', quality=quality, optimize=True)
   output.seek(0)
 
   return output
 
+def compressImage(image: InMemoryUploadedFile, max_width: int = 1200, quality: int = 85) -> BytesIO:
+  """
+  Compresses an image to a maximum width while maintaining aspect ratio.
+  
+  Args:
+    image: PIL Image object or Django uploaded file
+    max_width (int): Maximum width for the compressed image (default: 1200px)
+    quality (int): JPEG quality (1-100, default: 85)
+  
+  Returns:
+    BytesIO: Compressed image as BytesIO object
+  """
+  return encodeJpeg(loadImage(image, max_width=max_width), quality=quality)
+
+@lru_cache(maxsize=32)
+def loadWatermarkFont(font_size: int) -> ImageFont.ImageFont:
+  """
+  Loads the watermark font at a given size, once per process.
+
+  Args:
+    font_size (int): Font size in pixels
+
+  Returns:
+    ImageFont.ImageFont: TrueType font, or Pillow's default font if unavailable
+  """
+  try:
+    return ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", font_size)
+  except:
+    return ImageFont.load_default()
+
+@lru_cache(maxsize=64)
+def renderWatermarkTile(watermark_text: str, font_size: int) -> Image.Image:
+  """
+  Pre-renders the watermark (translucent box plus text) as a small RGBA tile.
+
+  Args:
+    watermark_text (str): Text to use as watermark
+    font_size (int): Font size in pixels
+
+  Returns:
+    Image.Image: RGBA tile, with the text drawn 10px from the left and 5px from the top
+  """
+  font = loadWatermarkFont(font_size)
+  bbox = ImageDraw.Draw(Image.new('RGBA', (1, 1))).textbbox((0, 0), watermark_text, font=font)
+  text_width = bbox[2] - bbox[0]
+  text_height = bbox[3] - bbox[1]
+
+  tile = Image.new('RGBA', (text_width + 21, text_height + 11), (255, 255, 255, 180))
+  ImageDraw.Draw(tile).text((10, 5), watermark_text, fill=(100, 100, 100, 255), font=font)
+
+  return tile
+
+def drawWatermark(img: Image.Image, watermark_text: str = "TMF Marketplace") -> Image.Image:
+  """
+  Draws the watermark onto a decoded RGB image, in place.
+
+  Only the watermark's bounding box is blended, using a cached tile, so the
+  cost does not grow with the size of the image.
+
+  Args:
+    img (Image.Image): RGB image to watermark
+    watermark_text (str): Text to use as watermark (default: "TMF Marketplace")
+
+  Returns:
+    Image.Image: Watermarked RGB image
+  """
+  font_size = max(24, img.width // 20)
+  tile = renderWatermarkTile(watermark_text, font_size)
+
+  padding = 20
+  x = img.width - (tile.width - 21) - padding
+  y = img.height - (tile.height - 11) - padding
+
+  img.paste(tile, (x - 10, y - 5), tile)
+
+  return img
+
 def addWatermark(image_bytes: BytesIO, watermark_text: str = "TMF Marketplace") -> BytesIO:
   """
   Adds a watermark to an image.
@@ -48,54 +240,205 @@ def addWatermark(image_bytes: BytesIO, watermark_text: str = "TMF Marketplace")
   image_bytes.seek(0)
   img = Image.open(image_bytes).convert('RGB')
 
-  draw = ImageDraw.Draw(img)
+  return encodeJpeg(drawWatermark(img, watermark_text=watermark_text), quality=85)
+
+def processImageForUpload(image_file: InMemoryUploadedFile, max_width: int = 1200, quality: int = 85, watermark_text: str = "TMF Marketplace") -> BytesIO:
+  """
+  Processes an image by compressing it and adding a watermark to it.
+
+  The image is decoded once, watermarked in memory and encoded once, instead
+  of going through compressImage and addWatermark (two JPEG round trips).
   
-  font_size = max(24, img.width // 20)
-  try:
-    font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", font_size)
-  except:
-    font = ImageFont.load_default()
+  Args:
+    image_file (InMemoryUploadedFile): Django uploaded file or file path
+    max_width (int): Maximum width for compression (default: 1200px)
+    quality (int): JPEG quality (default: 85)
+    watermark_text (str): Watermark text (default: "TMF Marketplace")
+  
+  Returns:
+    BytesIO: Processed (compressed and watermarked) image as BytesIO object
+  """
+  img = loadImage(image_file, max_width=max_width)
+  img = drawWatermark(img, watermark_text=watermark_text)
+  return encodeJpeg(img, quality=quality)
 
-  bbox = draw.textbbox((0, 0), watermark_text, font=font)
-  text_width = bbox[2] - bbox[0]
-  text_height = bbox[3] - bbox[1]
+# Sizes of the image summary stored on each photo: the sample the dominant
+# color is taken from, and the width of the inline placeholder
+COLOR_SAMPLE_WIDTH = 64
+PLACEHOLDER_WIDTH = 16
 
-  padding = 20
-  x = img.width - text_width - padding
-  y = img.height - text_height - padding
-
-  overlay = Image.new('RGBA', img.size, (255, 255, 255, 0))
-  overlay_draw = ImageDraw.Draw(overlay)
-  overlay_draw.rectangle(
-    [x - 10, y - 5, x + text_width + 10, y + text_height + 5],
-    fill=(255, 255, 255, 180)
+def dominantColor(img: Image.Image) -> str:
+  """
+  Finds the most common color of an image after reducing it to a small palette.
+
+  Args:
+    img (Image.Image): RGB image (a small sample is enough)
+
+  Returns:
+    str: Hex color (e.g. "#a0b1c2")
+  """
+  palette_image = img.quantize(colors=5, method=Image.Quantize.MEDIANCUT)
+  _, index = max(palette_image.getcolors())
+  red, green, blue = palette_image.getpalette()[index * 3:index * 3 + 3]
+
+  return f"#{red:02x}{green:02x}{blue:02x}"
+
+def placeholderDataUri(img: Image.Image, quality: int = 50) -> str:
+  """
+  Encodes a tiny, blurry version of an image (LQIP) as an inline data URI.
+
+  Args:
+    img (Image.Image): RGB image (a small sample is enough)
+    quality (int): JPEG quality of the placeholder
+
+  Returns:
+    str: data:image/jpeg;base64 URI of a few hundred bytes
+  """
+  placeholder = img.resize(
+    (PLACEHOLDER_WIDTH, max(1, round(img.height * PLACEHOLDER_WIDTH / img.width))),
+    Image.Resampling.BOX
   )
+  content = encodeJpeg(placeholder, quality=quality).getvalue()
 
-  img = Image.alpha_composite(img.convert('RGBA'), overlay).convert('RGB')
-  ImageDraw.Draw(img).text((x, y), watermark_text, fill=(100, 100, 100), font=font)
+  return "data:image/jpeg;base64," + base64.b64encode(content).decode("ascii")
+
+def summarizeImage(img: Image.Image, width: int, height: int) -> dict:
+  """
+  Computes the image summary of a photo from an image already opened or decoded.
+
+  Args:
+    img (Image.Image): The image, opened or decoded at any size
+    width (int): Width of the original image
+    height (int): Height of the original image
+
+  Returns:
+    dict: width, height, dominant_color and placeholder
+  """
+  sample = loadImage(img, max_width=COLOR_SAMPLE_WIDTH)
+
+  return {
+    "width": width,
+    "height": height,
+    "dominant_color": dominantColor(sample),
+    "placeholder": placeholderDataUri(sample)
+  }
+
+def describeImage(image_file: InMemoryUploadedFile) -> dict:
+  """
+  Reads the dimensions of an image and computes its dominant color and placeholder.
+
+  The dimensions come from the header; the pixels are decoded at a reduced
+  scale (see loadImage), so this costs a fraction of a full decode. Photo
+  jobs get the summary from renderDerivatives instead; this is for photos
+  processed before summaries existed (backfillphotosummaries).
+
+  Args:
+    image_file (InMemoryUploadedFile): Django uploaded file or file path
+
+  Returns:
+    dict: width, height, dominant_color and placeholder
+  """
+  img = openImage(image_file)
+  return summarizeImage(img, *img.size)
+
+DERIVATIVE_ENCODERS = {
+  "jpeg": {"format": "JPEG", "extension": "jpg", "options": {"optimize": True}},
+  "webp": {"format": "WEBP", "extension": "webp", "options": {"method": 4}},
+  "avif": {"format": "AVIF", "extension": "avif", "options": {"speed": 8}},
+}
+
+def supportedDerivativeFormats(formats: list) -> list:
+  """
+  Filters derivative formats down to the ones this Pillow build can encode.
+
+  Args:
+    formats (list): Requested format keys (e.g. ["jpeg", "webp", "avif"])
+
+  Returns:
+    list: The requested formats that have an encoder available
+  """
+  Image.init()
+  return [
+    image_format for image_format in formats
+    if image_format in DERIVATIVE_ENCODERS and DERIVATIVE_ENCODERS[image_format]["format"] in Image.SAVE
+  ]
+
+def encodeImage(img: Image.Image, image_format: str, quality: int = 85) -> BytesIO:
+  """
+  Encodes an image in one of the derivative formats.
+
+  Args:
+    img (Image.Image): Image to encode
+    image_format (str): Key of DERIVATIVE_ENCODERS
+    quality (int): Encoder quality (1-100, default: 85)
+
+  Returns:
+    BytesIO: Encoded image as BytesIO object
+  """
+  encoder = DERIVATIVE_ENCODERS[image_format]
 
   output = BytesIO()
-  img.save(output, format='JPEG', quality=85, optimize=True)
+  img.save(output, format=encoder["format"], quality=quality, **encoder["options"])
   output.seek(0)
 
   return output
 
-def processImageForUpload(image_file: InMemoryUploadedFile, max_width: int = 1200, quality: int = 85, watermark_text: str = "TMF Marketplace") -> BytesIO:
+def renderDerivatives(image_file: InMemoryUploadedFile, widths: dict, formats: list, quality: int = 85, watermark_text: str = "TMF Marketplace", describe=None) -> list:
   """
-  Processes an image bt compressing it and adding a watermark to it.
-  
+  Renders every watermarked derivative of an image from a single decode.
+
+  The image is decoded at the largest requested width and watermarked once;
+  smaller sizes are downscaled from the previous one. Sizes wider than the
+  source collapse into a single derivative at the source width.
+
   Args:
     image_file (InMemoryUploadedFile): Django uploaded file or file path
-    max_width (int): Maximum width for compression (default: 1200px)
-    quality (int): JPEG quality (default: 85)
+    widths (dict): Derivative name -> maximum width (e.g. {"thumbnail": 320})
+    formats (list): Format keys to encode each size in; unsupported ones are skipped
+    quality (int): Encoder quality (default: 85)
     watermark_text (str): Watermark text (default: "TMF Marketplace")
-  
+    describe: Optional callable receiving the image summary (see summarizeImage),
+      taken from the same decode before the watermark is drawn
+
   Returns:
-    BytesIO: Processed (compressed and watermarked) image as BytesIO object
+    list: Dicts with name, format, extension, width, height and content (BytesIO), largest first
   """
-  compressed = compressImage(image_file, max_width = max_width, quality = quality)
-  watermarked = addWatermark(compressed, watermark_text = watermark_text)
-  return watermarked
+  formats = supportedDerivativeFormats(formats)
+  sizes = sorted(widths.items(), key=lambda item: item[1], reverse=True)
+
+  img = openImage(image_file)
+  source_width, source_height = img.size
+
+  current = loadImage(img, max_width=sizes[0][1])
+  if describe is not None:
+    describe(summarizeImage(current, source_width, source_height))
+  current = drawWatermark(current, watermark_text=watermark_text)
+
+  derivatives = []
+  rendered_widths = set()
+
+  for name, width in sizes:
+    if width < current.width:
+      current = current.resize(
+        (width, max(1, int(current.height * width / current.width))),
+        Image.Resampling.LANCZOS
+      )
+
+    if current.width in rendered_widths:
+      continue
+    rendered_widths.add(current.width)
+
+    for image_format in formats:
+      derivatives.append({
+        "name": name,
+        "format": image_format,
+        "extension": DERIVATIVE_ENCODERS[image_format]["extension"],
+        "width": current.width,
+        "height": current.height,
+        "content": encodeImage(current, image_format, quality=quality)
+      })
+
+  return derivatives
 
 def createInMemoryUploadedFile(image_bytes: BytesIO, original_filename: str) -> InMemoryUploadedFile:
   """
@@ -118,7 +461,7 @@ def createInMemoryUploadedFile(image_bytes: BytesIO, original_filename: str) ->
     None,
     new_filename,
     'image/jpeg',
-    sys.getsizeof(image_bytes),
+    image_bytes.getbuffer().nbytes,
     None
   )
 
@@ -154,7 +497,7 @@ def base64ToImageFile(base64_string: str, filename: str) -> InMemoryUploadedFile
       None,
       filename,
       content_type,
-      sys.getsizeof(image_bytes),
+      image_bytes.getbuffer().nbytes,
       None
     )
     
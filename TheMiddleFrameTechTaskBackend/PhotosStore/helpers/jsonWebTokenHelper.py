@@ -1,7 +1,17 @@
-import os
 import jwt
 import datetime
 
+from django.conf import settings
+
+def getSecret() -> str:
+  """
+  Returns the signing secret (the SECRET environment variable, see settings).
+
+  Returns:
+    str: The JWT signing secret
+  """
+  return settings.SECRET
+
 def encode(info: dict) -> str:
   """
   Encodes a dictionary into a JWT (JSON Web Token) with an expiration date.
@@ -17,7 +27,7 @@ def encode(info: dict) -> str:
 
   return jwt.encode(
     info,
-    os.getenv("SECRET"),
+    getSecret(),
     algorithm='HS256'
   )
 
@@ -33,6 +43,6 @@ def decode(token: str) -> dict:
   """
   return jwt.decode(
     token,
-    os.getenv("SECRET"),
+    getSecret(),
     algorithms=['HS256']
   )
\ No newline at end of file
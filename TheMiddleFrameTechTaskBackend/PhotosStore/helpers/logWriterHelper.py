@@ -0,0 +1,187 @@
+import os
+import time
+import queue
+import atexit
+import threading
+
+class BackgroundLogWriter:
+  """
+  Appends lines to a log file from a background thread.
+
+  Callers only enqueue strings; the writer thread drains whatever has piled up
+  into a single write, and rotates the file once it exceeds max_bytes. When the
+  queue is full, lines are dropped (and counted) rather than blocking requests.
+  A write that fails (full disk, log directory removed...) is retried with the
+  file reopened, after a delay doubling up to MAX_RETRY_DELAY seconds.
+  """
+
+  STOP = object()
+  RETRY_DELAY = 0.5
+  MAX_RETRY_DELAY = 30
+
+  def __init__(self, path: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5, batch_size: int = 200, queue_size: int = 10000):
+    """
+    Args:
+      path (str): Log file path
+      max_bytes (int): Size after which the file is rotated (0 disables rotation)
+      backup_count (int): Number of rotated files kept (path.1 ... path.N)
+      batch_size (int): Maximum number of lines written per batch
+      queue_size (int): Maximum number of lines waiting to be written
+    """
+    self.path = path
+    self.max_bytes = max_bytes
+    self.backup_count = backup_count
+    self.batch_size = batch_size
+    self.queue = queue.Queue(maxsize=queue_size)
+    self.dropped = 0
+    self.dropped_lock = threading.Lock()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    self.thread = threading.Thread(target=self.run, name=f"log-writer:{os.path.basename(path)}", daemon=True)
+    self.thread.start()
+    atexit.register(self.close)
+
+  def write(self, line: str):
+    """
+    Queues a line for writing without blocking.
+
+    Args:
+      line (str): Line to append (a newline is added)
+    """
+    try:
+      self.queue.put_nowait(line)
+    except queue.Full:
+      with self.dropped_lock:
+        self.dropped += 1
+
+  def takeDropped(self) -> int:
+    with self.dropped_lock:
+      dropped, self.dropped = self.dropped, 0
+    return dropped
+
+  def nextBatch(self) -> tuple:
+    """
+    Waits for lines and takes up to batch_size of them.
+
+    Returns:
+      tuple: (lines, whether close() was called)
+    """
+    lines = [self.queue.get()]
+    while len(lines) < self.batch_size:
+      try:
+        lines.append(self.queue.get_nowait())
+      except queue.Empty:
+        break
+
+    stop = any(line is self.STOP for line in lines)
+    lines = [line for line in lines if line is not self.STOP]
+
+    dropped = self.takeDropped()
+    if dropped:
+      lines.append(f"[logger] dropped {dropped} line(s), queue was full")
+
+    return lines, stop
+
+  def openFile(self):
+    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+    return open(self.path, "a", encoding="utf-8")
+
+  def run(self):
+    logs_file = None
+    lines = []
+    stop = False
+    delay = self.RETRY_DELAY
+
+    try:
+      while True:
+        # A batch that failed to be written is retried before taking more
+        if not lines:
+          lines, stop = self.nextBatch()
+
+        try:
+          if lines:
+            if logs_file is None:
+              logs_file = self.openFile()
+            logs_file.write("\n".join(lines) + "\n")
+            logs_file.flush()
+            lines = []
+            delay = self.RETRY_DELAY
+
+            if self.max_bytes and logs_file.tell() >= self.max_bytes:
+              logs_file.close()
+              logs_file = None
+              self.rotate()
+
+        except OSError:
+          if logs_file is not None:
+            try:
+              logs_file.close()
+            except OSError:
+              pass
+            logs_file = None
+
+          if stop:
+            return
+
+          time.sleep(delay)
+          delay = min(delay * 2, self.MAX_RETRY_DELAY)
+          continue
+
+        if stop:
+          return
+
+    finally:
+      if logs_file is not None:
+        logs_file.close()
+
+  def rotate(self):
+    """
+    Shifts path.1 ... path.N-1 up by one and moves the current file to path.1.
+    """
+    if self.backup_count < 1:
+      os.remove(self.path)
+      return
+
+    for index in range(self.backup_count - 1, 0, -1):
+      source = f"{self.path}.{index}"
+      if os.path.exists(source):
+        os.replace(source, f"{self.path}.{index + 1}")
+
+    os.replace(self.path, f"{self.path}.1")
+
+  def close(self, timeout: float = 5.0):
+    """
+    Writes the remaining lines and stops the writer thread.
+
+    Args:
+      timeout (float): Seconds to wait for the queue to drain
+    """
+    if not self.thread.is_alive():
+      return
+
+    try:
+      self.queue.put(self.STOP, timeout=timeout)
+    except queue.Full:
+      return
+
+    self.thread.join(timeout)
+
+writers = {}
+writers_lock = threading.Lock()
+
+def getLogWriter(path: str, **options) -> BackgroundLogWriter:
+  """
+  Returns the process-wide writer of a log file, creating it on first use.
+
+  Args:
+    path (str): Log file path
+    **options: BackgroundLogWriter options, used only when the writer is created
+
+  Returns:
+    BackgroundLogWriter: Writer shared by every caller logging to path
+  """
+  with writers_lock:
+    if path not in writers:
+      writers[path] = BackgroundLogWriter(path, **options)
+    return writers[path]
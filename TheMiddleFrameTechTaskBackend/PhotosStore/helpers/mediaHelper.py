@@ -0,0 +1,127 @@
+import io
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from ..storages.hashedStorage import isHashedName
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+RANGE_HEADER = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def mediaCacheControl(name: str) -> str:
+  """
+  Returns the Cache-Control value for a media file.
+
+  Args:
+    name (str): Storage name of the file
+
+  Returns:
+    str: Immutable for content-hashed names, a short max-age otherwise
+  """
+  if isHashedName(name):
+    return f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+
+  return f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}"
+
+def parseRange(header: str, size: int):
+  """
+  Parses a single-range Range header against a file size.
+
+  Multiple ranges are not supported and, like a malformed header, are
+  ignored so the whole file is sent.
+
+  Args:
+    header (str): Value of the Range header (may be None)
+    size (int): Size of the file in bytes
+
+  Returns:
+    tuple: (start, length) of the requested range, None to send the whole file
+
+  Raises:
+    ValueError: If the range cannot be satisfied (416)
+  """
+  match = RANGE_HEADER.match(header.strip()) if header else None
+  if not match or match.group(1) == match.group(2) == "":
+    return None
+
+  first, last = match.groups()
+  if first == "":
+    # Suffix range: the last N bytes
+    length = min(int(last), size)
+    if length == 0:
+      raise ValueError("Range not satisfiable")
+    return size - length, length
+
+  start = int(first)
+  end = min(int(last), size - 1) if last else size - 1
+  if start >= size or end < start:
+    raise ValueError("Range not satisfiable")
+
+  return start, end - start + 1
+
+class FileRange:
+  """
+  Read-only view of a byte range of an open file.
+
+  It is seekable and sized to the range, so FileResponse sets the right
+  Content-Length, and it keeps the file's descriptor positioned at the range,
+  so a WSGI server's file_wrapper can still sendfile() it.
+  """
+
+  def __init__(self, file, start: int, length: int):
+    self.file = file
+    self.name = getattr(file, "name", "")
+    self.start = start
+    self.length = length
+    self.position = 0
+    self.seek(0)
+
+  def seekable(self) -> bool:
+    return True
+
+  def tell(self) -> int:
+    return self.position
+
+  def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+    base = {io.SEEK_SET: 0, io.SEEK_CUR: self.position, io.SEEK_END: self.length}[whence]
+    self.position = min(max(base + offset, 0), self.length)
+    self.file.seek(self.start + self.position)
+    return self.position
+
+  def read(self, size: int = -1) -> bytes:
+    remaining = self.length - self.position
+    size = remaining if size is None or size < 0 else min(size, remaining)
+    data = self.file.read(size) if size else b""
+    self.position += len(data)
+    return data
+
+  def fileno(self) -> int:
+    return self.file.fileno()
+
+  def close(self):
+    self.file.close()
+
+async def aiterFile(filelike, block_size: int):
+  """
+  Reads a file in blocks on worker threads, for streaming under ASGI.
+
+  Django would otherwise read a sync file iterator into a list before
+  sending it to an ASGI server.
+
+  Args:
+    filelike: Open file (or FileRange)
+    block_size (int): Bytes per chunk
+
+  Yields:
+    bytes: Successive chunks of the file
+  """
+  try:
+    while True:
+      chunk = await sync_to_async(filelike.read, thread_sensitive=False)(block_size)
+      if not chunk:
+        break
+      yield chunk
+
+  finally:
+    filelike.close()
@@ -0,0 +1,168 @@
+import json
+import base64
+
+from datetime import datetime
+from django.db.models import Q
+
+def encodeCursor(created_at: datetime, row_id: int) -> str:
+  """
+  Encodes the keyset position of a row into an opaque cursor string.
+
+  Args:
+    created_at (datetime): Creation timestamp of the last row of a page
+    row_id (int): Primary key of the last row of a page
+
+  Returns:
+    str: URL-safe cursor string
+  """
+  payload = json.dumps({
+    "created_at": created_at.isoformat(),
+    "id": row_id
+  })
+  return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decodeCursor(cursor: str) -> tuple:
+  """
+  Decodes a cursor produced by encodeCursor back into its keyset position.
+
+  Args:
+    cursor (str): Cursor string received from the client
+
+  Returns:
+    tuple: (created_at, id) of the last row the client has already seen
+
+  Raises:
+    ValueError: If the cursor is malformed
+  """
+  try:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    return datetime.fromisoformat(payload["created_at"]), int(payload["id"])
+
+  except Exception:
+    raise ValueError("Invalid cursor")
+
+def encodeRankCursor(rank: float, row_id: int) -> str:
+  """
+  Encodes the position of a row in ranked (e.g. search) results into an opaque cursor string.
+
+  Args:
+    rank (float): Rank of the last row of a page
+    row_id (int): Primary key of the last row of a page
+
+  Returns:
+    str: URL-safe cursor string
+  """
+  payload = json.dumps({
+    "rank": rank,
+    "id": row_id
+  })
+  return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decodeRankCursor(cursor: str) -> tuple:
+  """
+  Decodes a cursor produced by encodeRankCursor back into its position.
+
+  Args:
+    cursor (str): Cursor string received from the client
+
+  Returns:
+    tuple: (rank, id) of the last row the client has already seen
+
+  Raises:
+    ValueError: If the cursor is malformed
+  """
+  try:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    return float(payload["rank"]), int(payload["id"])
+
+  except Exception:
+    raise ValueError("Invalid cursor")
+
+def afterCursor(queryset, cursor: str):
+  """
+  Restricts a queryset ordered by ('-created_at', '-id') to the rows after a cursor.
+
+  Args:
+    queryset (QuerySet): Queryset ordered newest first
+    cursor (str): Cursor of the previous page (may be None or empty)
+
+  Returns:
+    QuerySet: The rows following the cursor position
+
+  Raises:
+    ValueError: If the cursor is malformed
+  """
+  if not cursor:
+    return queryset
+
+  last_created_at, last_id = decodeCursor(cursor)
+  return queryset.filter(
+    Q(created_at__lt=last_created_at) |
+    Q(created_at=last_created_at, id__lt=last_id)
+  )
+
+def parseLimit(value: str, default: int, maximum: int) -> int:
+  """
+  Parses a page size query parameter and clamps it to the allowed range.
+
+  Args:
+    value (str): Raw query parameter value (may be None)
+    default (int): Page size used when no value is given
+    maximum (int): Largest page size a client may request
+
+  Returns:
+    int: Page size between 1 and maximum
+
+  Raises:
+    ValueError: If the value is not a positive integer
+  """
+  if value in (None, ""):
+    return default
+
+  try:
+    limit = int(value)
+  except (TypeError, ValueError):
+    raise ValueError("Limit must be a positive integer")
+
+  if limit < 1:
+    raise ValueError("Limit must be a positive integer")
+
+  return min(limit, maximum)
+
+def streamJsonArray(rows, serialize):
+  """
+  Lazily serializes an iterable of rows as a JSON array, one element at a time.
+
+  Args:
+    rows: Iterable of rows, typically a QuerySet.iterator()
+    serialize: Callable that converts a row into a JSON-serializable dict
+
+  Yields:
+    str: Consecutive fragments of the JSON document
+  """
+  yield "["
+  separator = ""
+  for row in rows:
+    yield separator + json.dumps(serialize(row))
+    separator = ","
+  yield "]"
+
+async def astreamJsonArray(rows, serialize):
+  """
+  Async counterpart of streamJsonArray for async views.
+
+  Args:
+    rows: Async iterable of rows, typically a QuerySet.aiterator()
+    serialize: Callable that converts a row into a JSON-serializable dict
+
+  Yields:
+    str: Consecutive fragments of the JSON document
+  """
+  yield "["
+  separator = ""
+  async for row in rows:
+    yield separator + json.dumps(serialize(row))
+    separator = ","
+  yield "]"
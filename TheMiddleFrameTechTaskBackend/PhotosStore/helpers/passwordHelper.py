@@ -0,0 +1,130 @@
+import asyncio
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from ..models.user import User
+
+class PasswordHashingBusy(Exception):
+  """
+  Raised when every hashing thread is busy and the wait queue is full.
+  """
+
+  def __init__(self, retry_after: int):
+    super().__init__("Too many sign-ins in progress, please retry shortly")
+    self.retry_after = retry_after
+
+class HashingExecutor:
+  """
+  Thread pool dedicated to password hashing, with a bounded number of waiting calls.
+
+  hashlib releases the GIL while hashing, so the pool size caps the cores
+  sign-ins can use; calls beyond the queue are refused instead of holding
+  request workers that other endpoints need.
+  """
+
+  def __init__(self, workers: int, queue: int):
+    self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hashing")
+    self.slots = threading.BoundedSemaphore(workers + queue)
+
+  def submit(self, func, *args):
+    if not self.slots.acquire(blocking=False):
+      raise PasswordHashingBusy(settings.PASSWORD_HASHING["RETRY_AFTER"])
+
+    try:
+      future = self.executor.submit(func, *args)
+    except BaseException:
+      self.slots.release()
+      raise
+
+    future.add_done_callback(lambda _: self.slots.release())
+    return future
+
+  def run(self, func, *args):
+    return self.submit(func, *args).result()
+
+  async def arun(self, func, *args):
+    return await asyncio.wrap_future(self.submit(func, *args))
+
+hashing_executor = None
+hashing_executor_lock = threading.Lock()
+
+def hashingExecutor() -> HashingExecutor:
+  # Created on first use, so no threads exist before a server forks its workers
+  global hashing_executor
+
+  with hashing_executor_lock:
+    if hashing_executor is None:
+      hashing_executor = HashingExecutor(
+        max(1, settings.PASSWORD_HASHING["WORKERS"]),
+        max(0, settings.PASSWORD_HASHING["QUEUE"])
+      )
+    return hashing_executor
+
+def verifyPassword(password: str, encoded: str) -> tuple:
+  """
+  Checks a password and re-hashes it if the stored hash uses outdated parameters.
+
+  Args:
+    password (str): Password as typed
+    encoded (str): Stored hash
+
+  Returns:
+    tuple: (valid, new hash to store or None)
+  """
+  upgraded = []
+  valid = check_password(password, encoded, setter=lambda raw_password: upgraded.append(make_password(raw_password)))
+
+  return valid, upgraded[0] if upgraded else None
+
+def storeUpgradedHash(user: User, encoded: str):
+  # Only replaces the hash that was verified, never a password changed meanwhile
+  User.objects.filter(id=user.id, password=user.password).update(password=encoded)
+  user.password = encoded
+
+async def astoreUpgradedHash(user: User, encoded: str):
+  await User.objects.filter(id=user.id, password=user.password).aupdate(password=encoded)
+  user.password = encoded
+
+def checkPassword(password: str, user: User) -> bool:
+  """
+  Checks a user's password on the hashing pool, upgrading its hash when the hasher settings changed.
+
+  Args:
+    password (str): Password as typed
+    user (User): User signing in
+
+  Returns:
+    bool: True if the password is correct
+
+  Raises:
+    PasswordHashingBusy: If the hashing pool is saturated
+  """
+  valid, upgraded = hashingExecutor().run(verifyPassword, password, user.password)
+  if upgraded:
+    storeUpgradedHash(user, upgraded)
+
+  return valid
+
+async def acheckPassword(password: str, user: User) -> bool:
+  valid, upgraded = await hashingExecutor().arun(verifyPassword, password, user.password)
+  if upgraded:
+    await astoreUpgradedHash(user, upgraded)
+
+  return valid
+
+def hashPassword(password: str) -> str:
+  """
+  Hashes a new password on the hashing pool.
+
+  Args:
+    password (str): Password as typed
+
+  Returns:
+    str: Hash to store
+
+  Raises:
+    PasswordHashingBusy: If the hashing pool is saturated
+  """
+  return hashingExecutor().run(make_password, password)
@@ -0,0 +1,319 @@
+import os
+import time
+import django
+import multiprocessing
+
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from ..models.photo import Photo
+from ..models.photoJob import PhotoJob
+from ..models.photoDerivative import PhotoDerivative
+from ..models.fileTombstone import FileTombstone
+from .imageHelper import renderDerivatives, createInMemoryUploadedFile, estimateDecodeBytes, ImageTooLarge
+from .decodeBudgetHelper import MemoryBudget, decodeBudget
+from .blobHelper import deleteDerivatives, SUMMARY_FIELDS
+from .albumStatsHelper import updateAlbumStats
+
+def enqueuePhotoJob(photo: Photo) -> PhotoJob:
+  """
+  Queues the compression and watermarking of a freshly stored photo.
+
+  Args:
+    photo (Photo): Photo whose original image has already been saved
+
+  Returns:
+    PhotoJob: The pending job
+  """
+  if not getattr(settings, "PHOTO_JOBS_INLINE", False):
+    return PhotoJob.objects.create(photo=photo)
+
+  job = PhotoJob.objects.create(
+    photo=photo,
+    status=PhotoJob.STATUS_RUNNING,
+    attempts=1,
+    started_at=timezone.now()
+  )
+  processPhotoJob(job.id)
+  job.refresh_from_db()
+  photo.refresh_from_db(fields=["status", "compressed_image"])
+
+  return job
+
+def jobDecodeBytes(width: int, height: int, original_name: str) -> int:
+  """
+  Estimates the memory a job's decode needs, from the dimensions read at upload.
+
+  Args:
+    width (int): Width of the original, or None if unknown
+    height (int): Height of the original, or None if unknown
+    original_name (str): Storage name of the original
+
+  Returns:
+    int: Bytes (the whole budget when the dimensions are unknown, so the job runs alone)
+  """
+  if not width or not height:
+    return settings.IMAGE_DECODE["MEMORY_BUDGET"]
+
+  image_format = "JPEG" if os.path.splitext(original_name)[1].lower() in (".jpg", ".jpeg") else None
+  return estimateDecodeBytes(width, height, image_format, max(settings.PHOTO_DERIVATIVE_WIDTHS.values()))
+
+def retryDelay(attempts: int) -> int:
+  """
+  Returns how long to wait before retrying a job, doubling with each failed attempt.
+
+  Args:
+    attempts (int): Attempts made so far (at least 1)
+
+  Returns:
+    int: Seconds
+  """
+  delay = getattr(settings, "PHOTO_JOBS_RETRY_DELAY", 30) * 2 ** max(0, attempts - 1)
+  return min(delay, getattr(settings, "PHOTO_JOBS_RETRY_MAX_DELAY", 3600))
+
+def awaitingOriginal(job: PhotoJob, error: Exception, original_opened: bool) -> bool:
+  """
+  Tells whether a job failed only because its original has not reached the storage yet.
+
+  With write-behind object storage, a worker on another node can pick a job
+  up before the node that took the upload has sent the original; that is
+  worth waiting for, up to PHOTO_JOBS_MISSING_ORIGINAL_TIMEOUT after the upload.
+
+  Args:
+    job (PhotoJob): The failed job
+    error (Exception): What it failed with
+    original_opened (bool): Whether the original could be opened
+
+  Returns:
+    bool: True if the job should wait for the original without using up an attempt
+  """
+  timeout = timedelta(seconds=getattr(settings, "PHOTO_JOBS_MISSING_ORIGINAL_TIMEOUT", 3600))
+  return isinstance(error, FileNotFoundError) and not original_opened and timezone.now() - job.created_at < timeout
+
+def claimPhotoJobs(limit: int, budget: MemoryBudget = None) -> list:
+  """
+  Atomically marks up to `limit` pending jobs as running and returns their ids.
+
+  Jobs left running longer than PHOTO_JOBS_STALE_SECONDS (e.g. after a worker
+  crash) are put back in the queue first; jobs waiting out a retry delay
+  (run_after) are skipped. With a budget, jobs are claimed in
+  order only while the memory of their decodes fits in it; the caller
+  releases each job's cost when it finishes.
+
+  Args:
+    limit (int): Maximum number of jobs to claim
+    budget (MemoryBudget): Decode memory budget to reserve from
+
+  Returns:
+    list: (job id, reserved bytes) of the jobs claimed by this caller
+  """
+  stale_before = timezone.now() - timedelta(seconds=getattr(settings, "PHOTO_JOBS_STALE_SECONDS", 600))
+  PhotoJob.objects.filter(
+    status=PhotoJob.STATUS_RUNNING,
+    started_at__lt=stale_before
+  ).update(status=PhotoJob.STATUS_PENDING)
+
+  now = timezone.now()
+  candidates = PhotoJob.objects.filter(
+    Q(run_after__isnull=True) | Q(run_after__lte=now),
+    status=PhotoJob.STATUS_PENDING
+  ).order_by("created_at").values_list("id", "attempts", "photo__width", "photo__height", "photo__original_image")[:limit]
+
+  claimed = []
+  for job_id, attempts, width, height, original_name in candidates:
+    cost = jobDecodeBytes(width, height, original_name) if budget else 0
+    # Later, smaller jobs are not claimed around one that does not fit, so
+    # large photos are not starved
+    if budget and not budget.acquire(cost, timeout=0):
+      break
+
+    # The conditional update is the lock: only one worker can move a
+    # given job out of the pending state.
+    won = PhotoJob.objects.filter(id=job_id, status=PhotoJob.STATUS_PENDING).update(
+      status=PhotoJob.STATUS_RUNNING,
+      attempts=attempts + 1,
+      started_at=now
+    )
+    if won:
+      claimed.append((job_id, cost))
+    elif budget:
+      budget.release(cost)
+
+  return claimed
+
+def processPhotoJob(job_id: int) -> str:
+  """
+  Renders the watermarked derivatives (and compressed image) of a job's photo.
+
+  Callers running jobs concurrently keep their decodes within the memory
+  budget (see uploadPhotos and runPhotoJobWorker).
+
+  Args:
+    job_id (int): Id of the job to run
+
+  Returns:
+    str: Final status of the job
+  """
+  job = PhotoJob.objects.select_related("photo").get(id=job_id)
+  photo = job.photo
+  was_ready = photo.status == Photo.STATUS_READY
+  previous_compressed = photo.compressed_image.name
+  written = []
+  original_opened = False
+
+  summary = {}
+
+  try:
+    with photo.original_image.open("rb") as original:
+      original_opened = True
+      # The summary is taken from the decode the derivatives are rendered from
+      derivatives = renderDerivatives(
+        original,
+        settings.PHOTO_DERIVATIVE_WIDTHS,
+        settings.PHOTO_DERIVATIVE_FORMATS,
+        describe=summary.update
+      )
+
+    original_filename = os.path.basename(photo.original_image.name)
+    base_name = os.path.splitext(original_filename)[0]
+
+    # The largest JPEG doubles as the photo's compressed image, which older
+    # clients keep using.
+    largest_jpeg = next(derivative for derivative in derivatives if derivative["format"] == "jpeg")
+    compressed_file = createInMemoryUploadedFile(largest_jpeg["content"], original_filename)
+    photo.compressed_image.save(compressed_file.name, compressed_file, save=False)
+    written.append(photo.compressed_image.name)
+
+    for field, value in summary.items():
+      setattr(photo, field, value)
+    photo.original_size = photo.original_image.size
+    photo.compressed_size = len(largest_jpeg["content"].getvalue())
+
+    deleteDerivatives(photo)
+    for derivative in derivatives:
+      photo_derivative = PhotoDerivative(
+        photo=photo,
+        name=derivative["name"],
+        format=derivative["format"],
+        width=derivative["width"],
+        height=derivative["height"]
+      )
+      photo_derivative.image.save(
+        f"{base_name}_{derivative['name']}.{derivative['extension']}",
+        ContentFile(derivative["content"].getvalue()),
+        save=False
+      )
+      written.append(photo_derivative.image.name)
+      photo_derivative.save()
+
+    photo.status = Photo.STATUS_READY
+    with transaction.atomic():
+      photo.save(update_fields=["compressed_image", "status", *SUMMARY_FIELDS])
+      updateAlbumStats(photo.album_id, 0 if was_ready else 1)
+      # The compressed image being replaced (reprocessing) goes to the
+      # collector, which keeps it while another photo still shares it
+      if previous_compressed:
+        FileTombstone.objects.create(name=previous_compressed)
+
+    job.status = PhotoJob.STATUS_DONE
+    job.error = ""
+
+  except Exception as e:
+    # Files saved before the failure may be referenced by nothing; the
+    # collector deletes the ones that are not
+    FileTombstone.objects.bulk_create([FileTombstone(name=name) for name in written])
+
+    job.error = str(e)
+    job.status = PhotoJob.STATUS_PENDING
+    job.run_after = timezone.now() + timedelta(seconds=retryDelay(job.attempts))
+
+    if awaitingOriginal(job, e, original_opened):
+      job.attempts -= 1
+      job.run_after = timezone.now() + timedelta(seconds=getattr(settings, "PHOTO_JOBS_MISSING_ORIGINAL_DELAY", 5))
+
+    # An image over the pixel limit fails the same way on every attempt
+    elif isinstance(e, ImageTooLarge) or job.attempts >= getattr(settings, "PHOTO_JOBS_MAX_ATTEMPTS", 3):
+      job.status = PhotoJob.STATUS_FAILED
+      photo.status = Photo.STATUS_FAILED
+      with transaction.atomic():
+        photo.save(update_fields=["status"])
+        updateAlbumStats(photo.album_id, -1 if was_ready else 0)
+
+  job.save(update_fields=["status", "attempts", "error", "run_after", "updated_at"])
+  return job.status
+
+def runPhotoJobWorker(workers: int, poll_interval: float = 1.0, once: bool = False, log=None):
+  """
+  Runs queued photo jobs in a bounded pool of worker processes.
+
+  The decodes of the jobs in flight, across all processes, are kept within
+  IMAGE_DECODE["MEMORY_BUDGET"]; jobs that do not fit wait in the queue.
+
+  Args:
+    workers (int): Number of worker processes (and jobs in flight)
+    poll_interval (float): Seconds to sleep when the queue is empty
+    once (bool): Stop as soon as the queue is drained
+    log: Optional callable receiving progress messages
+  """
+  def createExecutor():
+    # Worker processes are spawned rather than forked so they never share the
+    # parent's database connections; each one sets Django up on its own.
+    return ProcessPoolExecutor(
+      max_workers=workers,
+      mp_context=multiprocessing.get_context("spawn"),
+      initializer=django.setup
+    )
+
+  executor = createExecutor()
+  budget = decodeBudget()
+  in_flight = {}
+
+  try:
+    while True:
+      free_slots = workers - len(in_flight)
+      if free_slots > 0:
+        for job_id, cost in claimPhotoJobs(free_slots, budget):
+          in_flight[executor.submit(processPhotoJob, job_id)] = (job_id, cost)
+
+      if not in_flight:
+        if once:
+          return
+        connections.close_all()
+        time.sleep(poll_interval)
+        continue
+
+      done, _ = wait(in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+      pool_broken = False
+      for future in done:
+        job_id, cost = in_flight.pop(future)
+        budget.release(cost)
+        try:
+          status = future.result()
+        except Exception as e:
+          status = f"crashed ({e})"
+          pool_broken = pool_broken or isinstance(e, BrokenProcessPool)
+          PhotoJob.objects.filter(id=job_id).update(
+            status=PhotoJob.STATUS_PENDING,
+            error=str(e),
+            run_after=timezone.now() + timedelta(seconds=getattr(settings, "PHOTO_JOBS_RETRY_DELAY", 30))
+          )
+        if log:
+          log(f"Job {job_id}: {status}")
+
+      # A worker killed mid-job (e.g. by the OOM killer) breaks the whole
+      # pool, so the remaining jobs are re-queued and a fresh pool started.
+      if pool_broken:
+        for job_id, cost in in_flight.values():
+          budget.release(cost)
+          PhotoJob.objects.filter(id=job_id).update(status=PhotoJob.STATUS_PENDING)
+        in_flight.clear()
+        executor.shutdown(wait=False, cancel_futures=True)
+        executor = createExecutor()
+
+  finally:
+    executor.shutdown(wait=True, cancel_futures=True)
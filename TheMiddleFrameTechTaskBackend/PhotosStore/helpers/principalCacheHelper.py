@@ -0,0 +1,199 @@
+import time
+import threading
+
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router, transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from ..models.user import User
+from .jsonWebTokenHelper import decode
+
+PRINCIPAL_FIELDS = ("id", "username", "email", "role", "created_at")
+
+class TTLCache:
+  """
+  Thread-safe LRU cache whose entries also expire after a per-entry TTL.
+  """
+
+  def __init__(self, max_entries: int):
+    self.max_entries = max_entries
+    self.entries = OrderedDict()
+    self.lock = threading.Lock()
+
+  def get(self, key):
+    with self.lock:
+      entry = self.entries.get(key)
+      if entry is None:
+        return None
+
+      value, expires_at = entry
+      if expires_at <= time.monotonic():
+        del self.entries[key]
+        return None
+
+      self.entries.move_to_end(key)
+      return value
+
+  def set(self, key, value, ttl: float):
+    if ttl <= 0:
+      return
+
+    with self.lock:
+      self.entries[key] = (value, time.monotonic() + ttl)
+      self.entries.move_to_end(key)
+      while len(self.entries) > self.max_entries:
+        self.entries.popitem(last=False)
+
+  def delete(self, key):
+    with self.lock:
+      self.entries.pop(key, None)
+
+  def clear(self):
+    with self.lock:
+      self.entries.clear()
+
+token_cache = TTLCache(settings.AUTH_PRINCIPAL_CACHE["MAX_ENTRIES"])
+principal_cache = TTLCache(settings.AUTH_PRINCIPAL_CACHE["MAX_ENTRIES"])
+
+def sharedCache():
+  """
+  Returns the optional cross-process cache configured for principals.
+
+  Returns:
+    BaseCache: Django cache named by AUTH_PRINCIPAL_CACHE["SHARED_CACHE"], or None
+  """
+  alias = settings.AUTH_PRINCIPAL_CACHE["SHARED_CACHE"]
+  return caches[alias] if alias else None
+
+def principalKey(user_id) -> str:
+  return f"auth:principal:{user_id}"
+
+def decodeTokenCached(token: str) -> dict:
+  """
+  Decodes a JWT, reusing the result for repeated requests with the same token.
+
+  Cached payloads never outlive the token's own expiry. Invalid and expired
+  tokens are not cached, so they raise the same errors as decode().
+
+  Args:
+    token (str): The encoded JWT as a string.
+
+  Returns:
+    dict: The decoded information contained in the JWT.
+  """
+  decoded_token = token_cache.get(token)
+  if decoded_token is not None:
+    return decoded_token
+
+  decoded_token = decode(token)
+
+  ttl = settings.AUTH_PRINCIPAL_CACHE["TTL"]
+  if "exp" in decoded_token:
+    ttl = min(ttl, decoded_token["exp"] - time.time())
+
+  token_cache.set(token, decoded_token, ttl)
+  return decoded_token
+
+def principalFromFields(fields: dict) -> User:
+  """
+  Builds a user instance from cached PRINCIPAL_FIELDS, as if loaded with only().
+
+  The other fields (the password hash) are deferred rather than blank, so
+  saving the instance writes only the loaded fields and never clears them.
+
+  Args:
+    fields (dict): Values of PRINCIPAL_FIELDS
+
+  Returns:
+    User: Instance of an existing row
+  """
+  names = [field.attname for field in User._meta.concrete_fields if field.attname in fields]
+  return User.from_db(router.db_for_read(User), names, [fields[name] for name in names])
+
+def getPrincipal(user_id: int) -> User:
+  """
+  Returns the user behind a token from the local cache, the shared cache or the database.
+
+  The returned instance only loads PRINCIPAL_FIELDS (the password hash is
+  deferred) and is a fresh object per call, so callers may use it as a
+  foreign key value.
+
+  Args:
+    user_id (int): Id of the authenticated user
+
+  Returns:
+    User: The authenticated user
+
+  Raises:
+    User.DoesNotExist: If the user does not exist
+  """
+  ttl = settings.AUTH_PRINCIPAL_CACHE["TTL"]
+  fields = principal_cache.get(user_id)
+
+  if fields is None:
+    shared = sharedCache()
+    fields = shared.get(principalKey(user_id)) if shared else None
+
+    if fields is None:
+      fields = User.objects.filter(id=user_id).values(*PRINCIPAL_FIELDS).get()
+      if shared:
+        shared.set(principalKey(user_id), fields, ttl)
+
+    principal_cache.set(user_id, fields, ttl)
+
+  return principalFromFields(fields)
+
+async def agetPrincipal(user_id: int) -> User:
+  """
+  Async counterpart of getPrincipal for async middleware.
+
+  Args:
+    user_id (int): Id of the authenticated user
+
+  Returns:
+    User: The authenticated user
+
+  Raises:
+    User.DoesNotExist: If the user does not exist
+  """
+  ttl = settings.AUTH_PRINCIPAL_CACHE["TTL"]
+  fields = principal_cache.get(user_id)
+
+  if fields is None:
+    shared = sharedCache()
+    fields = await shared.aget(principalKey(user_id)) if shared else None
+
+    if fields is None:
+      fields = await User.objects.filter(id=user_id).values(*PRINCIPAL_FIELDS).aget()
+      if shared:
+        await shared.aset(principalKey(user_id), fields, ttl)
+
+    principal_cache.set(user_id, fields, ttl)
+
+  return principalFromFields(fields)
+
+def invalidatePrincipal(user_id: int):
+  """
+  Drops a user from the local and shared principal caches.
+
+  Other processes keep their local copy until it expires (at most TTL seconds).
+
+  Args:
+    user_id (int): Id of the user that changed
+  """
+  principal_cache.delete(user_id)
+
+  shared = sharedCache()
+  if shared:
+    shared.delete(principalKey(user_id))
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidateChangedUser(sender, instance, **kwargs):
+  # Dropped once the change is committed: before that, a concurrent request
+  # would cache the old row again, and a rollback changes nothing. The id is
+  # read now, as a deleted instance loses it.
+  user_id = instance.id
+  transaction.on_commit(lambda: invalidatePrincipal(user_id))
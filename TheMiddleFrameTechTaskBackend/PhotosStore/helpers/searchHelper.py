@@ -0,0 +1,123 @@
+import re
+
+from django.db import connection as default_connection, connections
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+
+# Tables whose title and description are searchable
+SEARCH_TABLES = ["photos", "albums"]
+
+# PostgreSQL text search configuration, and the relative weight of a title
+# match over a description match (ts_rank's defaults for weights A and B,
+# reused for bm25 on SQLite).
+SEARCH_CONFIG = "english"
+TITLE_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+
+def sqliteTriggerStatements(table: str) -> list:
+  """
+  Returns the triggers keeping a table's FTS5 index in sync with it.
+
+  Args:
+    table (str): One of SEARCH_TABLES
+
+  Returns:
+    list: CREATE TRIGGER IF NOT EXISTS statements
+  """
+  insert = f"INSERT INTO {table}_fts(rowid, title, description) VALUES (new.id, new.title, new.description);"
+  delete = f"INSERT INTO {table}_fts({table}_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);"
+
+  return [
+    f"CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN {insert} END",
+    f"CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN {delete} END",
+    f"CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE OF title, description ON {table} BEGIN {delete} {insert} END",
+  ]
+
+def sqliteTriggersInstalled(cursor, table: str) -> bool:
+  cursor.execute(
+    "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s AND name LIKE %s",
+    [table, f"{table}_fts_%"]
+  )
+  return cursor.fetchone()[0] == len(sqliteTriggerStatements(table))
+
+def sqliteIndexInstalled(cursor, table: str) -> bool:
+  cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = %s", [f"{table}_fts"])
+  return cursor.fetchone()[0] > 0
+
+@receiver(post_migrate)
+def restoreSearchTriggers(sender, using="default", **kwargs):
+  """
+  Recreates SQLite search triggers dropped by later migrations.
+
+  SQLite alters a table by rebuilding it, which silently drops its
+  triggers; the index is rebuilt too, as writes made in between were missed.
+  """
+  connection = connections[using]
+  if sender.name != "PhotosStore" or connection.vendor != "sqlite":
+    return
+
+  with connection.cursor() as cursor:
+    for table in SEARCH_TABLES:
+      if sqliteIndexInstalled(cursor, table) and not sqliteTriggersInstalled(cursor, table):
+        for statement in sqliteTriggerStatements(table):
+          cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+
+def searchTerms(text: str) -> list:
+  return re.findall(r"\w+", text)
+
+def rankedMatches(table: str, text: str, after: tuple, limit: int, where: str = "", params: list = None) -> list:
+  """
+  Finds the rows of a search table matching a query, best match first.
+
+  Ranks are ts_rank on PostgreSQL and negated bm25 on SQLite, so a higher
+  rank is always better; ties are broken by id to give a stable keyset.
+  Every match is ranked, and only the page is kept from a top-N sort.
+
+  Args:
+    table (str): One of SEARCH_TABLES
+    text (str): Search query as typed by the user
+    after (tuple): (rank, id) of the last row already returned, or None
+    limit (int): Maximum number of rows
+    where (str): Extra condition on the table's columns, with %s placeholders
+    params (list): Parameters of the extra condition
+
+  Returns:
+    list: (id, rank) tuples
+  """
+  terms = searchTerms(text)
+  if not terms:
+    return []
+
+  condition = f" AND {where}" if where else ""
+
+  if default_connection.vendor == "postgresql":
+    # websearch_to_tsquery understands quotes, "or" and -exclusions. The GIN
+    # index finds the matching rows; ranking them needs their documents, so
+    # the cost grows with the number of matches.
+    matches = (
+      f"SELECT t.id AS id, ts_rank(t.search_vector, query)::float8 AS rank "
+      f"FROM {table} t, websearch_to_tsquery('{SEARCH_CONFIG}', %s) query "
+      f"WHERE t.search_vector @@ query{condition}"
+    )
+    match_params = [text, *(params or [])]
+  else:
+    # Every word must match; quoting keeps FTS5 query syntax out of user input
+    fts_query = " ".join(f'"{term}"' for term in terms)
+    matches = (
+      f"SELECT t.id AS id, -bm25({table}_fts, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}) AS rank "
+      f"FROM {table}_fts JOIN {table} t ON t.id = {table}_fts.rowid "
+      f"WHERE {table}_fts MATCH %s{condition}"
+    )
+    match_params = [fts_query, *(params or [])]
+
+  sql = f"SELECT id, rank FROM ({matches}) matches"
+  if after is not None:
+    sql += " WHERE rank < %s OR (rank = %s AND id < %s)"
+    match_params += [after[0], after[0], after[1]]
+  sql += " ORDER BY rank DESC, id DESC LIMIT %s"
+  match_params.append(limit)
+
+  with default_connection.cursor() as cursor:
+    cursor.execute(sql, match_params)
+    return [(row_id, rank) for row_id, rank in cursor.fetchall()]
@@ -0,0 +1,109 @@
+from django.core.files.storage import default_storage
+from .blobHelper import SUMMARY_FIELDS
+
+def mediaUrl(name: str) -> str:
+  """
+  Returns the URL of a stored file from its name, as FieldFile.url would.
+
+  Args:
+    name (str): File name as stored in a FileField column (may be empty)
+
+  Returns:
+    str: The file URL, or None without a file
+  """
+  return default_storage.url(name) if name else None
+
+def srcsetFromCandidates(candidates) -> dict:
+  """
+  Groups (format, width, url) candidates into one srcset string per format.
+
+  Args:
+    candidates: Iterable of (format, width, url) tuples
+
+  Returns:
+    dict: Format -> srcset string (e.g. {"webp": "/media/a_thumbnail.webp 320w, ..."})
+  """
+  grouped = {}
+  for image_format, width, url in sorted(candidates, key=lambda candidate: candidate[1]):
+    grouped.setdefault(image_format, []).append(f"{url} {width}w")
+
+  return {image_format: ", ".join(urls) for image_format, urls in grouped.items()}
+
+def buildSrcset(derivatives) -> dict:
+  """
+  Groups the derivatives of a photo into one srcset string per format.
+
+  Args:
+    derivatives: Iterable of PhotoDerivative (typically prefetched)
+
+  Returns:
+    dict: Format -> srcset string (e.g. {"webp": "/media/a_thumbnail.webp 320w, ..."})
+  """
+  return srcsetFromCandidates(
+    (derivative.format, derivative.width, derivative.image.url)
+    for derivative in derivatives
+  )
+
+def srcsetsFromRows(rows) -> dict:
+  """
+  Builds the srcsets of several photos from projected derivative rows.
+
+  Args:
+    rows: Iterable of dicts with photo_id, format, width and image
+
+  Returns:
+    dict: Photo id -> srcset dict, as returned by buildSrcset
+  """
+  candidates = {}
+  for row in rows:
+    candidates.setdefault(row["photo_id"], []).append((row["format"], row["width"], mediaUrl(row["image"])))
+
+  return {photo_id: srcsetFromCandidates(photo_candidates) for photo_id, photo_candidates in candidates.items()}
+
+def serializeImageSummary(photo: dict) -> dict:
+  """
+  Picks the image summary (dimensions, sizes, color and placeholder) of a photo.
+
+  Lets clients lay out and fill the grid before any image has loaded. The
+  values are None (or empty) until the photo has been processed.
+
+  Args:
+    photo: Photo, or projected photo row (dict) including SUMMARY_FIELDS
+
+  Returns:
+    dict: width, height, original_size, compressed_size, dominant_color and placeholder
+  """
+  if not isinstance(photo, dict):
+    photo = {field: getattr(photo, field) for field in SUMMARY_FIELDS}
+
+  # Empty strings (not processed yet) are returned as null like the numbers
+  return {field: photo[field] if photo[field] != "" else None for field in SUMMARY_FIELDS}
+
+def serializePhoto(photo) -> dict:
+  """
+  Converts a photo (with its user and album selected) into its feed representation.
+
+  Args:
+    photo (Photo): Photo fetched with select_related('user', 'album') and prefetch_related('derivatives')
+
+  Returns:
+    dict: JSON-serializable representation of the photo
+  """
+  return {
+    "id": photo.id,
+    "title": photo.title,
+    "description": photo.description,
+    "capture_date": photo.capture_date.strftime("%Y-%m-%d"),
+    "image": photo.compressed_image.url if photo.compressed_image else None,
+    "original_image": photo.original_image.url if photo.original_image else None,
+    "srcset": buildSrcset(photo.derivatives.all()),
+    **serializeImageSummary(photo),
+    "user": {
+      "id": photo.user.id,
+      "username": photo.user.username
+    },
+    "album": {
+      "id": photo.album.id,
+      "title": photo.album.title
+    } if photo.album else None
+  }
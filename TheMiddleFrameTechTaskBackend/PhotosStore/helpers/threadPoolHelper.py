@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connections
+
+def runInThread(func, item):
+  try:
+    return func(item)
+  finally:
+    # Database connections are per thread; close the ones this task opened
+    # so they do not outlive the pool.
+    connections.close_all()
+
+def mapInThreads(func, items: list, max_workers: int) -> list:
+  """
+  Calls func on every item concurrently and returns the results in order.
+
+  Single items (or max_workers <= 1) run in the calling thread. Exceptions
+  raised by func propagate to the caller.
+
+  Args:
+    func: Callable taking one item
+    items (list): Items to process
+    max_workers (int): Maximum number of threads
+
+  Returns:
+    list: func(item) for every item, in the order of items
+  """
+  items = list(items)
+  if len(items) <= 1 or max_workers <= 1:
+    return [func(item) for item in items]
+
+  with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+    return list(executor.map(lambda item: runInThread(func, item), items))
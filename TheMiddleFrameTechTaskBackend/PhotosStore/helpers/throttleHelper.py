@@ -0,0 +1,166 @@
+import math
+import time
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from .principalCacheHelper import TTLCache
+
+class TokenBucketLimiter:
+  """
+  Token buckets keyed by client, refilled continuously at a fixed rate.
+
+  Buckets live in a per-process LRU; a bucket idle long enough to be full
+  again expires, so memory is bounded by MAX_ENTRIES. With a shared cache
+  configured, every process draws from the same limit through takeShared
+  instead, which only uses the cache's atomic add/incr.
+  """
+
+  def __init__(self, scope: str):
+    self.scope = scope
+    self.buckets = TTLCache(settings.AUTH_THROTTLE["MAX_ENTRIES"])
+    self.lock = threading.Lock()
+
+  def take(self, key: str, rate: float, burst: int) -> float:
+    """
+    Takes one token from a bucket.
+
+    Args:
+      key (str): Client identifier (e.g. an IP address)
+      rate (float): Tokens added per minute; 0 disables the limit
+      burst (int): Bucket capacity
+
+    Returns:
+      float: 0 if the request may proceed, otherwise seconds until a token is available
+    """
+    if rate <= 0 or burst <= 0:
+      return 0
+
+    per_second = rate / 60
+    full_after = burst / per_second
+    cache_key = f"throttle:{self.scope}:{key}"
+    shared = sharedCache()
+
+    if shared:
+      return self.takeShared(shared, cache_key, per_second, burst)
+
+    with self.lock:
+      now = time.time()
+      bucket = self.buckets.get(cache_key)
+      tokens, updated_at = bucket if bucket else (burst, now)
+      tokens = min(burst, tokens + (now - updated_at) * per_second)
+
+      if tokens >= 1:
+        tokens -= 1
+        retry_after = 0
+      else:
+        retry_after = (1 - tokens) / per_second
+
+      self.buckets.set(cache_key, (tokens, now), full_after)
+
+    return retry_after
+
+  def takeShared(self, shared, cache_key: str, per_second: float, burst: int) -> float:
+    """
+    Counts one request against a limit kept in a shared cache, without read-modify-write.
+
+    The bucket is approximated by a sliding window: requests are counted per
+    window of the time a bucket takes to refill, and the previous window's
+    count is weighted by how much of it still overlaps. A counter only ever
+    changes through add/incr/decr, which are atomic in Redis and memcached,
+    so concurrent processes can never both take the last token.
+
+    Args:
+      shared: Django cache shared by every process
+      cache_key (str): Key of the client's bucket
+      per_second (float): Tokens added per second
+      burst (int): Bucket capacity
+
+    Returns:
+      float: 0 if the request may proceed, otherwise seconds until it would be admitted
+    """
+    window = burst / per_second
+    now = time.time()
+    index = int(now // window)
+    elapsed = now - index * window
+    current_key = f"{cache_key}:{index}"
+
+    # Kept for two windows, while it still counts as the previous one
+    shared.add(current_key, 0, math.ceil(2 * window) + 1)
+    try:
+      count = shared.incr(current_key)
+    except ValueError:
+      # Expired between add and incr
+      shared.add(current_key, 1, math.ceil(2 * window) + 1)
+      count = 1
+
+    previous = shared.get(f"{cache_key}:{index - 1}", 0)
+    overlap = 1 - elapsed / window
+    excess = previous * overlap + count - burst
+    if excess <= 0:
+      return 0
+
+    # Refused requests give their token back
+    shared.decr(current_key)
+
+    if previous and count <= burst:
+      # The previous window's weight decays at previous / window per second
+      return min(excess * window / previous, window - elapsed)
+
+    return window - elapsed
+
+def sharedCache():
+  alias = settings.AUTH_THROTTLE["SHARED_CACHE"]
+  return caches[alias] if alias else None
+
+ip_limiter = TokenBucketLimiter("ip")
+account_limiter = TokenBucketLimiter("account")
+
+def clientIp(request) -> str:
+  """
+  Returns the address of the client, as seen by the closest trusted proxy.
+
+  Args:
+    request (Request): The request object.
+
+  Returns:
+    str: IP address
+  """
+  if settings.AUTH_THROTTLE["TRUST_X_FORWARDED_FOR"]:
+    forwarded = [address.strip() for address in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if address.strip()]
+    if forwarded:
+      return forwarded[-1]
+
+  return request.META.get("REMOTE_ADDR", "")
+
+def throttleIp(request) -> float:
+  """
+  Takes a token from the bucket of the client's IP address.
+
+  Args:
+    request (Request): The request object.
+
+  Returns:
+    float: 0 if allowed, otherwise seconds to wait
+  """
+  config = settings.AUTH_THROTTLE
+  return ip_limiter.take(clientIp(request), config["IP_RATE"], config["IP_BURST"])
+
+def throttleAccount(email: str) -> float:
+  """
+  Takes a token from the bucket of the account being signed in to, whichever IP it comes from.
+
+  Args:
+    email (str): Email sent with the login
+
+  Returns:
+    float: 0 if allowed, otherwise seconds to wait
+  """
+  config = settings.AUTH_THROTTLE
+  return account_limiter.take(email.strip().lower(), config["ACCOUNT_RATE"], config["ACCOUNT_BURST"])
+
+# For async views: a shared cache is a network round trip, which must not
+# block the event loop (the limiters are thread-safe, so any thread will do)
+athrottleIp = sync_to_async(throttleIp, thread_sensitive=False)
+athrottleAccount = sync_to_async(throttleAccount, thread_sensitive=False)
@@ -0,0 +1,113 @@
+import time
+
+from collections import OrderedDict
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from ...models import Photo
+from ...helpers.imageHelper import describeImage, readImageHeader, estimateDecodeBytes, COLOR_SAMPLE_WIDTH
+from ...helpers.decodeBudgetHelper import decodeBudget
+from ...helpers.blobHelper import SUMMARY_FIELDS
+from ...helpers.threadPoolHelper import mapInThreads
+from ...helpers.httpCacheHelper import bumpContentVersions, albumVersionKey, FEED_VERSION_KEY
+
+# Summaries of recently seen files; photos sharing a blob (or compressed
+# image) are consecutive often enough that each file is read about once.
+SUMMARY_CACHE_SIZE = 1024
+
+class Command(BaseCommand):
+  help = "Fills the image summary (dimensions, sizes, dominant color, placeholder) of photos processed before it existed."
+
+  def add_arguments(self, parser):
+    parser.add_argument(
+      "--batch-size",
+      type=int,
+      default=500,
+      help="Photos read and updated per batch"
+    )
+    parser.add_argument(
+      "--workers",
+      type=int,
+      default=4,
+      help="Threads reading and decoding files"
+    )
+    parser.add_argument(
+      "--force",
+      action="store_true",
+      help="Recompute photos that already have a summary"
+    )
+
+  def handle(self, *args, **options):
+    batch_size = max(1, options["batch_size"])
+    workers = max(1, options["workers"])
+    originals = OrderedDict()
+    compressed_sizes = OrderedDict()
+
+    def remember(cache, name, value):
+      cache[name] = value
+      if len(cache) > SUMMARY_CACHE_SIZE:
+        cache.popitem(last=False)
+
+    def describeOriginal(name):
+      try:
+        with default_storage.open(name, "rb") as original:
+          header = readImageHeader(original)
+          cost = estimateDecodeBytes(header["width"], header["height"], header["format"], COLOR_SAMPLE_WIDTH)
+          with decodeBudget().reserve(cost):
+            return name, {**describeImage(original), "original_size": default_storage.size(name)}
+      except Exception as e:
+        return name, e
+
+    def compressedSize(name):
+      try:
+        return name, default_storage.size(name)
+      except Exception:
+        return name, None
+
+    photos = Photo.objects.exclude(original_image="").order_by("id").only("id", "album_id", "original_image", "compressed_image", *SUMMARY_FIELDS)
+    if not options["force"]:
+      photos = photos.filter(width__isnull=True)
+
+    started = time.perf_counter()
+    last_id = 0
+    updated = 0
+    failed = 0
+
+    while True:
+      batch = list(photos.filter(id__gt=last_id)[:batch_size])
+      if not batch:
+        break
+      last_id = batch[-1].id
+
+      missing = {photo.original_image.name for photo in batch} - originals.keys()
+      for name, summary in mapInThreads(describeOriginal, sorted(missing), workers):
+        remember(originals, name, summary)
+
+      missing = {photo.compressed_image.name for photo in batch if photo.compressed_image} - compressed_sizes.keys()
+      for name, size in mapInThreads(compressedSize, sorted(missing), workers):
+        remember(compressed_sizes, name, size)
+
+      described = []
+      for photo in batch:
+        summary = originals.get(photo.original_image.name)
+        if not isinstance(summary, dict):
+          failed += 1
+          self.stderr.write(f"Photo {photo.id}: cannot read {photo.original_image.name}: {summary}")
+          continue
+
+        for field, value in summary.items():
+          setattr(photo, field, value)
+        photo.compressed_size = compressed_sizes.get(photo.compressed_image.name) if photo.compressed_image else None
+        described.append(photo)
+
+      Photo.objects.bulk_update(described, SUMMARY_FIELDS)
+
+      # bulk_update sends no post_save, so cached responses are invalidated here
+      album_ids = {photo.album_id for photo in described if photo.album_id}
+      bumpContentVersions([FEED_VERSION_KEY] + [albumVersionKey(album_id) for album_id in sorted(album_ids)])
+
+      updated += len(described)
+      self.stdout.write(f"Updated {updated} photo(s) (up to id {last_id})")
+
+    self.stdout.write(self.style.SUCCESS(
+      f"Backfilled {updated} photo(s) in {time.perf_counter() - started:.1f}s" + (f", {failed} failed" if failed else "")
+    ))
@@ -0,0 +1,294 @@
+import sys
+import json
+import time
+import base64
+import django
+import platform
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, close_old_connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, override_settings
+from django.utils import timezone
+from ...models import User, Album, Photo
+from ...helpers.threadPoolHelper import mapInThreads
+from ...helpers.benchmarkHelper import createSyntheticJpeg, peakRssKb, summarizeLatencies, BENCHMARK_EMAIL_DOMAIN, BENCHMARK_PASSWORD
+
+SCENARIOS = ["login", "feed", "album", "upload", "delete"]
+
+EXPECTED_STATUS = {
+  "login": 200,
+  "feed": 200,
+  "album": 200,
+  "upload": 201,
+  "delete": 200,
+}
+
+class ApiLoadDriver:
+  """
+  Sends API requests in-process through the test client and measures them.
+
+  Every request runs the full middleware stack. close_old_connections is
+  called around each one, as the WSGI/ASGI handlers do, so the configured
+  DATABASE_CONNECTIONS mode behaves as in production.
+  """
+
+  def __init__(self, user: User, album_ids: list, feed_limit: int, upload_size: tuple):
+    self.user = user
+    self.album_ids = album_ids
+    self.feed_limit = feed_limit
+    self.upload_size = upload_size
+    self.upload_album_id = Album.objects.filter(user=user).values_list("id", flat=True).first()
+    self.upload_bodies = []
+    self.uploaded_photo_ids = []
+    self.next_upload = 0
+    self.token = None
+
+  def authorization(self) -> dict:
+    if self.token is None:
+      response = self.login(Client(), 0)
+      if response.status_code != 200:
+        raise CommandError(f"Benchmark login failed with status {response.status_code}")
+      self.token = response.json()["token"]
+
+    return {"HTTP_AUTHORIZATION": f"Bearer {self.token}"}
+
+  def prepareUploads(self, count: int):
+    """
+    Encodes distinct synthetic images ahead of time, so uploads neither
+    include image generation nor hit the duplicate-content shortcut.
+
+    Args:
+      count (int): Number of upload bodies needed
+    """
+    for index in range(len(self.upload_bodies), count):
+      image = createSyntheticJpeg(*self.upload_size, seed=1000 + index)
+      self.upload_bodies.append(json.dumps({
+        "album_id": self.upload_album_id,
+        "photos": [{
+          "title": f"Benchmark upload {index}",
+          "description": "Uploaded by benchmarkapi",
+          "capture_date": "2024-01-01",
+          "filename": f"benchmark_upload_{index}.jpg",
+          "photo": base64.b64encode(image).decode("ascii")
+        }]
+      }))
+
+  def login(self, client: Client, index: int):
+    return client.post(
+      "/api/auth/login",
+      json.dumps({"email": self.user.email, "password": BENCHMARK_PASSWORD}),
+      content_type="application/json"
+    )
+
+  def feed(self, client: Client, index: int):
+    return client.get(f"/api/photos/?limit={self.feed_limit}")
+
+  def album(self, client: Client, index: int):
+    return client.get(f"/api/albums/{self.album_ids[index % len(self.album_ids)]}")
+
+  def upload(self, client: Client, index: int):
+    response = client.post("/api/photos/upload", self.upload_bodies[index], content_type="application/json", **self.authorization())
+    if response.status_code == 201:
+      self.uploaded_photo_ids.extend(photo["id"] for photo in response.json()["photos"])
+    return response
+
+  def delete(self, client: Client, index: int):
+    return client.delete(f"/api/photos/delete/{self.uploaded_photo_ids[index]}", **self.authorization())
+
+  def prepare(self, scenario: str, requests: int):
+    """
+    Sets up what a scenario needs outside of the timed section.
+
+    Args:
+      scenario (str): Scenario name
+      requests (int): Number of requests the scenario will send
+    """
+    if scenario in ("upload", "delete"):
+      self.authorization()
+
+    if scenario == "upload":
+      self.prepareUploads(len(self.upload_bodies) + requests)
+      self.next_upload = len(self.upload_bodies) - requests
+
+    if scenario == "delete" and len(self.uploaded_photo_ids) < requests:
+      # Deletes remove photos uploaded by this run; upload the missing ones untimed
+      missing = requests - len(self.uploaded_photo_ids)
+      start = len(self.upload_bodies)
+      self.prepareUploads(start + missing)
+      client = Client()
+      for index in range(start, start + missing):
+        self.upload(client, index)
+
+  def run(self, scenario: str, requests: int, concurrency: int) -> dict:
+    """
+    Sends a scenario's requests from `concurrency` threads and measures them.
+
+    Args:
+      scenario (str): Scenario name
+      requests (int): Number of requests
+      concurrency (int): Number of client threads
+
+    Returns:
+      dict: Throughput, latency percentiles, query counts, errors and peak RSS
+    """
+    self.prepare(scenario, requests)
+    send = getattr(self, scenario)
+    offset = self.next_upload if scenario == "upload" else 0
+
+    def worker(indexes):
+      client = Client()
+      samples = []
+      for index in indexes:
+        close_old_connections()
+        with CaptureQueriesContext(connections["default"]) as queries:
+          started = time.perf_counter()
+          response = send(client, index + offset)
+          if response.streaming:
+            b"".join(response.streaming_content)
+          elapsed = (time.perf_counter() - started) * 1000
+        close_old_connections()
+        samples.append((elapsed, len(queries.captured_queries), response.status_code))
+      return samples
+
+    chunks = [range(start, requests, concurrency) for start in range(concurrency)]
+
+    baseline_rss = peakRssKb(reset=True)
+    started = time.perf_counter()
+    samples = [sample for chunk in mapInThreads(worker, chunks, concurrency) for sample in chunk]
+    wall_seconds = time.perf_counter() - started
+    peak_rss = peakRssKb()
+
+    if scenario == "delete":
+      self.uploaded_photo_ids = self.uploaded_photo_ids[requests:]
+
+    latencies = [elapsed for elapsed, _, _ in samples]
+    query_counts = [query_count for _, query_count, _ in samples]
+
+    return {
+      "scenario": scenario,
+      "requests": requests,
+      "concurrency": concurrency,
+      "errors": sum(1 for _, _, status in samples if status != EXPECTED_STATUS[scenario]),
+      "throughput_rps": round(requests / wall_seconds, 2),
+      **summarizeLatencies(latencies),
+      "queries_mean": round(sum(query_counts) / len(query_counts), 2),
+      "queries_max": max(query_counts),
+      "peak_rss_mb": round(peak_rss / 1024, 2),
+      "peak_rss_delta_mb": round((peak_rss - baseline_rss) / 1024, 2),
+    }
+
+class Command(BaseCommand):
+  help = "Runs an in-process load test of the API against seeded data (see seedbenchmark) and reports a baseline."
+
+  def add_arguments(self, parser):
+    parser.add_argument(
+      "--scenarios",
+      default=",".join(SCENARIOS),
+      help="Comma separated scenarios to run, in order"
+    )
+    parser.add_argument(
+      "--requests",
+      type=int,
+      default=200,
+      help="Requests per scenario"
+    )
+    parser.add_argument(
+      "--concurrency",
+      type=int,
+      default=1,
+      help="Client threads per scenario"
+    )
+    parser.add_argument(
+      "--feed-limit",
+      type=int,
+      default=50,
+      help="Page size requested by the feed scenario"
+    )
+    parser.add_argument(
+      "--upload-size",
+      default="1600x1067",
+      help="WIDTHxHEIGHT of uploaded images"
+    )
+    parser.add_argument(
+      "--output",
+      help="Write the JSON report to this file"
+    )
+    parser.add_argument(
+      "--json",
+      action="store_true",
+      help="Print the JSON report instead of a table"
+    )
+
+  def handle(self, *args, **options):
+    scenarios = [scenario.strip() for scenario in options["scenarios"].split(",") if scenario.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+      raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))} (expected {', '.join(SCENARIOS)})")
+
+    if options["requests"] < 1 or options["concurrency"] < 1:
+      raise CommandError("--requests and --concurrency must be positive")
+
+    try:
+      upload_size = tuple(int(part) for part in options["upload_size"].lower().split("x"))
+    except ValueError:
+      raise CommandError("--upload-size must look like 1600x1067")
+
+    benchmark_users = User.objects.filter(email__endswith=f"@{BENCHMARK_EMAIL_DOMAIN}")
+    user = benchmark_users.order_by("id").first()
+    if user is None:
+      raise CommandError("No benchmark data found; run `python manage.py seedbenchmark` first")
+
+    # Lets the test client through ALLOWED_HOSTS
+    setup_test_environment()
+
+    # Every request comes from one address and account; the login scenario
+    # measures hashing, not the throttle refusing it
+    override_settings(AUTH_THROTTLE={**settings.AUTH_THROTTLE, "IP_RATE": 0, "ACCOUNT_RATE": 0}).enable()
+
+    driver = ApiLoadDriver(
+      user,
+      list(Album.objects.filter(user__in=benchmark_users).values_list("id", flat=True)),
+      options["feed_limit"],
+      upload_size
+    )
+
+    report = {
+      "meta": {
+        "created_at": timezone.now().isoformat(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "platform": sys.platform,
+        "database": connections["default"].vendor,
+        "database_connections": settings.DATABASE_CONNECTIONS,
+        "async_views": settings.ASYNC_VIEWS,
+        "photo_jobs_inline": settings.PHOTO_JOBS_INLINE,
+        "password_hashing_workers": settings.PASSWORD_HASHING["WORKERS"],
+        "users": User.objects.count(),
+        "albums": Album.objects.count(),
+        "photos": Photo.objects.count(),
+      },
+      "results": [
+        driver.run(scenario, options["requests"], options["concurrency"])
+        for scenario in scenarios
+      ],
+    }
+
+    if options["output"]:
+      with open(options["output"], "w") as output:
+        json.dump(report, output, indent=2)
+
+    if options["json"]:
+      self.stdout.write(json.dumps(report, indent=2))
+      return
+
+    self.stdout.write(
+      f"{'scenario':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+      f"{'queries':>8} {'errors':>7} {'peak MB':>8}"
+    )
+    for result in report["results"]:
+      self.stdout.write(
+        f"{result['scenario']:>8} {result['throughput_rps']:>8} {result['p50_ms']:>8} {result['p95_ms']:>8} "
+        f"{result['p99_ms']:>8} {result['queries_mean']:>8} {result['errors']:>7} {result['peak_rss_mb']:>8}"
+      )
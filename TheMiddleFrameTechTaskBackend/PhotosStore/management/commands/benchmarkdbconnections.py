@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import django
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from ...helpers.benchmarkHelper import summarizeLatencies
+
+MODES = ["per-request", "persistent", "pool"]
+
+def measureRequests(path: str, requests: int, warmup: int) -> dict:
+  """
+  Sends requests to the API in the current (fresh) process and times each one.
+
+  The test client detaches close_old_connections from the request signals
+  (tests keep one connection), so it is called around every request here,
+  exactly as the WSGI and ASGI handlers do.
+
+  Args:
+    path (str): API path to request
+    requests (int): Number of timed requests
+    warmup (int): Untimed requests sent first
+
+  Returns:
+    dict: Latency statistics in milliseconds
+  """
+  from django.conf import settings
+  from django.db import connection, close_old_connections
+  from django.test import Client
+  from django.test.utils import setup_test_environment
+
+  setup_test_environment()
+  client = Client()
+
+  for _ in range(warmup):
+    close_old_connections()
+    client.get(path)
+    close_old_connections()
+
+  samples = []
+  for _ in range(requests):
+    started = time.perf_counter()
+    close_old_connections()
+    response = client.get(path)
+    close_old_connections()
+    samples.append((time.perf_counter() - started) * 1000)
+
+    if response.status_code != 200:
+      raise RuntimeError(f"GET {path} returned {response.status_code}")
+
+  return {
+    "mode": settings.DATABASE_CONNECTIONS,
+    "vendor": connection.vendor,
+    "requests": requests,
+    **summarizeLatencies(samples),
+  }
+
+class Command(BaseCommand):
+  help = "Compares per-request API latency with and without persistent or pooled database connections."
+
+  def add_arguments(self, parser):
+    parser.add_argument(
+      "--path",
+      default="/api/photos/?limit=20",
+      help="API path requested in every iteration"
+    )
+    parser.add_argument(
+      "--modes",
+      default=",".join(MODES),
+      help="Comma separated DATABASE_CONNECTIONS modes to compare"
+    )
+    parser.add_argument(
+      "--requests",
+      type=int,
+      default=500,
+      help="Timed requests per mode"
+    )
+    parser.add_argument(
+      "--warmup",
+      type=int,
+      default=20,
+      help="Untimed requests sent before measuring"
+    )
+    parser.add_argument(
+      "--json",
+      action="store_true",
+      help="Print results as JSON"
+    )
+
+  def handle(self, *args, **options):
+    modes = [mode.strip() for mode in options["modes"].split(",") if mode.strip()]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+      raise CommandError(f"Unknown modes: {', '.join(sorted(unknown))} (expected {', '.join(MODES)})")
+
+    results = []
+    for mode in modes:
+      # Settings are read once per process, so every mode runs in a fresh
+      # process started with its own DATABASE_CONNECTIONS.
+      previous = os.environ.get("DATABASE_CONNECTIONS")
+      os.environ["DATABASE_CONNECTIONS"] = mode
+
+      try:
+        with ProcessPoolExecutor(
+          max_workers=1,
+          mp_context=multiprocessing.get_context("spawn"),
+          initializer=django.setup
+        ) as executor:
+          results.append(executor.submit(
+            measureRequests,
+            options["path"],
+            options["requests"],
+            options["warmup"]
+          ).result())
+
+      finally:
+        if previous is None:
+          os.environ.pop("DATABASE_CONNECTIONS", None)
+        else:
+          os.environ["DATABASE_CONNECTIONS"] = previous
+
+    if options["json"]:
+      self.stdout.write(json.dumps(results, indent=2))
+      return
+
+    self.stdout.write(f"{'mode':>12} {'vendor':>10} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for result in results:
+      self.stdout.write(
+        f"{result['mode']:>12} {result['vendor']:>10} {result['mean_ms']:>9} "
+        f"{result['p50_ms']:>9} {result['p95_ms']:>9} {result['p99_ms']:>9}"
+      )
@@ -0,0 +1,112 @@
+import json
+import time
+import django
+import multiprocessing
+
+from io import BytesIO
+from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from ...helpers.imageHelper import compressImage, addWatermark, processImageForUpload
+from ...helpers.benchmarkHelper import createSyntheticJpeg, peakRssKb
+
+def twoPassPipeline(source: bytes) -> BytesIO:
+  # Handing compressImage an already decoded image reproduces the previous
+  # full-resolution decode, followed by the second JPEG round trip.
+  return addWatermark(compressImage(Image.open(BytesIO(source)).convert("RGB")))
+
+def fusedPipeline(source: bytes) -> BytesIO:
+  return processImageForUpload(BytesIO(source))
+
+PIPELINES = {
+  "two-pass": twoPassPipeline,
+  "fused": fusedPipeline,
+}
+
+def measurePipeline(name: str, source: bytes, iterations: int) -> dict:
+  """
+  Runs one pipeline in the current (fresh) process and measures it.
+
+  Peak memory is the growth of the process high-water mark while the
+  pipeline runs, which includes Pillow's native allocations.
+
+  Args:
+    name (str): Key of the pipeline in PIPELINES
+    source (bytes): Encoded source image
+    iterations (int): Number of times the pipeline is run
+
+  Returns:
+    dict: CPU time per image, peak memory growth and output size
+  """
+  pipeline = PIPELINES[name]
+  width, height = Image.open(BytesIO(source)).size
+
+  baseline_rss = peakRssKb(reset=True)
+  started = time.process_time()
+
+  for _ in range(iterations):
+    output = pipeline(source)
+
+  cpu_seconds = (time.process_time() - started) / iterations
+  peak_rss = peakRssKb()
+
+  return {
+    "pipeline": name,
+    "size": f"{width}x{height}",
+    "source_bytes": len(source),
+    "output_bytes": output.getbuffer().nbytes,
+    "cpu_ms": round(cpu_seconds * 1000, 2),
+    "peak_rss_delta_mb": round((peak_rss - baseline_rss) / 1024, 2),
+  }
+
+class Command(BaseCommand):
+  help = "Compares CPU time and peak memory of the two-pass and fused image upload pipelines."
+
+  def add_arguments(self, parser):
+    parser.add_argument(
+      "--sizes",
+      default="1600x1067,4000x3000,8000x6000",
+      help="Comma separated WIDTHxHEIGHT source sizes"
+    )
+    parser.add_argument(
+      "--iterations",
+      type=int,
+      default=5,
+      help="Images processed per measurement"
+    )
+    parser.add_argument(
+      "--json",
+      action="store_true",
+      help="Print results as JSON"
+    )
+
+  def handle(self, *args, **options):
+    try:
+      sizes = [tuple(int(part) for part in size.lower().split("x")) for size in options["sizes"].split(",")]
+    except ValueError:
+      raise CommandError("--sizes must look like 1600x1067,4000x3000")
+
+    results = []
+    for width, height in sizes:
+      source = createSyntheticJpeg(width, height)
+
+      for name in PIPELINES:
+        # Every measurement gets its own process so high-water marks of
+        # earlier runs do not hide the memory used by this one.
+        with ProcessPoolExecutor(
+          max_workers=1,
+          mp_context=multiprocessing.get_context("spawn"),
+          initializer=django.setup
+        ) as executor:
+          results.append(executor.submit(measurePipeline, name, source, options["iterations"]).result())
+
+    if options["json"]:
+      self.stdout.write(json.dumps(results, indent=2))
+      return
+
+    self.stdout.write(f"{'size':>11} {'pipeline':>9} {'cpu ms':>9} {'peak MB':>9} {'output KB':>10}")
+    for result in results:
+      self.stdout.write(
+        f"{result['size']:>11} {result['pipeline']:>9} {result['cpu_ms']:>9} "
+        f"{result['peak_rss_delta_mb']:>9} {result['output_bytes'] / 1024:>10.1f}"
+      )
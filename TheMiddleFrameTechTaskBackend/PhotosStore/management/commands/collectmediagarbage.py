@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from ...helpers.deletionHelper import collectGarbage
+
+class Command(BaseCommand):
+  help = "Deletes the media files of deleted photos and albums that nothing references any more."
+
+  def add_arguments(self, parser):
+    parser.add_argument(
+      "--batch-size",
+      type=int,
+      default=500,
+      help="Tombstones handled per batch"
+    )
+    parser.add_argument(
+      "--grace-seconds",
+      type=int,
+      default=getattr(settings, "FILE_TOMBSTONE_GRACE_SECONDS", 600),
+      help="Only collect files tombstoned at least this long ago"
+    )
+    parser.add_argument(
+      "--interval",
+      type=float,
+      default=None,
+      help="Keep running, collecting every this many seconds, instead of exiting once drained"
+    )
+
+  def handle(self, *args, **options):
+    batch_size = max(1, options["batch_size"])
+    grace_seconds = max(0, options["grace_seconds"])
+
+    while True:
+      processed = 0
+      deleted = 0
+
+      while True:
+        batch_processed, batch_deleted = collectGarbage(batch_size, grace_seconds)
+        if not batch_processed:
+          break
+        processed += batch_processed
+        deleted += batch_deleted
+
+      if processed or options["interval"] is None:
+        self.stdout.write(self.style.SUCCESS(
+          f"Processed {processed} tombstone(s), deleted {deleted} file(s)"
+        ))
+
+      if options["interval"] is None:
+        break
+      time.sleep(options["interval"])
@@ -0,0 +1,103 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from ...models.user import User
+from ...models.album import Album
+from ...models.photo import Photo
+from ...models.photoJob import PhotoJob
+from ...models.photoDerivative import PhotoDerivative
+from ...models.contentVersion import ContentVersion
+from ...models.fileTombstone import FileTombstone
+from ...controllers.albumsController import albumQuerySet, albumPhotosQuerySet, albumsQuerySet, derivativesQuerySet, ALBUM_PHOTOS_DEFAULT_LIMIT, ALBUMS_DEFAULT_LIMIT, COVER_DERIVATIVE
+from ...helpers.paginationHelper import encodeCursor, afterCursor
+from ...helpers.httpCacheHelper import storedVersionKeys, FEED_VERSION_KEY
+
+SEQUENTIAL_SCAN_PATTERNS = {
+  "postgresql": re.compile(r"Seq Scan on (\w+)"),
+  "sqlite": re.compile(r"\bSCAN (?:TABLE )?(?!TABLE\b)(\w+)\b(?! USING)"),
+}
+
+def controllerQueries() -> list:
+  """
+  Builds the querysets issued by the controllers and middlewares on their hot paths.
+
+  Returns:
+    list: (name, queryset) pairs, with lookups bound to representative values
+  """
+  now = timezone.now()
+
+  return [
+    ("authMiddleware: user by id", User.objects.filter(id=1)),
+    ("login: user by email", User.objects.filter(email="user@example.com")),
+    ("register: email taken", User.objects.filter(email="user@example.com")[:1]),
+    ("register: username taken", User.objects.filter(username="user")[:1]),
+    ("getPhotos: first page", Photo.objects.select_related("user", "album").filter(status=Photo.STATUS_READY).order_by("-created_at", "-id")[:51]),
+    ("getPhotos: next page", Photo.objects.select_related("user", "album").filter(status=Photo.STATUS_READY).order_by("-created_at", "-id").filter(
+      Q(created_at__lt=now) | Q(created_at=now, id__lt=1)
+    )[:51]),
+    ("getAlbumDetails: album", albumQuerySet(1)),
+    ("getAlbumDetails: all photos", albumPhotosQuerySet(1)),
+    ("getAlbumDetails: all derivatives", derivativesQuerySet(photo__album_id=1, photo__status=Photo.STATUS_READY)),
+    ("getAlbumDetails: photo page", afterCursor(albumPhotosQuerySet(1), encodeCursor(now, 1))[:ALBUM_PHOTOS_DEFAULT_LIMIT + 1]),
+    ("getAlbums: first page", albumsQuerySet()[:ALBUMS_DEFAULT_LIMIT + 1]),
+    ("getAlbums: uploader next page", afterCursor(albumsQuerySet(1), encodeCursor(now, 1))[:ALBUMS_DEFAULT_LIMIT + 1]),
+    ("getAlbums: cover thumbnails", derivativesQuerySet(photo_id__in=[1, 2], name=COVER_DERIVATIVE)),
+    ("uploadPhotos: target album", Album.objects.filter(id=1, user_id=1)),
+    ("deletePhoto: photo owner", Photo.objects.filter(id=1).values("user_id")),
+    ("bulkDeletePhotos: user's photos", Photo.objects.filter(id__in=[1, 2], user_id=1).values_list("id", flat=True)),
+    ("deletePhotos: album photos", Photo.objects.filter(album_id=1).values("id")),
+    ("collectmediagarbage: due tombstones", FileTombstone.objects.filter(created_at__lte=now).order_by("created_at", "id")[:500]),
+    ("getPhotosStatus: jobs", PhotoJob.objects.filter(photo_id__in=[1, 2]).order_by("created_at")),
+    ("processphotojobs: claim", PhotoJob.objects.filter(status=PhotoJob.STATUS_PENDING).order_by("created_at")[:2]),
+    ("getPhotos: derivatives", PhotoDerivative.objects.filter(photo_id__in=[1, 2])),
+    ("versionedResponse: content versions", ContentVersion.objects.filter(key__in=storedVersionKeys([FEED_VERSION_KEY, "album:1"]))),
+    ("uploader photos", Photo.objects.filter(user_id=1).order_by("-created_at")[:51]),
+  ]
+
+class Command(BaseCommand):
+  help = "Prints the EXPLAIN plan of every controller query and reports sequential scans."
+
+  def add_arguments(self, parser):
+    parser.add_argument(
+      "--disable-seqscan",
+      action="store_true",
+      help="PostgreSQL only: discourage sequential scans so index usability is visible on small tables"
+    )
+    parser.add_argument(
+      "--fail-on-seqscan",
+      action="store_true",
+      help="Exit with an error when any plan still contains a sequential scan"
+    )
+
+  def handle(self, *args, **options):
+    pattern = SEQUENTIAL_SCAN_PATTERNS.get(connection.vendor)
+    offenders = []
+
+    with transaction.atomic():
+      if options["disable_seqscan"] and connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+          cursor.execute("SET LOCAL enable_seqscan = off")
+
+      for name, queryset in controllerQueries():
+        plan = queryset.explain()
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        self.stdout.write(plan)
+        self.stdout.write("")
+
+        if pattern:
+          tables = pattern.findall(plan)
+          if tables:
+            offenders.append(f"{name} ({', '.join(sorted(set(tables)))})")
+
+    if not offenders:
+      self.stdout.write(self.style.SUCCESS("No sequential scans found."))
+      return
+
+    for offender in offenders:
+      self.stdout.write(self.style.WARNING(f"Sequential scan: {offender}"))
+
+    if options["fail_on_seqscan"]:
+      raise CommandError(f"{len(offenders)} query plan(s) contain sequential scans")
@@ -0,0 +1,20 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from ...storages.objectStorage import ObjectStorage
+
+class Command(BaseCommand):
+  help = "Uploads the media files still waiting in this node's write-behind spool to the object store."
+
+  def handle(self, *args, **options):
+    if not isinstance(default_storage, ObjectStorage) or not default_storage.spool:
+      self.stdout.write("Write-behind is not enabled; nothing to flush")
+      return
+
+    uploaded, failed = default_storage.flushSpool()
+    for name, error in failed:
+      self.stderr.write(f"Cannot upload {name}: {error}")
+
+    if failed:
+      raise CommandError(f"Uploaded {uploaded} file(s), {len(failed)} failed and remain in the spool")
+
+    self.stdout.write(self.style.SUCCESS(f"Uploaded {uploaded} file(s)"))
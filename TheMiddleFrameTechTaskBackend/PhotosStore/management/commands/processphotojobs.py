@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from ...helpers.photoJobHelper import runPhotoJobWorker
+
+class Command(BaseCommand):
+  help = "Processes queued photo uploads (compression and watermarking) in a bounded process pool."
+
+  def add_arguments(self, parser):
+    parser.add_argument(
+      "--workers",
+      type=int,
+      default=getattr(settings, "PHOTO_JOBS_WORKERS", 2),
+      help="Number of worker processes"
+    )
+    parser.add_argument(
+      "--poll-interval",
+      type=float,
+      default=1.0,
+      help="Seconds to wait between queue polls when idle"
+    )
+    parser.add_argument(
+      "--once",
+      action="store_true",
+      help="Exit once the queue is drained instead of polling forever"
+    )
+
+  def handle(self, *args, **options):
+    self.stdout.write(f"Processing photo jobs with {options['workers']} worker(s)")
+    runPhotoJobWorker(
+      workers=max(1, options["workers"]),
+      poll_interval=options["poll_interval"],
+      once=options["once"],
+      log=self.stdout.write
+    )
@@ -0,0 +1,209 @@
+import time
+
+from datetime import date, timedelta
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+from ...models import User, Album, Photo, PhotoJob, PhotoDerivative, ImageBlob
+from ...helpers.blobHelper import acquireBlob, shareProcessedFiles, SUMMARY_FIELDS
+from ...helpers.photoJobHelper import processPhotoJob
+from ...helpers.albumStatsHelper import refreshAlbumStats
+from ...helpers.deletionHelper import deletePhotos
+from ...helpers.httpCacheHelper import bumpContentVersions, albumVersionKey, FEED_VERSION_KEY
+from ...helpers.benchmarkHelper import createSyntheticJpeg, BENCHMARK_EMAIL_DOMAIN, BENCHMARK_PASSWORD
+
+def benchmarkUsers():
+  return User.objects.filter(email__endswith=f"@{BENCHMARK_EMAIL_DOMAIN}")
+
+def removeBenchmarkData() -> int:
+  """
+  Deletes the seeded users with their albums and photos.
+
+  Photos and albums are deleted in bulk without per-object signals (a seeded
+  catalog can hold 100k+ photos); their files are left to collectmediagarbage.
+  The few users left are then deleted through the ORM, so their cached
+  principals are invalidated too.
+
+  Returns:
+    int: Number of photos removed
+  """
+  users = benchmarkUsers()
+
+  with transaction.atomic():
+    removed = deletePhotos(Photo.objects.filter(user__in=users), Album.objects.filter(user__in=users))
+    users.delete()
+
+  return removed
+
+def createTemplatePhoto(user: User, album: Album, index: int, size: tuple) -> Photo:
+  """
+  Stores one synthetic image and processes it through the regular job pipeline.
+
+  Args:
+    user (User): Owner of the photo
+    album (Album): Album of the photo
+    index (int): Seed of the synthetic image
+    size (tuple): (width, height) of the synthetic image
+
+  Returns:
+    Photo: The processed photo, whose files the other seeded photos share
+  """
+  blob = acquireBlob(ContentFile(createSyntheticJpeg(*size, seed=index), name=f"benchmark_{index}.jpg"))
+
+  photo = Photo.objects.create(
+    user=user,
+    album=album,
+    title=f"Benchmark photo {index}",
+    description="Synthetic benchmark photo",
+    capture_date=date(2020, 1, 1),
+    original_image=blob.file.name,
+    blob=blob,
+    status=Photo.STATUS_PROCESSING
+  )
+
+  if not shareProcessedFiles(photo):
+    job = PhotoJob.objects.create(photo=photo, status=PhotoJob.STATUS_RUNNING, attempts=1)
+    if processPhotoJob(job.id) != PhotoJob.STATUS_DONE:
+      raise CommandError(f"Processing benchmark image {index} failed: {PhotoJob.objects.get(id=job.id).error}")
+
+  photo.refresh_from_db()
+  return photo
+
+class Command(BaseCommand):
+  help = "Seeds users, albums and photos (sharing a few processed synthetic images) for benchmarking."
+
+  def add_arguments(self, parser):
+    parser.add_argument(
+      "--users",
+      type=int,
+      default=10,
+      help="Number of uploader accounts"
+    )
+    parser.add_argument(
+      "--albums",
+      type=int,
+      default=5,
+      help="Albums per user"
+    )
+    parser.add_argument(
+      "--photos",
+      type=int,
+      default=10000,
+      help="Total number of photos, spread evenly over the albums"
+    )
+    parser.add_argument(
+      "--distinct-images",
+      type=int,
+      default=8,
+      help="Synthetic images actually rendered; every other photo shares one of them"
+    )
+    parser.add_argument(
+      "--image-size",
+      default="1600x1067",
+      help="WIDTHxHEIGHT of the synthetic images"
+    )
+    parser.add_argument(
+      "--batch-size",
+      type=int,
+      default=2000,
+      help="Rows per bulk insert"
+    )
+    parser.add_argument(
+      "--reset",
+      action="store_true",
+      help="Remove previously seeded benchmark data first"
+    )
+
+  def handle(self, *args, **options):
+    try:
+      size = tuple(int(part) for part in options["image_size"].lower().split("x"))
+    except ValueError:
+      raise CommandError("--image-size must look like 1600x1067")
+
+    if min(options["users"], options["albums"], options["photos"], options["distinct_images"]) < 1:
+      raise CommandError("--users, --albums, --photos and --distinct-images must be positive")
+
+    if options["reset"]:
+      self.stdout.write(f"Removed {removeBenchmarkData()} benchmark photo(s)")
+    elif benchmarkUsers().exists():
+      raise CommandError("Benchmark data already exists; pass --reset to replace it")
+
+    started = time.perf_counter()
+    password = make_password(BENCHMARK_PASSWORD)
+
+    users = User.objects.bulk_create([
+      User(
+        username=f"bench_{index}",
+        email=f"bench_{index}@{BENCHMARK_EMAIL_DOMAIN}",
+        password=password,
+        role="uploader"
+      )
+      for index in range(options["users"])
+    ])
+    albums = Album.objects.bulk_create([
+      Album(user=user, title=f"Benchmark album {index}", description="Synthetic benchmark album")
+      for user in users
+      for index in range(options["albums"])
+    ])
+
+    distinct_images = min(options["distinct_images"], options["photos"])
+    templates = [
+      createTemplatePhoto(albums[index % len(albums)].user, albums[index % len(albums)], index, size)
+      for index in range(distinct_images)
+    ]
+    template_derivatives = {template.id: list(template.derivatives.all()) for template in templates}
+    self.stdout.write(f"Rendered {len(templates)} distinct image(s)")
+
+    shared_counts = {}
+    for offset in range(distinct_images, options["photos"], options["batch_size"]):
+      batch = range(offset, min(offset + options["batch_size"], options["photos"]))
+
+      with transaction.atomic():
+        new_photos = []
+        for index in batch:
+          template = templates[index % len(templates)]
+          album = albums[index % len(albums)]
+          new_photos.append(Photo(
+            user_id=album.user_id,
+            album=album,
+            title=f"Benchmark photo {index}",
+            description="Synthetic benchmark photo",
+            capture_date=date(2020, 1, 1) + timedelta(days=index % 1500),
+            original_image=template.original_image.name,
+            compressed_image=template.compressed_image.name,
+            blob_id=template.blob_id,
+            status=Photo.STATUS_READY,
+            **{field: getattr(template, field) for field in SUMMARY_FIELDS}
+          ))
+          shared_counts[template.blob_id] = shared_counts.get(template.blob_id, 0) + 1
+
+        new_photos = Photo.objects.bulk_create(new_photos)
+        PhotoDerivative.objects.bulk_create([
+          PhotoDerivative(
+            photo=photo,
+            name=derivative.name,
+            format=derivative.format,
+            width=derivative.width,
+            height=derivative.height,
+            image=derivative.image.name
+          )
+          for photo, index in zip(new_photos, batch)
+          for derivative in template_derivatives[templates[index % len(templates)].id]
+        ], batch_size=options["batch_size"])
+
+      self.stdout.write(f"Inserted {batch.stop} / {options['photos']} photos")
+
+    for blob_id, count in shared_counts.items():
+      ImageBlob.objects.filter(id=blob_id).update(ref_count=F("ref_count") + count)
+
+    # bulk_create sends no post_save, so album counters and cached responses
+    # are updated here
+    refreshAlbumStats([album.id for album in albums])
+    bumpContentVersions([FEED_VERSION_KEY] + [albumVersionKey(album.id) for album in albums])
+
+    self.stdout.write(self.style.SUCCESS(
+      f"Seeded {len(users)} user(s), {len(albums)} album(s) and {options['photos']} photo(s) "
+      f"in {time.perf_counter() - started:.1f}s (password: {BENCHMARK_PASSWORD})"
+    ))
@@ -0,0 +1,130 @@
+import time
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Case, CharField, F, Q, Value, When
+from ...models import Photo, PhotoDerivative, ImageBlob, FileTombstone
+from ...storages.shardedPaths import isShardedName
+from ...helpers.threadPoolHelper import mapInThreads
+from ...helpers.httpCacheHelper import bumpContentVersions, albumVersionKey, FEED_VERSION_KEY
+
+# Every column holding a storage name; a file may be shared by several rows
+# and columns (e.g. a blob and the photos using it), which are all updated
+# together when it moves.
+MEDIA_FIELDS = [
+  (ImageBlob, "file"),
+  (Photo, "original_image"),
+  (Photo, "compressed_image"),
+  (PhotoDerivative, "image"),
+]
+
+def renameReferences(moved: dict):
+  """
+  Points every row referencing a moved file at its new name, one UPDATE per column.
+
+  Args:
+    moved (dict): Old storage name -> new storage name
+  """
+  for model, field in MEDIA_FIELDS:
+    model.objects.filter(**{f"{field}__in": list(moved)}).update(**{
+      field: Case(
+        *[When(**{field: old_name}, then=Value(new_name)) for old_name, new_name in moved.items()],
+        default=F(field),
+        output_field=CharField()
+      )
+    })
+
+class Command(BaseCommand):
+  help = "Moves media files stored in flat directories to the sharded layout (prefix/ab/cd/<uuid>.<ext>), in batches."
+
+  def add_arguments(self, parser):
+    parser.add_argument(
+      "--batch-size",
+      type=int,
+      default=200,
+      help="Files moved per batch (and per transaction)"
+    )
+    parser.add_argument(
+      "--workers",
+      type=int,
+      default=4,
+      help="Threads copying files"
+    )
+    parser.add_argument(
+      "--dry-run",
+      action="store_true",
+      help="Only count the files that would be moved"
+    )
+
+  def handle(self, *args, **options):
+    batch_size = max(1, options["batch_size"])
+    workers = max(1, options["workers"])
+    started = time.perf_counter()
+    total_moved = 0
+    total_failed = 0
+
+    for model, field in MEDIA_FIELDS:
+      upload_to = model._meta.get_field(field).upload_to
+
+      def relocate(name):
+        try:
+          with default_storage.open(name, "rb") as source:
+            return name, default_storage.save(upload_to(None, name), source)
+        except Exception as e:
+          return name, e
+
+      names = model.objects.exclude(**{field: ""}).order_by(field).values_list(field, flat=True).distinct()
+      last_name = ""
+      pending_count = 0
+
+      while True:
+        # Keyset over names: files moved meanwhile get sharded names, which are skipped
+        batch = list(names.filter(**{f"{field}__gt": last_name})[:batch_size])
+        if not batch:
+          break
+        last_name = batch[-1]
+
+        pending = [name for name in batch if not isShardedName(name)]
+        if options["dry_run"] or not pending:
+          pending_count += len(pending)
+          continue
+
+        moved = {}
+        for name, result in mapInThreads(relocate, pending, workers):
+          if isinstance(result, Exception):
+            total_failed += 1
+            self.stderr.write(f"{model.__name__}.{field}: cannot move {name}: {result}")
+          else:
+            moved[name] = result
+
+        if not moved:
+          continue
+
+        with transaction.atomic():
+          renameReferences(moved)
+
+          # The old files stay readable (e.g. from cached responses) until
+          # collectmediagarbage removes them after the grace period
+          FileTombstone.objects.bulk_create([FileTombstone(name=name) for name in moved])
+
+          new_names = list(moved.values())
+          album_ids = set(
+            Photo.objects.filter(
+              Q(original_image__in=new_names) | Q(compressed_image__in=new_names) | Q(derivatives__image__in=new_names)
+            ).exclude(album=None).values_list("album_id", flat=True)
+          )
+          bumpContentVersions([FEED_VERSION_KEY] + [albumVersionKey(album_id) for album_id in sorted(album_ids)])
+
+        total_moved += len(moved)
+        self.stdout.write(f"{model.__name__}.{field}: moved {total_moved} file(s) so far")
+
+      if options["dry_run"]:
+        self.stdout.write(f"{model.__name__}.{field}: {pending_count} file(s) to move")
+        total_moved += pending_count
+
+    # Names shared by several columns are counted once per column in a dry run
+    verb = "Would move at most" if options["dry_run"] else "Moved"
+    self.stdout.write(self.style.SUCCESS(
+      f"{verb} {total_moved} file(s) in {time.perf_counter() - started:.1f}s" + (f", {total_failed} failed" if total_failed else "")
+    ))
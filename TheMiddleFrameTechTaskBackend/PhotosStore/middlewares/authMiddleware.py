@@ -1,8 +1,9 @@
+import re
 import jwt
 
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
-from ..helpers.jsonWebTokenHelper import decode
+from ..helpers.principalCacheHelper import decodeTokenCached, getPrincipal, agetPrincipal
 from ..models.user import User
 
 class authMiddleware(MiddlewareMixin):
@@ -12,9 +13,12 @@ class authMiddleware(MiddlewareMixin):
     "/media/",
   ]
 
+  # Matched against the whole path: other endpoints below these (e.g.
+  # /api/photos/status) need a token even for GET
   PUBLIC_GET_PATHS = [
-    "/api/photos/",
-    "/api/albums/",
+    re.compile(r"/api/photos/"),
+    re.compile(r"/api/albums/(\d+)?"),
+    re.compile(r"/api/search/"),
   ]
 
   def decodeToken(self, token: str):
@@ -29,7 +33,7 @@ class authMiddleware(MiddlewareMixin):
       None: If token is invalid (error response should be returned by caller).
     """ 
     try:
-      decoded_token = decode(token)
+      decoded_token = decodeTokenCached(token)
       return decoded_token
 
     except jwt.ExpiredSignatureError:
@@ -48,57 +52,111 @@ class authMiddleware(MiddlewareMixin):
         "error": e 
       }, status=500)
 
-  def process_request(self, request):
+  def authenticate(self, request):
     """
-    Processes the request and decodes the JWT (JSON Web Token) to retrieve the information it contains.
+    Runs the checks that do not need the database: public paths, header and token.
 
     Args:
       request (Request): The request object.
 
     Returns:
-      None: If the request is valid.
-      JsonResponse: If the request is invalid.
+      tuple: (user_id, None) if the user must be loaded, (None, JsonResponse)
+      if the request is rejected, (None, None) if no authentication is needed.
     """
-    try:
-      if any(request.path.startswith(path) for path in self.EXCLUDED_PATHS):
-        return None
+    if any(request.path.startswith(path) for path in self.EXCLUDED_PATHS):
+      return None, None
 
-      if request.method == "GET" and any(request.path.startswith(path) for path in self.PUBLIC_GET_PATHS):
-        return None
+    if request.method == "GET" and any(path.fullmatch(request.path) for path in self.PUBLIC_GET_PATHS):
+      return None, None
 
-      token = None
-      auth_header = request.META.get("HTTP_AUTHORIZATION", "")
+    token = None
+    auth_header = request.META.get("HTTP_AUTHORIZATION", "")
 
-      if auth_header.startswith("Bearer "):
-        token = auth_header.split("Bearer ")[1]
+    if auth_header.startswith("Bearer "):
+      token = auth_header.split("Bearer ")[1]
 
-      if not token:
-        return JsonResponse({ 
-          "success": False, 
-          "error": "Token is required. Please provide token in Authorization header (Bearer token)." 
-        }, status=401)
+    if not token:
+      return None, JsonResponse({ 
+        "success": False, 
+        "error": "Token is required. Please provide token in Authorization header (Bearer token)." 
+      }, status=401)
+
+    decoded_token = self.decodeToken(token)
+
+    if isinstance(decoded_token, JsonResponse):
+      return None, decoded_token
 
-      decoded_token = self.decodeToken(token)
+    user_id = decoded_token.get("id")
+    
+    if not user_id:
+      return None, JsonResponse({ 
+        "success": False, 
+        "error": "Invalid token: user ID not found" 
+      }, status=401)
 
-      user_id = decoded_token.get("id")
-      
-      if not user_id:
-        return JsonResponse({ 
-          "success": False, 
-          "error": "Invalid token: user ID not found" 
-        }, status=401)
+    return user_id, None
 
-      request.user_obj = User.objects.get(id=user_id)
-      request.user_role = request.user_obj.role
-      request.user_id = user_id
+  def attachPrincipal(self, request, user_id: int, user: User):
+    request.user_obj = user
+    request.user_role = user.role
+    request.user_id = user_id
 
-    except User.DoesNotExist:
+  def errorResponse(self, error: Exception) -> JsonResponse:
+    if isinstance(error, User.DoesNotExist):
       return JsonResponse({ 
         "success": False, 
         "error": "User not found" 
       }, status=401)
+
+    return JsonResponse({
+      "success": False,
+      "error": f"An error occurred: {str(error)}"
+    }, status=500)
+
+  def process_request(self, request):
+    """
+    Processes the request and decodes the JWT (JSON Web Token) to retrieve the information it contains.
+
+    Args:
+      request (Request): The request object.
+
+    Returns:
+      None: If the request is valid.
+      JsonResponse: If the request is invalid.
+    """
+    try:
+      user_id, response = self.authenticate(request)
+      if user_id is None:
+        return response
+
+      self.attachPrincipal(request, user_id, getPrincipal(user_id))
+
     except Exception as e:
-      return JsonResponse({
-        "success": False,
-        "error": f"An error occurred: {str(e)}"
-      }, status=500)
\ No newline at end of file
+      return self.errorResponse(e)
+
+  async def aprocess_request(self, request):
+    """
+    Async counterpart of process_request, loading the user with the async ORM.
+
+    Args:
+      request (Request): The request object.
+
+    Returns:
+      None: If the request is valid.
+      JsonResponse: If the request is invalid.
+    """
+    try:
+      user_id, response = self.authenticate(request)
+      if user_id is None:
+        return response
+
+      self.attachPrincipal(request, user_id, await agetPrincipal(user_id))
+
+    except Exception as e:
+      return self.errorResponse(e)
+
+  async def __acall__(self, request):
+    # Replaces MiddlewareMixin's version, which would run process_request
+    # in a worker thread.
+    response = await self.aprocess_request(request)
+    return response or await self.get_response(request)
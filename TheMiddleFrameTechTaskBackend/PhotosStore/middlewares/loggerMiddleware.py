@@ -1,33 +1,92 @@
 import os
+import random
 import traceback
 
+from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
+from ..helpers.logWriterHelper import getLogWriter
 
 class loggerMiddleware(MiddlewareMixin):
   def __init__(self, get_response):
     super().__init__(get_response)
-    self.logs_dir = "PhotosStore/logs"
+    self.config = settings.REQUEST_LOGGING
+    self.logs_dir = self.config["DIR"]
 
-    os.makedirs(self.logs_dir, exist_ok=True)
+    writer_options = {
+      "max_bytes": self.config["MAX_FILE_BYTES"],
+      "backup_count": self.config["BACKUP_COUNT"],
+      "batch_size": self.config["BATCH_SIZE"],
+      "queue_size": self.config["QUEUE_SIZE"],
+    }
+    self.request_log = getLogWriter(os.path.join(self.logs_dir, "request.log"), **writer_options)
+    self.response_log = getLogWriter(os.path.join(self.logs_dir, "response.log"), **writer_options)
+    self.error_log = getLogWriter(os.path.join(self.logs_dir, "error.log"), **writer_options)
+
+  def shouldLogBody(self, content_type: str) -> bool:
+    """
+    Checks whether bodies of a content type are allowed in the logs.
+
+    Args:
+      content_type (str): Content type without parameters
+
+    Returns:
+      bool: True if the content type matches one of BODY_CONTENT_TYPES
+    """
+    return any(content_type.startswith(allowed) for allowed in self.config["BODY_CONTENT_TYPES"])
+
+  def formatBody(self, body: bytes) -> str:
+    """
+    Decodes at most MAX_BODY_BYTES of a body for logging.
+
+    Args:
+      body (bytes): Raw body
+
+    Returns:
+      str: Decoded (and possibly truncated) body
+    """
+    limit = self.config["MAX_BODY_BYTES"]
+    text = body[:limit].decode("utf-8", errors="replace")
+
+    if len(body) > limit:
+      text += f"...<{len(body) - limit} more bytes>"
+
+    return text
 
   def process_request(self, request):
-    try:
-      body = request.body.decode("utf-8") if request.body else ""
-    except:
-      body = "<could not decode>"
-    with open(f"{self.logs_dir}/request.log", "a") as logs_file:
-      logs_file.write(f"Request: {request.method} {request.path} {body}\n")
+    request.log_body = random.random() < self.config["BODY_SAMPLE_RATE"]
+    body = ""
+
+    # Bodies are only read for allowed (text) content types, so binary
+    # uploads are never pulled into memory before the upload handlers run.
+    if request.log_body and self.shouldLogBody(request.content_type):
+      try:
+        body = self.formatBody(request.body)
+      except:
+        body = "<could not decode>"
+    elif request.META.get("CONTENT_LENGTH"):
+      body = f"<{request.content_type} body, {request.META['CONTENT_LENGTH']} bytes>"
+
+    self.request_log.write(f"Request: {request.method} {request.path} {body}")
 
   def process_response(self, request, response):
-    try:
-      content = response.content.decode("utf-8") if hasattr(response, "content") else ""
-    except:
-      content = "<could not decode>"
-    with open(f"{self.logs_dir}/response.log", "a") as logs_file:
-      logs_file.write(f"Response: {response.status_code} {content}\n")
+    content = ""
+    content_type = response.get("Content-Type", "").split(";")[0].strip()
+
+    if response.streaming:
+      content = "<streaming response>"
+    elif getattr(request, "log_body", False) and self.shouldLogBody(content_type):
+      content = self.formatBody(response.content)
+
+    self.response_log.write(f"Response: {response.status_code} {content}")
     return response
 
+  async def __acall__(self, request):
+    # Logging only queues lines for the writer threads, so both hooks run
+    # directly on the event loop instead of in MiddlewareMixin's worker thread.
+    self.process_request(request)
+    response = await self.get_response(request)
+    return self.process_response(request, response)
+
   def process_exception(self, request, exception):
     tb = traceback.format_exc()
-    with open(f"{self.logs_dir}/error.log", "a") as logs_file:
-      logs_file.write(f"Exception: {str(exception)}\n{tb}\n")
+    self.error_log.write(f"Exception: {str(exception)}\n{tb}")
@@ -0,0 +1,64 @@
+# Generated by Django 6.0 on 2026-10-18 08:24
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def resolve_duplicate_users(apps, schema_editor):
+    # Emails identify accounts at login, so two accounts sharing one cannot be
+    # told apart safely; they must be merged or changed by hand. Usernames are
+    # only displayed, so all but the oldest account of a name get the account
+    # id appended.
+    User = apps.get_model('PhotosStore', 'User')
+
+    emails = list(
+        User.objects.values('email').annotate(total=Count('id')).filter(total__gt=1).values_list('email', flat=True)
+    )
+    if emails:
+        raise RuntimeError(
+            'Cannot make user emails unique, these are used by several accounts: '
+            f'{", ".join(sorted(emails))}. Merge or change them, then run migrate again.'
+        )
+
+    usernames = User.objects.values('username').annotate(total=Count('id')).filter(total__gt=1).values_list('username', flat=True)
+    for username in list(usernames):
+        for user in User.objects.filter(username=username).order_by('id')[1:]:
+            suffix = f'-{user.id}'
+            renamed = username[:255 - len(suffix)] + suffix
+            while User.objects.filter(username=renamed).exists():
+                suffix += '_'
+                renamed = username[:255 - len(suffix)] + suffix
+            User.objects.filter(id=user.id).update(username=renamed)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('PhotosStore', '0003_album_photo_album'),
+    ]
+
+    operations = [
+        migrations.RunPython(resolve_duplicate_users, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='user',
+            name='email',
+            field=models.EmailField(max_length=255, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='username',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['-created_at', '-id'], name='photos_created_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['album', '-created_at'], name='photos_album_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['user', '-created_at'], name='photos_user_created_at_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-18 08:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('PhotosStore', '0005_photo_status_photo_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PhotoDerivative',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=20)),
+                ('format', models.CharField(max_length=10)),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('image', models.ImageField(upload_to='photos/derivatives/')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('photo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='derivatives', to='PhotosStore.photo')),
+            ],
+            options={
+                'db_table': 'photo_derivatives',
+                'ordering': ['width'],
+                'constraints': [models.UniqueConstraint(fields=('photo', 'name', 'format'), name='photo_derivatives_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 6.0 on 2026-10-18 08:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_album_stats(apps, schema_editor):
+    Album = apps.get_model('PhotosStore', 'Album')
+    Photo = apps.get_model('PhotosStore', 'Photo')
+
+    ready_photos = Photo.objects.filter(album_id=OuterRef('id'), status='ready')
+    ready_count = ready_photos.order_by().values('album_id').annotate(total=Count('id')).values('total')
+    latest_ready = ready_photos.order_by('-created_at', '-id')
+
+    Album.objects.update(
+        photo_count=Coalesce(Subquery(ready_count), Value(0)),
+        cover_photo_id=Subquery(latest_ready.values('id')[:1]),
+        updated_at=Coalesce(Subquery(latest_ready.values('created_at')[:1]), 'created_at'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('PhotosStore', '0008_image_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='album',
+            name='cover_photo',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='PhotosStore.photo'),
+        ),
+        migrations.AddField(
+            model_name='album',
+            name='photo_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='album',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='album',
+            index=models.Index(fields=['-created_at', '-id'], name='albums_created_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='album',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='albums_user_created_at_idx'),
+        ),
+        migrations.RunPython(backfill_album_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 6.0 on 2026-10-18 09:40
+
+from django.db import migrations
+
+# The search index as it was introduced; frozen here so later changes to
+# searchHelper do not change what this migration does.
+SEARCH_TABLES = ['photos', 'albums']
+
+
+def postgres_statements(table):
+    document = (
+        "setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B')"
+    )
+
+    return [
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector",
+        f"""
+        CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+          NEW.search_vector := {document};
+          RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}",
+        f"""
+        CREATE TRIGGER {table}_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF title, description ON {table}
+        FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()
+        """,
+        f"UPDATE {table} SET title = title WHERE search_vector IS NULL",
+        f"CREATE INDEX IF NOT EXISTS {table}_search_vector_idx ON {table} USING gin (search_vector)",
+    ]
+
+
+def sqlite_statements(table):
+    insert = f"INSERT INTO {table}_fts(rowid, title, description) VALUES (new.id, new.title, new.description);"
+    delete = f"INSERT INTO {table}_fts({table}_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);"
+
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5("
+        f"title, description, content='{table}', content_rowid='id', tokenize='porter unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE OF title, description ON {table} BEGIN {delete} {insert} END",
+        f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')",
+    ]
+
+
+def install_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    statements = {'postgresql': postgres_statements, 'sqlite': sqlite_statements}.get(connection.vendor)
+    if statements is None:
+        return
+
+    with connection.cursor() as cursor:
+        for table in SEARCH_TABLES:
+            for statement in statements(table):
+                cursor.execute(statement)
+
+
+def uninstall_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+
+    with connection.cursor() as cursor:
+        for table in SEARCH_TABLES:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}")
+                cursor.execute(f"DROP FUNCTION IF EXISTS {table}_search_vector_update()")
+                cursor.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+
+            elif connection.vendor == 'sqlite':
+                for trigger in ('insert', 'delete', 'update'):
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{trigger}")
+                cursor.execute(f"DROP TABLE IF EXISTS {table}_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('PhotosStore', '0009_album_listing_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-18 09:15
+
+import PhotosStore.storages.shardedPaths
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('PhotosStore', '0012_file_tombstones'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='imageblob',
+            name='file',
+            field=models.ImageField(upload_to=PhotosStore.storages.shardedPaths.ShardedUploadTo('photos/original/')),
+        ),
+        migrations.AlterField(
+            model_name='photo',
+            name='compressed_image',
+            field=models.ImageField(blank=True, upload_to=PhotosStore.storages.shardedPaths.ShardedUploadTo('photos/compressed/')),
+        ),
+        migrations.AlterField(
+            model_name='photo',
+            name='original_image',
+            field=models.ImageField(upload_to=PhotosStore.storages.shardedPaths.ShardedUploadTo('photos/original/')),
+        ),
+        migrations.AlterField(
+            model_name='photoderivative',
+            name='image',
+            field=models.ImageField(upload_to=PhotosStore.storages.shardedPaths.ShardedUploadTo('photos/derivatives/')),
+        ),
+    ]
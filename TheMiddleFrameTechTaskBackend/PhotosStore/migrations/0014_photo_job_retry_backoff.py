@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 09:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('PhotosStore', '0013_sharded_media_paths'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photojob',
+            name='run_after',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
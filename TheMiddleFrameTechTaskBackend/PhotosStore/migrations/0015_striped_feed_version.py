@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-18 11:02
+
+from django.db import migrations
+from django.db.models import Max, Sum
+
+
+def stripe_feed_version(apps, schema_editor):
+    # The feed version becomes the sum of its stripes; carrying the old value
+    # over keeps it from going back to ETags that were already handed out.
+    ContentVersion = apps.get_model('PhotosStore', 'ContentVersion')
+    ContentVersion.objects.filter(key='feed').update(key='feed:0')
+
+
+def merge_feed_version(apps, schema_editor):
+    ContentVersion = apps.get_model('PhotosStore', 'ContentVersion')
+    stripes = ContentVersion.objects.filter(key__startswith='feed:')
+    totals = stripes.aggregate(version=Sum('version'), updated_at=Max('updated_at'))
+
+    stripes.delete()
+    if totals['version'] is not None:
+        ContentVersion.objects.create(key='feed', version=totals['version'], updated_at=totals['updated_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('PhotosStore', '0014_photo_job_retry_backoff'),
+    ]
+
+    operations = [
+        migrations.RunPython(stripe_feed_version, merge_feed_version),
+    ]
@@ -1,7 +1,12 @@
 from .user import User
 from .photo import Photo
 from .album import Album
+from .photoJob import PhotoJob
+from .photoDerivative import PhotoDerivative
+from .contentVersion import ContentVersion
+from .imageBlob import ImageBlob
+from .fileTombstone import FileTombstone
 
-__all__ = ['User', 'Photo', 'Album']
+__all__ = ['User', 'Photo', 'Album', 'PhotoJob', 'PhotoDerivative', 'ContentVersion', 'ImageBlob', 'FileTombstone']
 
 
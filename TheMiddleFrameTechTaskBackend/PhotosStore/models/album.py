@@ -6,8 +6,16 @@ class Album(models.Model):
   description = models.TextField()
   user = models.ForeignKey(User, on_delete=models.CASCADE)
   created_at = models.DateTimeField(auto_now_add=True)
+  updated_at = models.DateTimeField(auto_now=True)
+
+  # Denormalized from the album's ready photos (see albumStatsHelper)
+  photo_count = models.PositiveIntegerField(default=0)
+  cover_photo = models.ForeignKey("Photo", on_delete=models.SET_NULL, related_name="+", null=True, blank=True)
 
   class Meta:
     ordering = ["-created_at"]
     db_table = "albums"
-    
\ No newline at end of file
+    indexes = [
+      models.Index(fields=["-created_at", "-id"], name="albums_created_at_id_idx"),
+      models.Index(fields=["user", "-created_at", "-id"], name="albums_user_created_at_idx"),
+    ]
@@ -0,0 +1,9 @@
+from django.db import models
+
+class ContentVersion(models.Model):
+  key = models.CharField(max_length=100, unique=True)
+  version = models.BigIntegerField(default=0)
+  updated_at = models.DateTimeField(auto_now=True)
+
+  class Meta:
+    db_table = "content_versions"
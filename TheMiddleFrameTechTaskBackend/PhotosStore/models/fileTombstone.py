@@ -0,0 +1,14 @@
+from django.db import models
+
+class FileTombstone(models.Model):
+  # Storage name of a file that may no longer be referenced; the collector
+  # (collectmediagarbage) deletes it once no row points at it any more.
+  name = models.CharField(max_length=255)
+  created_at = models.DateTimeField(auto_now_add=True)
+
+  class Meta:
+    ordering = ["created_at", "id"]
+    db_table = "file_tombstones"
+    indexes = [
+      models.Index(fields=["created_at", "id"], name="file_tombstones_created_idx"),
+    ]
@@ -0,0 +1,12 @@
+from django.db import models
+from ..storages.shardedPaths import ShardedUploadTo
+
+class ImageBlob(models.Model):
+  sha256 = models.CharField(max_length=64, unique=True)
+  file = models.ImageField(upload_to=ShardedUploadTo("photos/original/"))
+  size = models.PositiveBigIntegerField()
+  ref_count = models.PositiveIntegerField(default=0)
+  created_at = models.DateTimeField(auto_now_add=True)
+
+  class Meta:
+    db_table = "image_blobs"
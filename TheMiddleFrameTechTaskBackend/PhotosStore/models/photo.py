@@ -1,17 +1,39 @@
 from django.db import models
 from .user import User
 from .album import Album
+from .imageBlob import ImageBlob
+from ..storages.shardedPaths import ShardedUploadTo
 
 class Photo(models.Model):
+  STATUS_PROCESSING = "processing"
+  STATUS_READY = "ready"
+  STATUS_FAILED = "failed"
+
   user = models.ForeignKey(User, on_delete=models.CASCADE)
   title = models.CharField(max_length=255)
   created_at = models.DateTimeField(auto_now_add=True)
   description = models.TextField()
   capture_date = models.DateField()
-  original_image = models.ImageField(upload_to="photos/original/")
-  compressed_image = models.ImageField(upload_to="photos/compressed/")
+  original_image = models.ImageField(upload_to=ShardedUploadTo("photos/original/"))
+  compressed_image = models.ImageField(upload_to=ShardedUploadTo("photos/compressed/"), blank=True)
+  status = models.CharField(max_length=20, default=STATUS_READY)
+  blob = models.ForeignKey(ImageBlob, on_delete=models.SET_NULL, related_name="photos", null=True, blank=True)
   album = models.ForeignKey("Album", on_delete=models.CASCADE, related_name="photos", null=True, blank=True)
+
+  # Summary of the image: dimensions are read from the header at upload, the
+  # rest is filled when it is processed (see summarizeImage)
+  width = models.PositiveIntegerField(null=True, blank=True)
+  height = models.PositiveIntegerField(null=True, blank=True)
+  original_size = models.PositiveBigIntegerField(null=True, blank=True)
+  compressed_size = models.PositiveBigIntegerField(null=True, blank=True)
+  dominant_color = models.CharField(max_length=7, blank=True)
+  placeholder = models.TextField(blank=True)
   
   class Meta:
     ordering = ["-created_at"]
     db_table = "photos"
+    indexes = [
+      models.Index(fields=["-created_at", "-id"], name="photos_created_at_id_idx"),
+      models.Index(fields=["album", "-created_at"], name="photos_album_created_at_idx"),
+      models.Index(fields=["user", "-created_at"], name="photos_user_created_at_idx"),
+    ]
@@ -0,0 +1,19 @@
+from django.db import models
+from .photo import Photo
+from ..storages.shardedPaths import ShardedUploadTo
+
+class PhotoDerivative(models.Model):
+  photo = models.ForeignKey(Photo, on_delete=models.CASCADE, related_name="derivatives")
+  name = models.CharField(max_length=20)
+  format = models.CharField(max_length=10)
+  width = models.PositiveIntegerField()
+  height = models.PositiveIntegerField()
+  image = models.ImageField(upload_to=ShardedUploadTo("photos/derivatives/"))
+  created_at = models.DateTimeField(auto_now_add=True)
+
+  class Meta:
+    ordering = ["width"]
+    db_table = "photo_derivatives"
+    constraints = [
+      models.UniqueConstraint(fields=["photo", "name", "format"], name="photo_derivatives_unique"),
+    ]
@@ -0,0 +1,25 @@
+from django.db import models
+from .photo import Photo
+
+class PhotoJob(models.Model):
+  STATUS_PENDING = "pending"
+  STATUS_RUNNING = "running"
+  STATUS_DONE = "done"
+  STATUS_FAILED = "failed"
+
+  photo = models.ForeignKey(Photo, on_delete=models.CASCADE, related_name="jobs")
+  status = models.CharField(max_length=20, default=STATUS_PENDING)
+  attempts = models.PositiveIntegerField(default=0)
+  error = models.TextField(blank=True, default="")
+  started_at = models.DateTimeField(null=True, blank=True)
+  # A failed attempt is retried no earlier than this (None: right away)
+  run_after = models.DateTimeField(null=True, blank=True)
+  created_at = models.DateTimeField(auto_now_add=True)
+  updated_at = models.DateTimeField(auto_now=True)
+
+  class Meta:
+    ordering = ["created_at"]
+    db_table = "photo_jobs"
+    indexes = [
+      models.Index(fields=["status", "created_at"], name="photo_jobs_status_created_idx"),
+    ]
@@ -1,8 +1,8 @@
 from django.db import models
 
 class User(models.Model):
-  username = models.CharField(max_length=255)
-  email = models.EmailField(max_length=255)
+  username = models.CharField(max_length=255, unique=True)
+  email = models.EmailField(max_length=255, unique=True)
   password = models.CharField(max_length=255)
   role = models.CharField(max_length=255)
   created_at = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,58 @@
+import os
+import re
+
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage
+from ..helpers.blobHelper import hashFile
+
+# Length of the content digest embedded in stored names
+NAME_HASH_LENGTH = 12
+
+# ".<digest>" as added by HashedFileSystemStorage, optionally followed by the
+# "_<7 chars>" suffix Django appends when a name is already taken
+HASHED_NAME = re.compile(r"\.[0-9a-f]{%d}(?:_[A-Za-z0-9]{7})?\.[A-Za-z0-9]+$" % NAME_HASH_LENGTH)
+NAME_HASH = re.compile(r"\.[0-9a-f]{%d}" % NAME_HASH_LENGTH)
+
+def isHashedName(name: str) -> bool:
+  """
+  Tells whether a stored file name embeds its content digest.
+
+  Args:
+    name (str): Storage name (e.g. "photos/derivatives/a_thumbnail.3f2a9c1b7d4e.webp")
+
+  Returns:
+    bool: True if the content behind the name can never change
+  """
+  return bool(HASHED_NAME.search(os.path.basename(name)))
+
+class HashedNameMixin:
+  """
+  Storage mixin embedding a digest of the content in every saved name.
+
+  A name therefore always refers to the same bytes (even after the file is
+  deleted and uploaded again), which lets media be cached as immutable.
+  """
+
+  def save(self, name, content, max_length=None):
+    if name is None:
+      name = content.name
+    if not hasattr(content, "chunks"):
+      content = File(content, name)
+
+    dir_name, file_name = os.path.split(name)
+    file_root, file_ext = os.path.splitext(file_name)
+
+    # Names derived from a stored file (e.g. "a.<digest>_thumbnail") drop
+    # the digest they inherited
+    file_root = NAME_HASH.sub("", file_root) or "file"
+    suffix = f".{hashFile(content)[:NAME_HASH_LENGTH]}{file_ext}"
+
+    if max_length:
+      # Leave room for the digest and Django's collision suffix ("_" + 7)
+      room = max_length - len(os.path.join(dir_name, suffix)) - 8
+      file_root = file_root[:max(1, room)]
+
+    return super().save(os.path.join(dir_name, file_root + suffix), content, max_length)
+
+class HashedFileSystemStorage(HashedNameMixin, FileSystemStorage):
+  pass
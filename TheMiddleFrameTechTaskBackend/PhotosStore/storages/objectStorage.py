@@ -0,0 +1,507 @@
+import io
+import os
+import uuid
+import queue
+import shutil
+import hashlib
+import tempfile
+import mimetypes
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timezone as dt_timezone
+from urllib.parse import urljoin
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import File
+from django.core.files.storage import Storage
+from django.utils import timezone
+from django.utils._os import safe_join
+from django.utils.deconstruct import deconstructible
+from django.utils.encoding import filepath_to_uri
+from .hashedStorage import HashedNameMixin
+from ..helpers.mediaHelper import FileRange
+
+# Downloaded objects are kept in memory up to this size, on disk beyond it
+DOWNLOAD_MEMORY_BYTES = 8 * 1024 * 1024
+
+# How often the write-behind uploader looks for spooled files it was not told
+# about (left by a crashed process, or by one that exited before uploading)
+SPOOL_RESCAN_SECONDS = 30
+
+def toDatetime(timestamp: float) -> datetime:
+  moment = datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+  return moment if settings.USE_TZ else timezone.make_naive(moment)
+
+class LocalObjectClient:
+  """
+  In-process stand-in for an S3 bucket, keeping each object as a file under a directory.
+
+  It implements the part of the S3 API ObjectStorage uses, with the same
+  semantics: writes are atomic, multipart uploads only become visible once
+  completed, and reading a missing key raises FileNotFoundError. Useful in
+  development and tests, where no object store is running.
+  """
+
+  def __init__(self, root: str):
+    self.root = os.path.abspath(root)
+    self.uploads_root = os.path.join(self.root, ".multipart")
+
+  def objectPath(self, key: str) -> str:
+    return safe_join(self.root, key)
+
+  def writeAtomically(self, path: str, chunks):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".incoming-")
+    try:
+      with os.fdopen(fd, "wb") as output:
+        for chunk in chunks:
+          output.write(chunk)
+      os.replace(temporary_path, path)
+    except BaseException:
+      os.unlink(temporary_path)
+      raise
+
+  def putObject(self, key: str, body: bytes, content_type: str = None):
+    self.writeAtomically(self.objectPath(key), [body])
+
+  def createMultipartUpload(self, key: str, content_type: str = None) -> str:
+    upload_id = uuid.uuid4().hex
+    os.makedirs(os.path.join(self.uploads_root, upload_id))
+    return upload_id
+
+  def uploadPart(self, key: str, upload_id: str, part_number: int, body: bytes) -> str:
+    self.writeAtomically(os.path.join(self.uploads_root, upload_id, str(part_number)), [body])
+    return f'"{hashlib.md5(body).hexdigest()}"'
+
+  def completeMultipartUpload(self, key: str, upload_id: str, parts: list):
+    upload_dir = os.path.join(self.uploads_root, upload_id)
+
+    def partChunks():
+      for part_number, _ in sorted(parts):
+        with open(os.path.join(upload_dir, str(part_number)), "rb") as part:
+          while chunk := part.read(1024 * 1024):
+            yield chunk
+
+    self.writeAtomically(self.objectPath(key), partChunks())
+    shutil.rmtree(upload_dir, ignore_errors=True)
+
+  def abortMultipartUpload(self, key: str, upload_id: str):
+    shutil.rmtree(os.path.join(self.uploads_root, upload_id), ignore_errors=True)
+
+  def headObject(self, key: str) -> dict:
+    stat = os.stat(self.objectPath(key))
+    return {
+      "size": stat.st_size,
+      "modified": stat.st_mtime,
+    }
+
+  def downloadObject(self, key: str, output):
+    with open(self.objectPath(key), "rb") as source:
+      shutil.copyfileobj(source, output)
+
+  def openObject(self, key: str, start: int, length: int):
+    return FileRange(open(self.objectPath(key), "rb"), start, length)
+
+  def deleteObject(self, key: str):
+    try:
+      os.unlink(self.objectPath(key))
+    except FileNotFoundError:
+      pass
+
+class S3ObjectClient:
+  """
+  Client for an S3-compatible object store (AWS S3, MinIO, Cloudflare R2, ...), through boto3.
+  """
+
+  MISSING_CODES = ("404", "NoSuchKey", "NotFound")
+
+  def __init__(self, bucket: str, endpoint_url: str = None, region: str = None, access_key: str = None, secret_key: str = None, max_connections: int = 10):
+    try:
+      import boto3
+      from botocore.config import Config
+      from botocore.exceptions import ClientError
+    except ImportError:
+      raise ImproperlyConfigured("MEDIA_STORAGE=s3 requires boto3 (pip install boto3)")
+
+    if not bucket:
+      raise ImproperlyConfigured("MEDIA_STORAGE=s3 requires MEDIA_STORAGE_BUCKET")
+
+    self.bucket = bucket
+    self.ClientError = ClientError
+    # boto3 clients are thread-safe; one is shared by every part upload
+    self.client = boto3.client(
+      "s3",
+      endpoint_url=endpoint_url or None,
+      region_name=region or None,
+      aws_access_key_id=access_key or None,
+      aws_secret_access_key=secret_key or None,
+      config=Config(max_pool_connections=max_connections, retries={"max_attempts": 5, "mode": "standard"})
+    )
+
+  def raiseMissing(self, error, key: str):
+    if error.response.get("Error", {}).get("Code") in self.MISSING_CODES:
+      raise FileNotFoundError(key) from error
+    raise error
+
+  def putObject(self, key: str, body: bytes, content_type: str = None):
+    self.client.put_object(Bucket=self.bucket, Key=key, Body=body, ContentType=content_type or "application/octet-stream")
+
+  def createMultipartUpload(self, key: str, content_type: str = None) -> str:
+    response = self.client.create_multipart_upload(Bucket=self.bucket, Key=key, ContentType=content_type or "application/octet-stream")
+    return response["UploadId"]
+
+  def uploadPart(self, key: str, upload_id: str, part_number: int, body: bytes) -> str:
+    response = self.client.upload_part(Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=body)
+    return response["ETag"]
+
+  def completeMultipartUpload(self, key: str, upload_id: str, parts: list):
+    self.client.complete_multipart_upload(
+      Bucket=self.bucket,
+      Key=key,
+      UploadId=upload_id,
+      MultipartUpload={"Parts": [{"PartNumber": part_number, "ETag": etag} for part_number, etag in sorted(parts)]}
+    )
+
+  def abortMultipartUpload(self, key: str, upload_id: str):
+    self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+
+  def headObject(self, key: str) -> dict:
+    try:
+      response = self.client.head_object(Bucket=self.bucket, Key=key)
+    except self.ClientError as e:
+      self.raiseMissing(e, key)
+
+    return {
+      "size": response["ContentLength"],
+      "modified": response["LastModified"].timestamp(),
+    }
+
+  def downloadObject(self, key: str, output):
+    try:
+      self.client.download_fileobj(self.bucket, key, output)
+    except self.ClientError as e:
+      self.raiseMissing(e, key)
+
+  def openObject(self, key: str, start: int, length: int):
+    # A ranged GET, so only the requested bytes leave the bucket
+    try:
+      response = self.client.get_object(Bucket=self.bucket, Key=key, Range=f"bytes={start}-{start + length - 1}")
+    except self.ClientError as e:
+      self.raiseMissing(e, key)
+
+    return response["Body"]
+
+  def deleteObject(self, key: str):
+    self.client.delete_object(Bucket=self.bucket, Key=key)
+
+class WriteBehindSpool:
+  """
+  Local directory holding files saved in write-behind mode until they are uploaded.
+
+  A file is acknowledged once it is fsynced here; a background thread then
+  uploads it and removes the local copy. Uploads take an exclusive lock on
+  the spooled file, so processes sharing the spool never upload a file twice,
+  and a file deleted while being uploaded is deleted from the store again.
+  """
+
+  def __init__(self, root: str, upload, delete):
+    self.root = os.path.abspath(root)
+    self.upload = upload
+    self.delete = delete
+    self.queue = queue.Queue()
+    self.thread = None
+    self.lock = threading.Lock()
+
+  def path(self, name: str) -> str:
+    return safe_join(self.root, name)
+
+  def write(self, name: str, content):
+    path = self.path(name)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    fd, temporary_path = tempfile.mkstemp(dir=directory, prefix=".incoming-")
+    try:
+      with os.fdopen(fd, "wb") as output:
+        for chunk in content.chunks():
+          output.write(chunk)
+        output.flush()
+        os.fsync(output.fileno())
+      os.replace(temporary_path, path)
+    except BaseException:
+      os.unlink(temporary_path)
+      raise
+
+    # The rename itself must survive a crash too
+    directory_fd = os.open(directory, os.O_RDONLY)
+    try:
+      os.fsync(directory_fd)
+    finally:
+      os.close(directory_fd)
+
+    self.start()
+    self.queue.put(name)
+
+  def stat(self, name: str):
+    self.start()
+    try:
+      return os.stat(self.path(name))
+    except FileNotFoundError:
+      return None
+
+  def open(self, name: str):
+    self.start()
+    try:
+      return open(self.path(name), "rb")
+    except FileNotFoundError:
+      return None
+
+  def remove(self, name: str):
+    try:
+      os.unlink(self.path(name))
+    except FileNotFoundError:
+      pass
+
+  def pending(self) -> list:
+    names = []
+    for directory, _, files in os.walk(self.root):
+      for file_name in files:
+        if not file_name.startswith(".incoming-"):
+          names.append(os.path.relpath(os.path.join(directory, file_name), self.root).replace(os.sep, "/"))
+    return sorted(names)
+
+  def flush(self, name: str, wait: bool = False) -> bool:
+    """
+    Uploads one spooled file and removes it from the spool.
+
+    Args:
+      name (str): Storage name
+      wait (bool): Wait for an upload of the file in progress elsewhere instead of skipping it
+
+    Returns:
+      bool: True if this call uploaded it, False if it was gone or uploaded elsewhere
+    """
+    import fcntl
+
+    path = self.path(name)
+    try:
+      spooled = open(path, "rb")
+    except FileNotFoundError:
+      return False
+
+    with spooled:
+      try:
+        fcntl.flock(spooled.fileno(), fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+      except BlockingIOError:
+        return False
+
+      # Another process may have uploaded and removed it before the lock was taken
+      try:
+        current = os.stat(path)
+      except FileNotFoundError:
+        return False
+      if current.st_ino != os.fstat(spooled.fileno()).st_ino:
+        return False
+
+      self.upload(name, File(spooled, name))
+
+      try:
+        os.unlink(path)
+      except FileNotFoundError:
+        # Only the lock holder removes uploaded files, so the file was
+        # deleted during the upload; the object just written must go too.
+        self.delete(name)
+
+    return True
+
+  def run(self):
+    while True:
+      try:
+        names = [self.queue.get(timeout=SPOOL_RESCAN_SECONDS)]
+      except queue.Empty:
+        names = self.pending()
+
+      for name in names:
+        try:
+          self.flush(name)
+        except Exception:
+          # Left in the spool; retried at the next rescan
+          pass
+
+  def start(self):
+    with self.lock:
+      if self.thread is None or not self.thread.is_alive():
+        self.thread = threading.Thread(target=self.run, name="media-write-behind", daemon=True)
+        self.thread.start()
+        for name in self.pending():
+          self.queue.put(name)
+
+@deconstructible
+class ObjectStorage(Storage):
+  """
+  Storage keeping media in an object store, so API nodes share no disk.
+
+  Files larger than multipart_threshold are sent as a multipart upload of
+  part_size parts, upload_workers of them in flight at once. In write-behind
+  mode a save returns as soon as the file is durable in spool_dir and is
+  uploaded in the background; reads on the same node see spooled files
+  immediately, other nodes once the upload completes.
+  """
+
+  def __init__(self, client: str = "local", bucket: str = "", endpoint_url: str = "", region: str = "",
+               access_key: str = "", secret_key: str = "", local_root: str = None, public_url: str = "",
+               multipart_threshold: int = 16 * 1024 * 1024, part_size: int = 8 * 1024 * 1024,
+               upload_workers: int = 4, write_behind: bool = False, spool_dir: str = None):
+    if client == "s3":
+      self.client = S3ObjectClient(bucket, endpoint_url, region, access_key, secret_key, max_connections=max(10, upload_workers * 2))
+    elif client == "local":
+      self.client = LocalObjectClient(local_root or os.path.join(settings.BASE_DIR, "object-store"))
+    else:
+      raise ImproperlyConfigured(f"Unknown object storage client: {client}")
+
+    self.base_url = public_url or settings.MEDIA_URL
+    self.multipart_threshold = multipart_threshold
+    self.part_size = part_size
+    self.upload_workers = max(1, upload_workers)
+    self.spool = WriteBehindSpool(
+      spool_dir or os.path.join(settings.BASE_DIR, "media-spool"),
+      self.upload,
+      self.client.deleteObject
+    ) if write_behind else None
+
+  def upload(self, name: str, content):
+    """
+    Writes a file to the object store, in parallel parts when it is large.
+
+    Args:
+      name (str): Storage name (the object key)
+      content (File): File to upload
+    """
+    content_type = mimetypes.guess_type(name)[0]
+
+    if content.size < self.multipart_threshold:
+      self.client.putObject(name, b"".join(content.chunks()), content_type)
+      return
+
+    upload_id = self.client.createMultipartUpload(name, content_type)
+    try:
+      parts = {}
+      uploading = {}
+
+      # A plain pool: part uploads never touch the database, so they need
+      # none of the connection handling of threadPoolHelper
+      with ThreadPoolExecutor(max_workers=self.upload_workers) as executor:
+        for number, chunk in enumerate(content.chunks(chunk_size=self.part_size), start=1):
+          # At most upload_workers parts are held in memory at a time
+          if len(uploading) >= self.upload_workers:
+            done, _ = wait(uploading, return_when=FIRST_COMPLETED)
+            for future in done:
+              parts[uploading.pop(future)] = future.result()
+
+          uploading[executor.submit(self.client.uploadPart, name, upload_id, number, chunk)] = number
+
+        for future, number in uploading.items():
+          parts[number] = future.result()
+
+      self.client.completeMultipartUpload(name, upload_id, sorted(parts.items()))
+
+    except BaseException:
+      self.client.abortMultipartUpload(name, upload_id)
+      raise
+
+  def _save(self, name, content):
+    if self.spool:
+      self.spool.write(name, content)
+    else:
+      self.upload(name, content)
+    return name
+
+  def _open(self, name, mode="rb"):
+    if "w" in mode or "a" in mode or "+" in mode:
+      raise ValueError("Object storage files can only be opened for reading")
+
+    spooled = self.spool.open(name) if self.spool else None
+    if spooled:
+      return File(spooled, name)
+
+    downloaded = tempfile.SpooledTemporaryFile(max_size=DOWNLOAD_MEMORY_BYTES)
+    try:
+      self.client.downloadObject(name, downloaded)
+    except BaseException:
+      downloaded.close()
+      raise
+    downloaded.seek(0)
+
+    return File(downloaded, name)
+
+  def openRange(self, name: str, start: int, length: int):
+    """
+    Opens a byte range of a file for streaming, without downloading the rest of it.
+
+    Args:
+      name (str): Storage name
+      start (int): Offset of the first byte
+      length (int): Number of bytes
+
+    Returns:
+      A readable, closeable file-like object yielding exactly those bytes
+    """
+    spooled = self.spool.open(name) if self.spool else None
+    if spooled:
+      return FileRange(spooled, start, length)
+
+    if not length:
+      return io.BytesIO()
+
+    return self.client.openObject(name, start, length)
+
+  def stat(self, name: str) -> dict:
+    spooled = self.spool.stat(name) if self.spool else None
+    if spooled:
+      return {"size": spooled.st_size, "modified": spooled.st_mtime}
+    return self.client.headObject(name)
+
+  def delete(self, name):
+    if self.spool:
+      self.spool.remove(name)
+    self.client.deleteObject(name)
+
+  def exists(self, name):
+    try:
+      self.stat(name)
+      return True
+    except FileNotFoundError:
+      return False
+
+  def size(self, name):
+    return self.stat(name)["size"]
+
+  def get_modified_time(self, name):
+    return toDatetime(self.stat(name)["modified"])
+
+  def url(self, name):
+    return urljoin(self.base_url, filepath_to_uri(name).lstrip("/"))
+
+  def flushSpool(self) -> tuple:
+    """
+    Uploads every file waiting in the write-behind spool.
+
+    Returns:
+      tuple: (files uploaded, list of (name, error) that failed)
+    """
+    if not self.spool:
+      return 0, []
+
+    uploaded = 0
+    failed = []
+    for name in self.spool.pending():
+      try:
+        uploaded += self.spool.flush(name, wait=True)
+      except Exception as e:
+        failed.append((name, e))
+
+    return uploaded, failed
+
+class HashedObjectStorage(HashedNameMixin, ObjectStorage):
+  pass
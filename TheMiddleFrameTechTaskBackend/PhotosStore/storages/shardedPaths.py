@@ -0,0 +1,50 @@
+import os
+import re
+import uuid
+
+from django.utils.deconstruct import deconstructible
+
+# Two levels of two hex characters: 65,536 directories, so a million files
+# leave about 15 per directory
+SHARD_LEVELS = 2
+SHARD_WIDTH = 2
+
+SHARDED_NAME = re.compile(r"(?:^|/)%s[0-9a-f]{32}[^/]*$" % ("[0-9a-f]{%d}/" % SHARD_WIDTH * SHARD_LEVELS))
+
+def shardedName(prefix: str, extension: str) -> str:
+  """
+  Builds a new, unique storage name under a fan-out of directories.
+
+  Args:
+    prefix (str): Directory of the field (e.g. "photos/original/")
+    extension (str): Extension to keep, with its dot (e.g. ".jpg")
+
+  Returns:
+    str: e.g. "photos/original/3f/a2/3fa2c1...e9.jpg"
+  """
+  key = uuid.uuid4().hex
+  shards = [key[level * SHARD_WIDTH:(level + 1) * SHARD_WIDTH] for level in range(SHARD_LEVELS)]
+
+  return os.path.join(prefix, *shards, key + extension.lower())
+
+def isShardedName(name: str) -> bool:
+  return bool(SHARDED_NAME.search(name))
+
+@deconstructible
+class ShardedUploadTo:
+  """
+  upload_to placing every file under prefix/ab/cd/<uuid>.<ext>.
+
+  Names are random, so directories stay small and the storage finds a free
+  name at its first exists() check, however many files are stored. The
+  uploaded file name only contributes its extension.
+  """
+
+  def __init__(self, prefix: str):
+    self.prefix = prefix
+
+  def __call__(self, instance, filename: str) -> str:
+    return shardedName(self.prefix, os.path.splitext(filename)[1])
+
+  def __eq__(self, other):
+    return isinstance(other, ShardedUploadTo) and self.prefix == other.prefix
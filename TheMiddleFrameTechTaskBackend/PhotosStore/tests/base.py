@@ -0,0 +1,98 @@
+import io
+import json
+import base64
+import shutil
+import tempfile
+import datetime
+
+from PIL import Image
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from ..models.user import User
+from ..models.album import Album
+from ..models.photo import Photo
+from ..helpers import jsonWebTokenHelper
+from ..helpers.passwordHelper import hashPassword
+from ..helpers.principalCacheHelper import token_cache, principal_cache
+from ..helpers.throttleHelper import ip_limiter, account_limiter
+
+# Signs the tokens of the tests, so they do not depend on the SECRET
+# environment variable
+TEST_SECRET = "photosstore-tests-jwt-secret-0123456789"
+
+def imageBytes(width: int = 64, height: int = 48, color=(200, 30, 30), image_format: str = "JPEG") -> bytes:
+  output = io.BytesIO()
+  Image.new("RGB", (width, height), color).save(output, image_format)
+  return output.getvalue()
+
+def imageBase64(**options) -> str:
+  return base64.b64encode(imageBytes(**options)).decode()
+
+class MediaRootMixin:
+  """
+  Points MEDIA_ROOT at a temporary directory for the duration of a test class.
+  """
+
+  @classmethod
+  def setUpClass(cls):
+    super().setUpClass()
+    cls.media_root = tempfile.mkdtemp(prefix="photosstore-tests-")
+    cls.addClassCleanup(shutil.rmtree, cls.media_root, ignore_errors=True)
+    cls.enterClassContext(override_settings(MEDIA_ROOT=cls.media_root))
+
+@override_settings(SECRET=TEST_SECRET, PHOTO_JOBS_INLINE=False)
+class ApiTestCase(MediaRootMixin, TestCase):
+  """
+  Base class of the API tests.
+
+  Resets the per-process caches that outlive a test's transaction, and
+  queues photo jobs instead of running them inside upload requests.
+  """
+
+  def setUp(self):
+    caches["default"].clear()
+    for cache in (token_cache, principal_cache, ip_limiter.buckets, account_limiter.buckets):
+      cache.clear()
+
+  def createUser(self, username: str, role: str = "uploader", password: str = "password") -> User:
+    return User.objects.create(
+      username=username,
+      email=f"{username}@example.com",
+      password=hashPassword(password),
+      role=role
+    )
+
+  def authHeaders(self, user: User) -> dict:
+    return {"HTTP_AUTHORIZATION": "Bearer " + jsonWebTokenHelper.encode({"id": user.id})}
+
+  def createPhoto(self, user: User, album: Album = None, **fields) -> Photo:
+    return Photo.objects.create(
+      user=user,
+      album=album,
+      title=fields.pop("title", "Photo"),
+      description=fields.pop("description", ""),
+      capture_date=datetime.date(2024, 1, 1),
+      original_image=fields.pop("original_image", "photos/original/test.jpg"),
+      **fields
+    )
+
+  def postJson(self, path: str, body: dict, **headers):
+    return self.client.post(path, json.dumps(body), content_type="application/json", **headers)
+
+  def uploadPhotos(self, user: User, images: list, **album) -> list:
+    """
+    Uploads base64 images through the JSON endpoint and returns the ids of the new photos.
+    """
+    response = self.postJson("/api/photos/upload", {
+      "photos": [{
+        "photo": image,
+        "filename": f"photo_{index}.jpg",
+        "title": f"Photo {index}",
+        "description": "Uploaded photo",
+        "capture_date": "2024-01-01"
+      } for index, image in enumerate(images)],
+      **(album or {"album": {"title": "Album", "description": "Uploaded album"}})
+    }, **self.authHeaders(user))
+
+    self.assertEqual(response.status_code, 201, response.content)
+    return [photo["id"] for photo in response.json()["photos"]]
@@ -0,0 +1,48 @@
+import io
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from .base import ApiTestCase
+from ..models.user import User
+from ..models.album import Album
+from ..models.photo import Photo
+from ..models.imageBlob import ImageBlob
+from ..helpers.benchmarkHelper import summarizeLatencies, BENCHMARK_EMAIL_DOMAIN
+
+class SummarizeLatenciesTests(SimpleTestCase):
+  def test_percentiles_of_samples(self):
+    summary = summarizeLatencies([float(sample) for sample in range(1, 101)])
+
+    self.assertEqual(summary["mean_ms"], 50.5)
+    self.assertEqual(summary["p50_ms"], 51.0)
+    self.assertEqual(summary["p95_ms"], 96.0)
+    self.assertEqual(summary["p99_ms"], 100.0)
+    self.assertEqual(summary["max_ms"], 100.0)
+
+  def test_no_samples(self):
+    self.assertEqual(set(summarizeLatencies([]).values()), {None})
+
+class SeedBenchmarkTests(ApiTestCase):
+  def seed(self, *args):
+    call_command(
+      "seedbenchmark", "--users", "2", "--albums", "2", "--photos", "10",
+      "--distinct-images", "2", "--image-size", "96x64", *args, stdout=io.StringIO()
+    )
+
+  def test_seeded_photos_share_the_rendered_images(self):
+    self.seed()
+
+    users = User.objects.filter(email__endswith=f"@{BENCHMARK_EMAIL_DOMAIN}")
+    photos = Photo.objects.filter(user__in=users)
+    self.assertEqual(users.count(), 2)
+    self.assertEqual(Album.objects.filter(user__in=users).count(), 4)
+    self.assertEqual(photos.filter(status=Photo.STATUS_READY).count(), 10)
+    self.assertEqual(sorted(ImageBlob.objects.values_list("ref_count", flat=True)), [5, 5])
+    self.assertEqual(sum(Album.objects.filter(user__in=users).values_list("photo_count", flat=True)), 10)
+
+  def test_reset_replaces_the_seeded_data(self):
+    self.seed()
+    self.seed("--reset")
+
+    self.assertEqual(Photo.objects.count(), 10)
+    self.assertEqual(User.objects.count(), 2)
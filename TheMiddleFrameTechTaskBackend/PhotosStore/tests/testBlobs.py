@@ -0,0 +1,60 @@
+from django.core.files.storage import default_storage
+from .base import ApiTestCase, imageBase64
+from ..models.photo import Photo
+from ..models.photoJob import PhotoJob
+from ..models.imageBlob import ImageBlob
+from ..models.fileTombstone import FileTombstone
+from ..helpers.deletionHelper import collectGarbage
+
+class BlobReferenceTests(ApiTestCase):
+  def setUp(self):
+    super().setUp()
+    self.user = self.createUser("uploader")
+
+  def test_identical_uploads_share_one_blob(self):
+    image = imageBase64()
+
+    [first_id] = self.uploadPhotos(self.user, [image])
+    [second_id] = self.uploadPhotos(self.user, [image])
+    self.uploadPhotos(self.user, [imageBase64(color=(30, 200, 30))])
+
+    first, second = Photo.objects.get(id=first_id), Photo.objects.get(id=second_id)
+    self.assertEqual(first.blob_id, second.blob_id)
+    self.assertEqual(first.original_image.name, second.original_image.name)
+    self.assertEqual(ImageBlob.objects.get(id=first.blob_id).ref_count, 2)
+    self.assertEqual(ImageBlob.objects.count(), 2)
+    self.assertEqual(PhotoJob.objects.filter(photo_id__in=[first_id, second_id]).count(), 2)
+
+  def test_duplicates_within_one_batch_share_one_blob(self):
+    image = imageBase64()
+
+    photo_ids = self.uploadPhotos(self.user, [image, image])
+
+    self.assertEqual(ImageBlob.objects.count(), 1)
+    self.assertEqual(ImageBlob.objects.get().ref_count, 2)
+    self.assertEqual(Photo.objects.filter(id__in=photo_ids, blob=ImageBlob.objects.get()).count(), 2)
+
+  def test_blob_is_released_with_its_last_photo(self):
+    image = imageBase64()
+    [first_id] = self.uploadPhotos(self.user, [image])
+    [second_id] = self.uploadPhotos(self.user, [image])
+    blob = Photo.objects.get(id=first_id).blob
+
+    response = self.client.delete(f"/api/photos/delete/{first_id}", **self.authHeaders(self.user))
+
+    self.assertEqual(response.status_code, 200)
+    blob.refresh_from_db()
+    self.assertEqual(blob.ref_count, 1)
+
+    # The shared original is tombstoned, but kept while the blob references it
+    collectGarbage(batch_size=100, grace_seconds=0)
+    self.assertTrue(default_storage.exists(blob.file.name))
+
+    response = self.postJson("/api/photos/delete", {"photo_ids": [second_id]}, **self.authHeaders(self.user))
+
+    self.assertEqual(response.status_code, 200)
+    self.assertFalse(ImageBlob.objects.filter(id=blob.id).exists())
+    self.assertTrue(FileTombstone.objects.filter(name=blob.file.name).exists())
+
+    collectGarbage(batch_size=100, grace_seconds=0)
+    self.assertFalse(default_storage.exists(blob.file.name))
@@ -0,0 +1,138 @@
+import threading
+
+from unittest.mock import patch
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import SimpleTestCase, override_settings
+from .base import ApiTestCase, imageBase64, imageBytes
+from ..models.photo import Photo
+from ..models.photoJob import PhotoJob
+from ..helpers.decodeBudgetHelper import MemoryBudget, DecodeBudgetExhausted, peakDecodeBytes
+from ..helpers.photoJobHelper import claimPhotoJobs, processPhotoJob
+
+def imageDecode(**limits) -> dict:
+  return dict(settings.IMAGE_DECODE, **limits)
+
+class MemoryBudgetTests(SimpleTestCase):
+  def test_reservations_are_admitted_while_they_fit(self):
+    budget = MemoryBudget(100)
+
+    self.assertTrue(budget.acquire(60, timeout=0))
+    self.assertFalse(budget.acquire(60, timeout=0))
+    self.assertTrue(budget.acquire(40, timeout=0))
+
+    budget.release(60)
+
+    self.assertEqual(budget.used, 40)
+    self.assertTrue(budget.fits(60))
+
+  def test_oversize_reservation_runs_alone(self):
+    budget = MemoryBudget(100)
+
+    self.assertTrue(budget.acquire(500, timeout=0))
+    self.assertFalse(budget.acquire(1, timeout=0))
+
+    budget.release(500)
+    budget.acquire(1, timeout=0)
+
+    self.assertFalse(budget.acquire(500, timeout=0))
+
+  def test_waiting_reservation_is_admitted_on_release(self):
+    budget = MemoryBudget(100)
+    budget.acquire(100)
+    admitted = []
+
+    waiter = threading.Thread(target=lambda: admitted.append(budget.acquire(50, timeout=5)))
+    waiter.start()
+    budget.release(100)
+    waiter.join()
+
+    self.assertEqual(admitted, [True])
+    self.assertEqual(budget.used, 50)
+
+  @override_settings(IMAGE_DECODE=imageDecode(RETRY_AFTER=7))
+  def test_reserve_raises_when_there_is_no_room_in_time(self):
+    budget = MemoryBudget(100)
+
+    with budget.reserve(80):
+      with self.assertRaises(DecodeBudgetExhausted) as raised:
+        with budget.reserve(80, timeout=0.01):
+          pass
+
+    self.assertEqual(raised.exception.retry_after, 7)
+    self.assertEqual(budget.used, 0)
+
+  def test_peak_is_the_largest_costs_in_flight_together(self):
+    self.assertEqual(peakDecodeBytes([10, 50, 30, 20], 2), 80)
+    self.assertEqual(peakDecodeBytes([10, 50, 30, 20], 0), 50)
+    self.assertEqual(peakDecodeBytes([], 4), 0)
+
+@override_settings(IMAGE_DECODE=imageDecode(MAX_PIXELS=10000))
+class ImageTooLargeTests(ApiTestCase):
+  def setUp(self):
+    super().setUp()
+    self.user = self.createUser("uploader")
+
+  def test_upload_over_the_pixel_limit_is_rejected(self):
+    response = self.postJson("/api/photos/upload", {
+      "photos": [{
+        "photo": imageBase64(width=200, height=100),
+        "filename": "large.jpg",
+        "title": "Large",
+        "description": "Photo",
+        "capture_date": "2024-01-01"
+      }]
+    }, **self.authHeaders(self.user))
+
+    self.assertEqual(response.status_code, 400)
+    self.assertIn("megapixel", str(response.json()).lower())
+    self.assertFalse(Photo.objects.exists())
+
+  def test_job_over_the_pixel_limit_fails_without_retrying(self):
+    name = default_storage.save("photos/original/large.jpg", ContentFile(imageBytes(200, 100)))
+    photo = self.createPhoto(self.user, original_image=name, width=200, height=100, status=Photo.STATUS_PROCESSING)
+    PhotoJob.objects.create(photo=photo)
+
+    statuses = [processPhotoJob(job_id) for job_id, _ in claimPhotoJobs(10)]
+
+    self.assertEqual(statuses, [PhotoJob.STATUS_FAILED])
+    self.assertEqual(PhotoJob.objects.get(photo=photo).attempts, 1)
+    self.assertEqual(Photo.objects.get(id=photo.id).status, Photo.STATUS_FAILED)
+
+class DecodeAdmissionTests(ApiTestCase):
+  def setUp(self):
+    super().setUp()
+    self.user = self.createUser("uploader")
+    self.budget = MemoryBudget(1024)
+    # Another decode holds the whole budget
+    self.budget.acquire(1024)
+
+  @override_settings(PHOTO_JOBS_INLINE=True, IMAGE_DECODE=imageDecode(WAIT_SECONDS=0.01, RETRY_AFTER=7))
+  def test_inline_upload_is_refused_when_the_budget_is_exhausted(self):
+    with patch("PhotosStore.controllers.photosController.decodeBudget", return_value=self.budget):
+      response = self.postJson("/api/photos/upload", {
+        "photos": [{
+          "photo": imageBase64(),
+          "filename": "photo.jpg",
+          "title": "Photo",
+          "description": "Photo",
+          "capture_date": "2024-01-01"
+        }]
+      }, **self.authHeaders(self.user))
+
+    self.assertEqual(response.status_code, 503)
+    self.assertEqual(response["Retry-After"], "7")
+    self.assertFalse(Photo.objects.exists())
+
+  def test_queued_jobs_wait_for_room_in_the_budget(self):
+    [photo_id] = self.uploadPhotos(self.user, [imageBase64()])
+
+    self.assertEqual(claimPhotoJobs(10, self.budget), [])
+    self.assertEqual(PhotoJob.objects.get(photo_id=photo_id).status, PhotoJob.STATUS_PENDING)
+
+    self.budget.release(1024)
+    [(job_id, cost)] = claimPhotoJobs(10, self.budget)
+
+    self.assertEqual(self.budget.used, cost)
+    self.assertEqual(PhotoJob.objects.get(id=job_id).status, PhotoJob.STATUS_RUNNING)
@@ -0,0 +1,82 @@
+from .base import ApiTestCase
+from ..models.album import Album
+from ..models.photo import Photo
+from ..controllers.photosController import DELETE_MAX_IDS
+
+class PhotoDeletionTests(ApiTestCase):
+  def setUp(self):
+    super().setUp()
+    self.owner = self.createUser("owner")
+    self.other = self.createUser("other")
+    self.album = Album.objects.create(title="Album", description="", user=self.owner)
+    self.photo = self.createPhoto(self.owner, self.album)
+
+  def test_delete_of_another_users_photo_is_forbidden(self):
+    response = self.client.delete(f"/api/photos/delete/{self.photo.id}", **self.authHeaders(self.other))
+
+    self.assertEqual(response.status_code, 403)
+    self.assertTrue(Photo.objects.filter(id=self.photo.id).exists())
+
+  def test_delete_of_missing_photo_is_not_found(self):
+    response = self.client.delete(f"/api/photos/delete/{self.photo.id + 1000}", **self.authHeaders(self.owner))
+
+    self.assertEqual(response.status_code, 404)
+
+  def test_delete_by_buyer_is_forbidden(self):
+    buyer = self.createUser("buyer", role="buyer")
+
+    response = self.client.delete(f"/api/photos/delete/{self.photo.id}", **self.authHeaders(buyer))
+
+    self.assertEqual(response.status_code, 403)
+
+  def test_owner_deletes_photo(self):
+    response = self.client.delete(f"/api/photos/delete/{self.photo.id}", **self.authHeaders(self.owner))
+
+    self.assertEqual(response.status_code, 200)
+    self.assertFalse(Photo.objects.filter(id=self.photo.id).exists())
+
+  def test_bulk_delete_reports_other_users_photos_as_not_found(self):
+    foreign_photo = self.createPhoto(self.other)
+
+    response = self.postJson(
+      "/api/photos/delete",
+      {"photo_ids": [self.photo.id, foreign_photo.id]},
+      **self.authHeaders(self.owner)
+    )
+
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(response.json()["deleted"], 1)
+    self.assertEqual(response.json()["not_found"], [foreign_photo.id])
+    self.assertTrue(Photo.objects.filter(id=foreign_photo.id).exists())
+
+  def test_bulk_delete_rejects_booleans_as_ids(self):
+    for body in ({"photo_ids": [True]}, {"album_id": True}):
+      response = self.postJson("/api/photos/delete", body, **self.authHeaders(self.owner))
+
+      self.assertEqual(response.status_code, 400, body)
+
+    self.assertTrue(Photo.objects.filter(id=self.photo.id).exists())
+
+  def test_bulk_delete_caps_the_number_of_ids(self):
+    for photo_ids in ([], list(range(1, DELETE_MAX_IDS + 2))):
+      response = self.postJson("/api/photos/delete", {"photo_ids": photo_ids}, **self.authHeaders(self.owner))
+
+      self.assertEqual(response.status_code, 400)
+
+  def test_bulk_delete_of_another_users_album_is_forbidden(self):
+    response = self.postJson("/api/photos/delete", {"album_id": self.album.id}, **self.authHeaders(self.other))
+
+    self.assertEqual(response.status_code, 403)
+    self.assertTrue(Album.objects.filter(id=self.album.id).exists())
+    self.assertTrue(Photo.objects.filter(id=self.photo.id).exists())
+
+  def test_bulk_delete_removes_an_album_with_its_photos(self):
+    self.createPhoto(self.owner, self.album)
+    kept = self.createPhoto(self.owner)
+
+    response = self.postJson("/api/photos/delete", {"album_id": self.album.id}, **self.authHeaders(self.owner))
+
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(response.json()["deleted"], 2)
+    self.assertFalse(Album.objects.filter(id=self.album.id).exists())
+    self.assertEqual(list(Photo.objects.values_list("id", flat=True)), [kept.id])
@@ -0,0 +1,60 @@
+import json
+
+from .base import ApiTestCase
+from ..models.photo import Photo
+
+class FeedPaginationTests(ApiTestCase):
+  def setUp(self):
+    super().setUp()
+    user = self.createUser("uploader")
+    self.photos = [self.createPhoto(user, title=f"Photo {index}") for index in range(5)]
+    self.createPhoto(user, title="Processing", status=Photo.STATUS_PROCESSING)
+    self.expected_ids = [
+      photo.id for photo in sorted(self.photos, key=lambda photo: (photo.created_at, photo.id), reverse=True)
+    ]
+
+  def getPage(self, **params):
+    response = self.client.get("/api/photos/", params)
+    self.assertEqual(response.status_code, 200)
+    return response.json()
+
+  def test_full_feed_is_streamed_without_paging_parameters(self):
+    response = self.client.get("/api/photos/")
+
+    self.assertTrue(response.streaming)
+    photos = json.loads(b"".join(response.streaming_content))
+    self.assertEqual([photo["id"] for photo in photos], self.expected_ids)
+
+  def test_pages_cover_feed_once_in_order(self):
+    seen = []
+    cursor = None
+    while True:
+      page = self.getPage(limit=2, **({"cursor": cursor} if cursor else {}))
+      self.assertLessEqual(len(page["photos"]), 2)
+      seen += [photo["id"] for photo in page["photos"]]
+      cursor = page["next_cursor"]
+      if cursor is None:
+        break
+
+    self.assertEqual(seen, self.expected_ids)
+
+  def test_page_filling_the_feed_exactly_has_no_next_cursor(self):
+    page = self.getPage(limit=5)
+
+    self.assertEqual(len(page["photos"]), 5)
+    self.assertIsNone(page["next_cursor"])
+
+  def test_page_one_short_of_the_feed_has_next_cursor(self):
+    page = self.getPage(limit=4)
+
+    self.assertEqual(len(page["photos"]), 4)
+    self.assertIsNotNone(page["next_cursor"])
+
+    last_page = self.getPage(limit=4, cursor=page["next_cursor"])
+    self.assertEqual(len(last_page["photos"]), 1)
+    self.assertIsNone(last_page["next_cursor"])
+
+  def test_invalid_paging_parameters_are_rejected(self):
+    for params in ({"cursor": "not-a-cursor"}, {"limit": "0"}, {"limit": "ten"}):
+      response = self.client.get("/api/photos/", params)
+      self.assertEqual(response.status_code, 400, params)
@@ -0,0 +1,110 @@
+from asgiref.sync import async_to_sync, sync_to_async
+from django.http import JsonResponse
+from django.test import RequestFactory, AsyncRequestFactory
+from .base import ApiTestCase
+from ..helpers.passwordHelper import hashPassword
+from ..helpers.httpCacheHelper import versionedResponse, bumpContentVersions
+
+TEST_VERSION_KEY = "test"
+
+def renderingView(write_while_rendering: bool):
+  """
+  Returns a versioned view counting its renders, which can commit a write while rendering.
+  """
+  renders = []
+
+  @versionedResponse(lambda request: [TEST_VERSION_KEY])
+  def view(request):
+    renders.append(request)
+    if write_while_rendering:
+      bumpContentVersions([TEST_VERSION_KEY])
+    return JsonResponse({"renders": len(renders)})
+
+  return view, renders
+
+class FeedEtagTests(ApiTestCase):
+  def setUp(self):
+    super().setUp()
+    self.user = self.createUser("uploader")
+    self.photo = self.createPhoto(self.user)
+
+  def getFeed(self, **headers):
+    return self.client.get("/api/photos/", {"limit": 10}, **headers)
+
+  def test_matching_etag_is_not_modified(self):
+    etag = self.getFeed()["ETag"]
+
+    response = self.getFeed(HTTP_IF_NONE_MATCH=etag)
+
+    self.assertEqual(response.status_code, 304)
+
+  def test_photo_write_changes_etag(self):
+    etag = self.getFeed()["ETag"]
+
+    self.createPhoto(self.user, title="New photo")
+    response = self.getFeed(HTTP_IF_NONE_MATCH=etag)
+
+    self.assertEqual(response.status_code, 200)
+    self.assertNotEqual(response["ETag"], etag)
+    self.assertEqual(len(response.json()["photos"]), 2)
+
+  def test_uploader_rename_changes_etag_but_other_user_writes_do_not(self):
+    etag = self.getFeed()["ETag"]
+
+    self.user.password = hashPassword("changed")
+    self.user.save()
+    self.createUser("someone-else")
+
+    self.assertEqual(self.getFeed(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    self.user.username = "renamed"
+    self.user.save()
+    response = self.getFeed(HTTP_IF_NONE_MATCH=etag)
+
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(response.json()["photos"][0]["user"]["username"], "renamed")
+
+  def test_streamed_feed_has_no_validators(self):
+    response = self.client.get("/api/photos/")
+
+    self.assertTrue(response.streaming)
+    self.assertFalse(response.has_header("ETag"))
+    self.assertFalse(response.has_header("Last-Modified"))
+
+class VersionedResponseTests(ApiTestCase):
+  def test_unchanged_response_is_cached_under_its_etag(self):
+    view, renders = renderingView(write_while_rendering=False)
+
+    first = view(RequestFactory().get("/versioned"))
+    second = view(RequestFactory().get("/versioned"))
+
+    self.assertEqual(len(renders), 1)
+    self.assertEqual(first["ETag"], second["ETag"])
+    self.assertEqual(second.content, first.content)
+
+  def test_write_during_rendering_drops_validators(self):
+    view, renders = renderingView(write_while_rendering=True)
+
+    response = view(RequestFactory().get("/versioned"))
+
+    self.assertEqual(response.status_code, 200)
+    self.assertFalse(response.has_header("ETag"))
+    self.assertFalse(response.has_header("Last-Modified"))
+
+    # Not cached either: the next request renders again
+    view(RequestFactory().get("/versioned"))
+    self.assertEqual(len(renders), 2)
+
+  def test_async_write_during_rendering_drops_validators(self):
+    renders = []
+
+    @versionedResponse(lambda request: [TEST_VERSION_KEY])
+    async def view(request):
+      renders.append(request)
+      await sync_to_async(bumpContentVersions)([TEST_VERSION_KEY])
+      return JsonResponse({"renders": len(renders)})
+
+    response = async_to_sync(view)(AsyncRequestFactory().get("/versioned"))
+
+    self.assertEqual(response.status_code, 200)
+    self.assertFalse(response.has_header("ETag"))
@@ -0,0 +1,110 @@
+from io import BytesIO
+from unittest.mock import patch
+from PIL import Image, ImageChops
+from django.test import SimpleTestCase
+from .base import imageBytes
+from ..helpers.imageHelper import (
+  loadImage, processImageForUpload, draftScale, estimateDecodeBytes, drawWatermark, renderWatermarkTile, addWatermark,
+  renderDerivatives, supportedDerivativeFormats, describeImage
+)
+
+class SingleDecodePipelineTests(SimpleTestCase):
+  def test_upload_is_scaled_watermarked_and_encoded_as_jpeg(self):
+    processed = Image.open(processImageForUpload(BytesIO(imageBytes(2400, 1600, color=(20, 20, 20))), max_width=1200))
+
+    self.assertEqual(processed.format, "JPEG")
+    self.assertEqual(processed.size, (1200, 800))
+    # The watermark box is drawn in the bottom right corner only
+    self.assertLess(max(processed.getpixel((10, 10))), 60)
+    self.assertGreater(max(processed.crop((900, 700, 1200, 800)).getextrema()[0]), 150)
+
+  def test_smaller_image_is_not_upscaled(self):
+    processed = Image.open(processImageForUpload(BytesIO(imageBytes(640, 480)), max_width=1200))
+
+    self.assertEqual(processed.size, (640, 480))
+
+  def test_large_jpeg_is_decoded_at_a_reduced_scale(self):
+    self.assertEqual(draftScale(4800, "JPEG", 1200), 4)
+    self.assertEqual(draftScale(2000, "JPEG", 1200), 1)
+    self.assertEqual(draftScale(4800, "PNG", 1200), 1)
+    self.assertLess(estimateDecodeBytes(4800, 3200, "JPEG", 1200), estimateDecodeBytes(4800, 3200, "PNG", 1200))
+
+    loaded = loadImage(Image.open(BytesIO(imageBytes(4800, 3200))), max_width=1200)
+
+    self.assertEqual(loaded.size, (1200, 800))
+    self.assertEqual(loaded.mode, "RGB")
+
+  def test_non_rgb_sources_are_converted(self):
+    source = BytesIO()
+    Image.new("LA", (300, 200), (120, 255)).save(source, "PNG")
+
+    loaded = loadImage(source, max_width=1200)
+
+    self.assertEqual(loaded.mode, "RGB")
+    self.assertEqual(loaded.size, (300, 200))
+
+class WatermarkTests(SimpleTestCase):
+  def test_tile_is_rendered_once_per_text_and_size(self):
+    self.assertIs(renderWatermarkTile("Cached tile", 30), renderWatermarkTile("Cached tile", 30))
+    self.assertIsNot(renderWatermarkTile("Cached tile", 30), renderWatermarkTile("Cached tile", 40))
+
+  def test_only_the_watermark_region_changes(self):
+    original = Image.new("RGB", (1000, 700), (30, 60, 90))
+    tile = renderWatermarkTile("TMF Marketplace", 50)
+
+    watermarked = drawWatermark(original.copy())
+
+    left, top, right, bottom = ImageChops.difference(original, watermarked).getbbox()
+    self.assertLessEqual(right - left, tile.width)
+    self.assertLessEqual(bottom - top, tile.height)
+    self.assertGreater(left, original.width // 2)
+    self.assertGreater(top, original.height // 2)
+
+  def test_encoded_image_keeps_its_size(self):
+    watermarked = Image.open(addWatermark(BytesIO(imageBytes(800, 600))))
+
+    self.assertEqual(watermarked.format, "JPEG")
+    self.assertEqual(watermarked.size, (800, 600))
+
+class DerivativeTests(SimpleTestCase):
+  WIDTHS = {"thumbnail": 320, "medium": 800, "large": 1200}
+
+  def test_every_size_is_rendered_in_every_format(self):
+    derivatives = renderDerivatives(BytesIO(imageBytes(1600, 1000)), self.WIDTHS, ["jpeg", "webp"])
+
+    self.assertEqual(
+      [(derivative["name"], derivative["format"], derivative["width"], derivative["height"]) for derivative in derivatives],
+      [
+        ("large", "jpeg", 1200, 750), ("large", "webp", 1200, 750),
+        ("medium", "jpeg", 800, 500), ("medium", "webp", 800, 500),
+        ("thumbnail", "jpeg", 320, 200), ("thumbnail", "webp", 320, 200),
+      ]
+    )
+    for derivative in derivatives:
+      encoded = Image.open(derivative["content"])
+      self.assertEqual(encoded.format, {"jpeg": "JPEG", "webp": "WEBP"}[derivative["format"]])
+      self.assertEqual(encoded.width, derivative["width"])
+
+  def test_sizes_wider_than_the_source_collapse_into_one(self):
+    derivatives = renderDerivatives(BytesIO(imageBytes(640, 400)), self.WIDTHS, ["jpeg"])
+
+    self.assertEqual([(derivative["name"], derivative["width"]) for derivative in derivatives], [("large", 640), ("thumbnail", 320)])
+
+  def test_unsupported_formats_are_skipped(self):
+    self.assertEqual(supportedDerivativeFormats(["jpeg", "bogus"]), ["jpeg"])
+
+    derivatives = renderDerivatives(BytesIO(imageBytes(400, 300)), {"thumbnail": 320}, ["bogus", "jpeg"])
+
+    self.assertEqual([derivative["format"] for derivative in derivatives], ["jpeg"])
+
+  def test_summary_comes_from_the_same_decode(self):
+    source = imageBytes(1600, 1000, color=(30, 60, 200), image_format="PNG")
+    summaries = []
+
+    with patch("PhotosStore.helpers.imageHelper.Image.open", wraps=Image.open) as opened:
+      renderDerivatives(BytesIO(source), self.WIDTHS, ["jpeg"], describe=summaries.append)
+
+    self.assertEqual(opened.call_count, 1)
+    [summary] = summaries
+    self.assertEqual((summary["width"], summary["height"]), (1600, 1000))
+    self.assertEqual(summary, describeImage(BytesIO(source)))
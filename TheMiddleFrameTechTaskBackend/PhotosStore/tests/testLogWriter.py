@@ -0,0 +1,95 @@
+import os
+import time
+import shutil
+import tempfile
+import threading
+
+from django.test import SimpleTestCase
+from ..helpers.logWriterHelper import BackgroundLogWriter
+
+class GatedLogWriter(BackgroundLogWriter):
+  """
+  Writer whose first open waits for a gate (and can fail), to hold the thread at a known point.
+  """
+
+  RETRY_DELAY = 0.01
+
+  def __init__(self, *args, failures: int = 0, **kwargs):
+    self.gate = threading.Event()
+    self.failures = failures
+    super().__init__(*args, **kwargs)
+
+  def openFile(self):
+    self.gate.wait(5)
+    if self.failures:
+      self.failures -= 1
+      raise OSError("disk full")
+    return super().openFile()
+
+class BackgroundLogWriterTests(SimpleTestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp(prefix="photosstore-logs-")
+    self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+    self.path = os.path.join(self.directory, "nested", "requests.log")
+
+  def readLines(self, path: str = None) -> list:
+    with open(path or self.path, encoding="utf-8") as logs_file:
+      return logs_file.read().splitlines()
+
+  def waitForEmptyQueue(self, writer: BackgroundLogWriter):
+    deadline = time.monotonic() + 5
+    while not writer.queue.empty() and time.monotonic() < deadline:
+      time.sleep(0.001)
+
+  def test_lines_are_written_in_order_on_close(self):
+    writer = BackgroundLogWriter(self.path, batch_size=7)
+    for index in range(100):
+      writer.write(f"line {index}")
+    writer.close()
+
+    self.assertEqual(self.readLines(), [f"line {index}" for index in range(100)])
+    self.assertFalse(writer.thread.is_alive())
+
+  def test_files_rotate_and_keep_backup_count(self):
+    writer = BackgroundLogWriter(self.path, max_bytes=100, backup_count=2, batch_size=1)
+    for index in range(50):
+      writer.write(f"line {index:02d} " + "x" * 20)
+    writer.close()
+
+    self.assertTrue(os.path.exists(f"{self.path}.1"))
+    self.assertTrue(os.path.exists(f"{self.path}.2"))
+    self.assertFalse(os.path.exists(f"{self.path}.3"))
+    for path in (f"{self.path}.1", f"{self.path}.2"):
+      self.assertLessEqual(os.path.getsize(path), 100 + 40)
+
+    # Oldest lines were rotated out; the kept ones are the most recent, in order
+    kept = []
+    for path in (f"{self.path}.2", f"{self.path}.1", self.path):
+      kept += self.readLines(path) if os.path.exists(path) else []
+    self.assertEqual(kept, [f"line {index:02d} " + "x" * 20 for index in range(50 - len(kept), 50)])
+
+  def test_lines_over_the_queue_size_are_dropped_and_reported(self):
+    writer = GatedLogWriter(self.path, queue_size=1)
+    writer.write("first")
+    self.waitForEmptyQueue(writer)
+
+    # The thread holds "first" at the gate: one more line fits, four do not
+    for index in range(5):
+      writer.write(f"queued {index}")
+    writer.gate.set()
+    writer.close()
+
+    self.assertEqual(self.readLines(), ["first", "queued 0", "[logger] dropped 4 line(s), queue was full"])
+
+  def test_writer_survives_io_errors(self):
+    writer = GatedLogWriter(self.path, failures=3)
+    writer.write("kept through errors")
+    writer.gate.set()
+
+    deadline = time.monotonic() + 5
+    while writer.failures and time.monotonic() < deadline:
+      time.sleep(0.01)
+    writer.write("after recovery")
+    writer.close()
+
+    self.assertEqual(self.readLines(), ["kept through errors", "after recovery"])
@@ -0,0 +1,120 @@
+import os
+
+from django.test import SimpleTestCase, override_settings
+from .base import MediaRootMixin
+from ..helpers.mediaHelper import parseRange, IMMUTABLE_MAX_AGE
+
+CONTENT = bytes(range(100))
+
+class ParseRangeTests(SimpleTestCase):
+  def test_missing_malformed_and_multiple_ranges_send_the_whole_file(self):
+    for header in (None, "", "bytes=-", "items=0-1", "bytes=0-1,4-5"):
+      self.assertIsNone(parseRange(header, 100), header)
+
+  def test_ranges_are_clamped_to_the_file(self):
+    self.assertEqual(parseRange("bytes=10-19", 100), (10, 10))
+    self.assertEqual(parseRange("bytes=90-", 100), (90, 10))
+    self.assertEqual(parseRange("bytes=90-500", 100), (90, 10))
+    self.assertEqual(parseRange("bytes=-30", 100), (70, 30))
+    self.assertEqual(parseRange("bytes=-500", 100), (0, 100))
+
+  def test_unsatisfiable_ranges_raise(self):
+    for header in ("bytes=100-", "bytes=20-10", "bytes=-0"):
+      with self.assertRaises(ValueError, msg=header):
+        parseRange(header, 100)
+
+@override_settings(MEDIA_OFFLOAD="", MEDIA_CACHE_MAX_AGE=3600)
+class ServeMediaTests(MediaRootMixin, SimpleTestCase):
+  @classmethod
+  def setUpClass(cls):
+    super().setUpClass()
+    os.makedirs(os.path.join(cls.media_root, "photos"))
+    for name in ("photos/plain.bin", "photos/hashed.0123456789ab.jpg"):
+      with open(os.path.join(cls.media_root, name), "wb") as file:
+        file.write(CONTENT)
+
+  def test_whole_file_is_sent_with_validators(self):
+    response = self.client.get("/media/photos/plain.bin")
+
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(b"".join(response.streaming_content), CONTENT)
+    self.assertEqual(response["Content-Length"], "100")
+    self.assertEqual(response["Accept-Ranges"], "bytes")
+    self.assertEqual(response["Cache-Control"], "public, max-age=3600")
+    self.assertTrue(response.has_header("ETag"))
+    self.assertTrue(response.has_header("Last-Modified"))
+
+  def test_hashed_names_are_cached_as_immutable(self):
+    response = self.client.get("/media/photos/hashed.0123456789ab.jpg")
+
+    self.assertEqual(response["Cache-Control"], f"public, max-age={IMMUTABLE_MAX_AGE}, immutable")
+
+  def test_range_is_sent_as_partial_content(self):
+    response = self.client.get("/media/photos/plain.bin", HTTP_RANGE="bytes=10-19")
+
+    self.assertEqual(response.status_code, 206)
+    self.assertEqual(b"".join(response.streaming_content), CONTENT[10:20])
+    self.assertEqual(response["Content-Length"], "10")
+    self.assertEqual(response["Content-Range"], "bytes 10-19/100")
+
+  def test_suffix_range_sends_the_end_of_the_file(self):
+    response = self.client.get("/media/photos/plain.bin", HTTP_RANGE="bytes=-5")
+
+    self.assertEqual(response.status_code, 206)
+    self.assertEqual(b"".join(response.streaming_content), CONTENT[-5:])
+    self.assertEqual(response["Content-Range"], "bytes 95-99/100")
+
+  def test_unsatisfiable_range_is_rejected(self):
+    response = self.client.get("/media/photos/plain.bin", HTTP_RANGE="bytes=200-")
+
+    self.assertEqual(response.status_code, 416)
+    self.assertEqual(response["Content-Range"], "bytes */100")
+
+  def test_outdated_if_range_sends_the_whole_file(self):
+    response = self.client.get("/media/photos/plain.bin", HTTP_RANGE="bytes=10-19", HTTP_IF_RANGE='"outdated"')
+
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(b"".join(response.streaming_content), CONTENT)
+
+    etag = response["ETag"]
+    response = self.client.get("/media/photos/plain.bin", HTTP_RANGE="bytes=10-19", HTTP_IF_RANGE=etag)
+
+    self.assertEqual(response.status_code, 206)
+
+  def test_matching_etag_is_not_modified(self):
+    etag = self.client.get("/media/photos/plain.bin")["ETag"]
+
+    response = self.client.get("/media/photos/plain.bin", HTTP_IF_NONE_MATCH=etag)
+
+    self.assertEqual(response.status_code, 304)
+
+  def test_head_sends_the_length_without_a_body(self):
+    response = self.client.head("/media/photos/plain.bin", HTTP_RANGE="bytes=0-9")
+
+    self.assertEqual(response.status_code, 206)
+    self.assertEqual(response["Content-Length"], "10")
+    self.assertEqual(response.content, b"")
+
+  def test_other_methods_are_not_allowed(self):
+    self.assertEqual(self.client.post("/media/photos/plain.bin").status_code, 405)
+
+  def test_paths_outside_media_root_are_not_found(self):
+    outside = os.path.join(os.path.dirname(self.media_root), "outside.bin")
+    with open(outside, "wb") as file:
+      file.write(CONTENT)
+    self.addCleanup(os.remove, outside)
+
+    for path in ("/media/../outside.bin", "/media/%2e%2e/outside.bin", "/media/photos/..%2f..%2foutside.bin", "/media/" + outside):
+      self.assertEqual(self.client.get(path).status_code, 404, path)
+
+  def test_directories_and_missing_files_are_not_found(self):
+    self.assertEqual(self.client.get("/media/photos").status_code, 404)
+    self.assertEqual(self.client.get("/media/photos/missing.bin").status_code, 404)
+
+  @override_settings(MEDIA_OFFLOAD="x-accel-redirect", MEDIA_ACCEL_REDIRECT_PREFIX="/protected-media/")
+  def test_offload_hands_the_file_to_the_web_server(self):
+    response = self.client.get("/media/photos/plain.bin")
+
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(response["X-Accel-Redirect"], "/protected-media/photos/plain.bin")
+    self.assertEqual(response.content, b"")
@@ -0,0 +1,131 @@
+import io
+import os
+
+from unittest.mock import patch
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from .base import MediaRootMixin
+from ..storages.objectStorage import ObjectStorage, WriteBehindSpool
+
+CONTENT = bytes(range(256)) * 4
+
+class ObjectStorageTests(MediaRootMixin, SimpleTestCase):
+  def setUp(self):
+    self.bucket = os.path.join(self.media_root, self.id().rsplit(".", 1)[-1])
+    self.storage = ObjectStorage(client="local", local_root=self.bucket, multipart_threshold=512, part_size=100, upload_workers=2)
+
+  def test_saved_file_is_read_back(self):
+    name = self.storage.save("photos/small.bin", ContentFile(CONTENT[:100]))
+
+    self.assertTrue(self.storage.exists(name))
+    self.assertEqual(self.storage.size(name), 100)
+    with self.storage.open(name) as file:
+      self.assertEqual(file.read(), CONTENT[:100])
+    self.assertEqual(self.storage.url(name), "/media/photos/small.bin")
+
+    self.storage.delete(name)
+
+    self.assertFalse(self.storage.exists(name))
+    with self.assertRaises(FileNotFoundError):
+      self.storage.open(name)
+
+  def test_large_file_is_uploaded_in_parts(self):
+    with patch.object(self.storage.client, "uploadPart", wraps=self.storage.client.uploadPart) as upload_part:
+      name = self.storage.save("photos/large.bin", ContentFile(CONTENT))
+
+    self.assertEqual(sorted(call.args[2] for call in upload_part.call_args_list), list(range(1, 12)))
+    with self.storage.open(name) as file:
+      self.assertEqual(file.read(), CONTENT)
+    self.assertEqual(os.listdir(self.storage.client.uploads_root), [])
+
+  def test_failed_part_aborts_the_upload(self):
+    upload_part = self.storage.client.uploadPart
+
+    def failingPart(key, upload_id, part_number, body):
+      if part_number == 3:
+        raise OSError("connection reset")
+      return upload_part(key, upload_id, part_number, body)
+
+    with patch.object(self.storage.client, "uploadPart", side_effect=failingPart):
+      with self.assertRaises(OSError):
+        self.storage.save("photos/large.bin", ContentFile(CONTENT))
+
+    self.assertFalse(self.storage.exists("photos/large.bin"))
+    self.assertEqual(os.listdir(self.storage.client.uploads_root), [])
+
+  def test_range_is_read_without_the_rest_of_the_object(self):
+    name = self.storage.save("photos/large.bin", ContentFile(CONTENT))
+
+    with patch.object(self.storage.client, "downloadObject") as download:
+      self.assertEqual(self.storage.openRange(name, 10, 20).read(), CONTENT[10:30])
+      self.assertEqual(self.storage.openRange(name, 0, 0).read(), b"")
+
+    download.assert_not_called()
+
+  def test_media_ranges_are_served_from_the_object_store(self):
+    backend = {"BACKEND": "PhotosStore.storages.objectStorage.ObjectStorage", "OPTIONS": {"client": "local", "local_root": self.bucket}}
+
+    with override_settings(STORAGES={"default": backend}, MEDIA_OFFLOAD=""):
+      name = default_storage.save("photos/large.bin", ContentFile(CONTENT))
+
+      response = self.client.get(f"/media/{name}", HTTP_RANGE="bytes=100-199")
+
+      self.assertEqual(response.status_code, 206)
+      self.assertEqual(b"".join(response.streaming_content), CONTENT[100:200])
+      self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(CONTENT)}")
+      self.assertEqual(self.client.get("/media/photos/missing.bin").status_code, 404)
+
+# The uploader thread is kept from starting, so spooled files stay put until flushed
+@patch.object(WriteBehindSpool, "start")
+class WriteBehindTests(MediaRootMixin, SimpleTestCase):
+  def setUp(self):
+    root = os.path.join(self.media_root, self.id().rsplit(".", 1)[-1])
+    self.options = {
+      "client": "local",
+      "local_root": os.path.join(root, "bucket"),
+      "write_behind": True,
+      "spool_dir": os.path.join(root, "spool"),
+    }
+    self.storage = ObjectStorage(**self.options)
+
+  def test_spooled_file_is_readable_before_it_is_uploaded(self, start):
+    name = self.storage.save("photos/spooled.bin", ContentFile(CONTENT))
+
+    self.assertEqual(self.storage.spool.pending(), [name])
+    with self.assertRaises(FileNotFoundError):
+      self.storage.client.headObject(name)
+    with self.storage.open(name) as file:
+      self.assertEqual(file.read(), CONTENT)
+    self.assertEqual(self.storage.openRange(name, 5, 10).read(), CONTENT[5:15])
+    self.assertEqual(self.storage.size(name), len(CONTENT))
+
+  def test_flush_uploads_and_empties_the_spool(self, start):
+    names = [self.storage.save(f"photos/spooled_{index}.bin", ContentFile(CONTENT)) for index in range(3)]
+
+    self.assertEqual(self.storage.flushSpool(), (3, []))
+
+    self.assertEqual(self.storage.spool.pending(), [])
+    for name in names:
+      self.assertEqual(self.storage.client.headObject(name)["size"], len(CONTENT))
+
+  def test_deleted_spooled_file_is_never_uploaded(self, start):
+    name = self.storage.save("photos/spooled.bin", ContentFile(CONTENT))
+
+    self.storage.delete(name)
+
+    self.assertEqual(self.storage.flushSpool(), (0, []))
+    self.assertFalse(self.storage.exists(name))
+
+  def test_flushmediaspool_uploads_the_spool_of_the_default_storage(self, start):
+    backend = {"BACKEND": "PhotosStore.storages.objectStorage.ObjectStorage", "OPTIONS": self.options}
+
+    with override_settings(STORAGES={"default": backend}):
+      name = default_storage.save("photos/spooled.bin", ContentFile(CONTENT))
+
+      output = io.StringIO()
+      call_command("flushmediaspool", stdout=output)
+
+      self.assertIn("Uploaded 1 file(s)", output.getvalue())
+      self.assertEqual(default_storage.client.headObject(name)["size"], len(CONTENT))
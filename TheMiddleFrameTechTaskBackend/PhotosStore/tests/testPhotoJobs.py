@@ -0,0 +1,108 @@
+from datetime import timedelta
+from unittest.mock import patch
+from PIL import Image
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from django.utils import timezone
+from .base import ApiTestCase, imageBase64
+from ..models.album import Album
+from ..models.photo import Photo
+from ..models.photoJob import PhotoJob
+from ..helpers.photoJobHelper import claimPhotoJobs, processPhotoJob, retryDelay
+
+class PhotoStatusTests(ApiTestCase):
+  def setUp(self):
+    super().setUp()
+    self.owner = self.createUser("owner")
+    self.other = self.createUser("other")
+    self.photo = self.createPhoto(self.owner)
+
+  def test_status_requires_authentication(self):
+    response = self.client.get("/api/photos/status", {"ids": str(self.photo.id)})
+
+    self.assertEqual(response.status_code, 401)
+
+  def test_status_leaves_out_photos_of_other_users(self):
+    response = self.client.get("/api/photos/status", {"ids": str(self.photo.id)}, **self.authHeaders(self.other))
+
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(response.json()["photos"], [])
+
+    response = self.client.get("/api/photos/status", {"ids": str(self.photo.id)}, **self.authHeaders(self.owner))
+
+    self.assertEqual([photo["id"] for photo in response.json()["photos"]], [self.photo.id])
+
+@override_settings(PHOTO_JOBS_MAX_ATTEMPTS=2, PHOTO_JOBS_RETRY_DELAY=10, PHOTO_JOBS_RETRY_MAX_DELAY=30)
+class PhotoJobTests(ApiTestCase):
+  def setUp(self):
+    super().setUp()
+    self.user = self.createUser("uploader")
+
+  def runQueuedJobs(self) -> list:
+    return [processPhotoJob(job_id) for job_id, _ in claimPhotoJobs(10)]
+
+  def brokenPhoto(self) -> Photo:
+    name = default_storage.save("photos/original/broken.jpg", ContentFile(b"not an image"))
+    photo = self.createPhoto(self.user, original_image=name, status=Photo.STATUS_PROCESSING)
+    PhotoJob.objects.create(photo=photo)
+    return photo
+
+  def test_upload_is_processed_by_the_queued_job(self):
+    [photo_id] = self.uploadPhotos(self.user, [imageBase64(width=400, height=300)])
+
+    response = self.client.get("/api/photos/status", {"ids": str(photo_id)}, **self.authHeaders(self.user))
+    self.assertEqual(response.json()["photos"][0]["status"], Photo.STATUS_PROCESSING)
+    self.assertEqual(response.json()["photos"][0]["job"]["status"], PhotoJob.STATUS_PENDING)
+
+    self.assertEqual(self.runQueuedJobs(), [PhotoJob.STATUS_DONE])
+
+    photo = Photo.objects.get(id=photo_id)
+    self.assertEqual(photo.status, Photo.STATUS_READY)
+    self.assertTrue(default_storage.exists(photo.compressed_image.name))
+    self.assertEqual(Album.objects.get(id=photo.album_id).photo_count, 1)
+
+  def test_job_decodes_the_original_once_and_fills_the_summary(self):
+    [photo_id] = self.uploadPhotos(self.user, [imageBase64(width=400, height=300, color=(30, 60, 200))])
+
+    with patch("PhotosStore.helpers.imageHelper.Image.open", wraps=Image.open) as opened:
+      self.assertEqual(self.runQueuedJobs(), [PhotoJob.STATUS_DONE])
+
+    self.assertEqual(opened.call_count, 1)
+    photo = Photo.objects.get(id=photo_id)
+    self.assertEqual((photo.width, photo.height), (400, 300))
+    self.assertTrue(photo.dominant_color.startswith("#"))
+    self.assertTrue(photo.placeholder.startswith("data:image/jpeg;base64,"))
+
+  def test_retry_delay_doubles_up_to_the_cap(self):
+    self.assertEqual([retryDelay(attempts) for attempts in range(1, 5)], [10, 20, 30, 30])
+
+  def test_failed_job_is_retried_after_a_delay_then_fails(self):
+    photo = self.brokenPhoto()
+
+    self.assertEqual(self.runQueuedJobs(), [PhotoJob.STATUS_PENDING])
+
+    job = PhotoJob.objects.get(photo=photo)
+    self.assertEqual(job.attempts, 1)
+    self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=5))
+    # Not claimed again before its delay is over
+    self.assertEqual(claimPhotoJobs(10), [])
+
+    PhotoJob.objects.filter(id=job.id).update(run_after=timezone.now())
+    self.assertEqual(self.runQueuedJobs(), [PhotoJob.STATUS_FAILED])
+
+    photo.refresh_from_db()
+    self.assertEqual(photo.status, Photo.STATUS_FAILED)
+
+    response = self.client.get("/api/photos/status", {"ids": str(photo.id)}, **self.authHeaders(self.user))
+    self.assertEqual(response.json()["photos"][0]["job"]["error"], "The photo could not be processed")
+
+  def test_missing_original_is_awaited_without_using_an_attempt(self):
+    photo = self.createPhoto(self.user, original_image="photos/original/missing.jpg", status=Photo.STATUS_PROCESSING)
+    job = PhotoJob.objects.create(photo=photo)
+
+    self.assertEqual(self.runQueuedJobs(), [PhotoJob.STATUS_PENDING])
+
+    job.refresh_from_db()
+    self.assertEqual(job.attempts, 0)
+    self.assertIsNotNone(job.run_after)
@@ -0,0 +1,76 @@
+from django.db import transaction
+from .base import ApiTestCase
+from ..models.user import User
+from ..helpers.passwordHelper import checkPassword
+from ..helpers.principalCacheHelper import getPrincipal, principal_cache
+
+class PrincipalCacheTests(ApiTestCase):
+  def setUp(self):
+    super().setUp()
+    self.user = self.createUser("member", password="secret")
+
+  def test_principal_is_loaded_once(self):
+    with self.assertNumQueries(1):
+      getPrincipal(self.user.id)
+      principal = getPrincipal(self.user.id)
+
+    self.assertEqual((principal.id, principal.username, principal.role), (self.user.id, "member", "uploader"))
+
+  def test_authenticated_requests_reuse_the_principal(self):
+    headers = self.authHeaders(self.user)
+    self.client.get("/api/photos/status", {"ids": "1"}, **headers)
+
+    with self.assertNumQueries(2):
+      # Only the job and photo lookups of the view itself
+      response = self.client.get("/api/photos/status", {"ids": "1"}, **headers)
+
+    self.assertEqual(response.status_code, 200)
+
+  def test_saving_a_principal_keeps_the_password(self):
+    principal = getPrincipal(self.user.id)
+
+    self.assertIn("password", principal.get_deferred_fields())
+    principal.username = "renamed"
+    principal.save()
+
+    user = User.objects.get(id=self.user.id)
+    self.assertEqual(user.username, "renamed")
+    self.assertTrue(checkPassword("secret", user))
+
+  def test_changes_invalidate_the_principal_once_committed(self):
+    getPrincipal(self.user.id)
+
+    with self.captureOnCommitCallbacks(execute=True):
+      self.user.role = "buyer"
+      self.user.save()
+      # Still cached until the change is committed
+      self.assertIsNotNone(principal_cache.get(self.user.id))
+
+    self.assertIsNone(principal_cache.get(self.user.id))
+    self.assertEqual(getPrincipal(self.user.id).role, "buyer")
+
+  def test_rolled_back_changes_keep_the_principal(self):
+    getPrincipal(self.user.id)
+
+    with self.captureOnCommitCallbacks(execute=True) as callbacks:
+      try:
+        with transaction.atomic():
+          self.user.role = "buyer"
+          self.user.save()
+          raise RuntimeError("rolled back")
+      except RuntimeError:
+        pass
+
+    self.assertEqual(callbacks, [])
+    self.assertIsNotNone(principal_cache.get(self.user.id))
+
+  def test_deleted_user_is_invalidated(self):
+    getPrincipal(self.user.id)
+    user_id = self.user.id
+
+    with self.captureOnCommitCallbacks(execute=True):
+      self.user.delete()
+
+    self.assertIsNone(principal_cache.get(user_id))
+    with self.assertRaises(User.DoesNotExist):
+      getPrincipal(user_id)
@@ -0,0 +1,82 @@
+from .base import ApiTestCase
+from ..models.album import Album
+from ..models.photo import Photo
+
+class SearchTests(ApiTestCase):
+  def setUp(self):
+    super().setUp()
+    self.user = self.createUser("uploader")
+
+  def search(self, **params):
+    response = self.client.get("/api/search/", params)
+    self.assertEqual(response.status_code, 200, response.content)
+    return response.json()
+
+  def test_title_matches_rank_above_description_matches(self):
+    in_title = self.createPhoto(self.user, title="Harbour lighthouse", description="Evening walk")
+    in_description = self.createPhoto(self.user, title="Evening walk", description="Past the lighthouse")
+    self.createPhoto(self.user, title="Forest", description="Trees")
+
+    results = self.search(q="lighthouse")["photos"]
+
+    self.assertEqual([photo["id"] for photo in results], [in_title.id, in_description.id])
+    self.assertGreater(results[0]["rank"], results[1]["rank"])
+
+  def test_older_better_matches_are_not_left_out(self):
+    best = self.createPhoto(self.user, title="Lighthouse lighthouse", description="Lighthouse")
+    for index in range(30):
+      self.createPhoto(self.user, title=f"Photo {index}", description="A lighthouse far away")
+
+    first_page = self.search(q="lighthouse", limit=5)
+
+    self.assertEqual(first_page["photos"][0]["id"], best.id)
+
+  def test_pages_return_every_match_once(self):
+    expected = {self.createPhoto(self.user, title=f"Lighthouse {index}").id for index in range(23)}
+
+    seen = []
+    params = {"q": "lighthouse", "limit": 5}
+    while True:
+      page = self.search(**params)
+      seen += [photo["id"] for photo in page["photos"]]
+      if page["next_cursor"] is None:
+        break
+      params["cursor"] = page["next_cursor"]
+
+    self.assertEqual(len(seen), len(expected))
+    self.assertEqual(set(seen), expected)
+
+  def test_only_ready_photos_are_found(self):
+    ready = self.createPhoto(self.user, title="Lighthouse")
+    self.createPhoto(self.user, title="Lighthouse", status=Photo.STATUS_PROCESSING)
+
+    self.assertEqual([photo["id"] for photo in self.search(q="lighthouse")["photos"]], [ready.id])
+
+  def test_edits_and_deletes_update_the_index(self):
+    photo = self.createPhoto(self.user, title="Lighthouse")
+    photo.title = "Harbour"
+    photo.save()
+
+    self.assertEqual(self.search(q="lighthouse")["photos"], [])
+    self.assertEqual(len(self.search(q="harbour")["photos"]), 1)
+
+    photo.delete()
+    self.assertEqual(self.search(q="harbour")["photos"], [])
+
+  def test_albums_are_searchable(self):
+    album = Album.objects.create(user=self.user, title="Coastal lighthouses", description="")
+
+    results = self.search(q="lighthouse", type="albums")["albums"]
+
+    self.assertEqual([result["id"] for result in results], [album.id])
+
+  def test_query_syntax_in_user_input_is_searched_as_words(self):
+    self.createPhoto(self.user, title="Lighthouse")
+
+    self.search(q='"lighthouse" OR -x* NEAR(')
+    self.assertEqual(len(self.search(q='lighthouse*')["photos"]), 1)
+
+  def test_invalid_searches_are_rejected(self):
+    for params in ({}, {"q": "   "}, {"q": "x" * 201}, {"q": "lighthouse", "type": "users"}, {"q": "lighthouse", "cursor": "bad"}):
+      response = self.client.get("/api/search/", params)
+      self.assertEqual(response.status_code, 400, params)
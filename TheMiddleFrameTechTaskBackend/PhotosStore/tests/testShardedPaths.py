@@ -0,0 +1,70 @@
+import io
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from .base import ApiTestCase, imageBase64, imageBytes
+from ..models.photo import Photo
+from ..models.imageBlob import ImageBlob
+from ..models.fileTombstone import FileTombstone
+from ..storages.shardedPaths import ShardedUploadTo, shardedName, isShardedName
+
+class ShardedNameTests(SimpleTestCase):
+  def test_names_fan_out_over_two_levels(self):
+    name = shardedName("photos/original/", ".JPG")
+    prefix, first, second, file_name = name.rsplit("/", 3)
+
+    self.assertEqual(prefix, "photos/original")
+    self.assertEqual(file_name[:4], first + second)
+    self.assertRegex(file_name, r"^[0-9a-f]{32}\.jpg$")
+    self.assertTrue(isShardedName(name))
+
+  def test_names_are_unique_and_keep_only_the_extension(self):
+    upload_to = ShardedUploadTo("photos/derivatives/")
+    names = {upload_to(None, "../holiday.webp") for _ in range(100)}
+
+    self.assertEqual(len(names), 100)
+    self.assertTrue(all(name.startswith("photos/derivatives/") and name.endswith(".webp") for name in names))
+    self.assertFalse(any("holiday" in name for name in names))
+
+  def test_flat_and_digest_suffixed_names(self):
+    self.assertFalse(isShardedName("photos/original/holiday.jpg"))
+    self.assertTrue(isShardedName("photos/original/3f/a2/3fa2" + "0" * 28 + ".0123456789ab.jpg"))
+
+class ShardMediaTests(ApiTestCase):
+  def setUp(self):
+    super().setUp()
+    self.user = self.createUser("uploader")
+
+  def test_uploads_are_stored_sharded(self):
+    [photo_id] = self.uploadPhotos(self.user, [imageBase64()])
+
+    photo = Photo.objects.get(id=photo_id)
+    self.assertTrue(isShardedName(photo.original_image.name))
+    self.assertTrue(default_storage.exists(photo.original_image.name))
+
+  def test_flat_files_are_moved_with_every_reference(self):
+    flat_name = default_storage.save("photos/original/flat.jpg", ContentFile(imageBytes()))
+    blob = ImageBlob.objects.create(sha256="0" * 64, size=default_storage.size(flat_name), ref_count=2, file=flat_name)
+    photos = [self.createPhoto(self.user, original_image=flat_name, blob=blob) for _ in range(2)]
+
+    call_command("shardmedia", "--dry-run", stdout=io.StringIO())
+    self.assertEqual(ImageBlob.objects.get(id=blob.id).file.name, flat_name)
+
+    with self.captureOnCommitCallbacks(execute=True):
+      call_command("shardmedia", "--batch-size", "1", stdout=io.StringIO())
+
+    new_name = ImageBlob.objects.get(id=blob.id).file.name
+    self.assertTrue(isShardedName(new_name))
+    self.assertEqual({Photo.objects.get(id=photo.id).original_image.name for photo in photos}, {new_name})
+    with default_storage.open(new_name, "rb") as moved:
+      self.assertEqual(moved.read(), imageBytes())
+
+    # The old file is left to collectmediagarbage
+    self.assertTrue(default_storage.exists(flat_name))
+    self.assertTrue(FileTombstone.objects.filter(name=flat_name).exists())
+
+    # Sharded names are skipped when run again
+    call_command("shardmedia", stdout=io.StringIO())
+    self.assertEqual(ImageBlob.objects.get(id=blob.id).file.name, new_name)
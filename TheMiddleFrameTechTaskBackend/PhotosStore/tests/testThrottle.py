@@ -0,0 +1,86 @@
+from unittest.mock import patch
+from django.test import override_settings
+from .base import ApiTestCase
+from ..models.user import User
+from ..helpers.throttleHelper import TokenBucketLimiter
+
+AUTH_THROTTLE = {
+  "IP_RATE": 0.01,
+  "IP_BURST": 2,
+  "ACCOUNT_RATE": 0.01,
+  "ACCOUNT_BURST": 2,
+  "MAX_ENTRIES": 1000,
+  "SHARED_CACHE": None,
+  "TRUST_X_FORWARDED_FOR": False,
+}
+
+@override_settings(AUTH_THROTTLE=AUTH_THROTTLE)
+class ThrottleTests(ApiTestCase):
+  def register(self, username: str, remote_addr: str, **headers):
+    return self.postJson("/api/auth/register", {
+      "username": username,
+      "email": f"{username}@example.com",
+      "password": "password",
+      "role": "buyer"
+    }, REMOTE_ADDR=remote_addr, **headers)
+
+  def test_register_is_throttled_per_ip(self):
+    self.assertEqual(self.register("first", "10.0.0.1").status_code, 201)
+    self.assertEqual(self.register("second", "10.0.0.1").status_code, 201)
+
+    response = self.register("third", "10.0.0.1")
+
+    self.assertEqual(response.status_code, 429)
+    self.assertGreaterEqual(int(response["Retry-After"]), 1)
+    self.assertFalse(User.objects.filter(username="third").exists())
+
+    self.assertEqual(self.register("third", "10.0.0.2").status_code, 201)
+
+  def test_login_is_throttled_per_account_across_ips(self):
+    self.createUser("member")
+    body = {"email": "member@example.com", "password": "wrong"}
+
+    self.assertEqual(self.postJson("/api/auth/login", body, REMOTE_ADDR="10.0.1.1").status_code, 401)
+    self.assertEqual(self.postJson("/api/auth/login", body, REMOTE_ADDR="10.0.1.2").status_code, 401)
+
+    response = self.postJson("/api/auth/login", dict(body, password="password"), REMOTE_ADDR="10.0.1.3")
+
+    self.assertEqual(response.status_code, 429)
+    self.assertGreaterEqual(int(response["Retry-After"]), 1)
+
+  def test_forwarded_for_is_ignored_unless_trusted(self):
+    self.assertEqual(self.register("first", "10.0.0.1", HTTP_X_FORWARDED_FOR="192.0.2.1").status_code, 201)
+    self.assertEqual(self.register("second", "10.0.0.1", HTTP_X_FORWARDED_FOR="192.0.2.2").status_code, 201)
+    self.assertEqual(self.register("third", "10.0.0.1", HTTP_X_FORWARDED_FOR="192.0.2.3").status_code, 429)
+
+    with self.settings(AUTH_THROTTLE=dict(AUTH_THROTTLE, TRUST_X_FORWARDED_FOR=True)):
+      # The closest proxy appended the client's address last
+      self.assertEqual(self.register("third", "10.0.0.1", HTTP_X_FORWARDED_FOR="203.0.113.9, 192.0.2.3").status_code, 201)
+
+  @override_settings(AUTH_THROTTLE=dict(AUTH_THROTTLE, SHARED_CACHE="default"))
+  def test_shared_buckets_limit_every_process(self):
+    self.assertEqual(self.register("first", "10.0.0.1").status_code, 201)
+
+    # Another process has its own in-memory buckets but the same shared cache
+    with patch("PhotosStore.helpers.throttleHelper.ip_limiter", TokenBucketLimiter("ip")):
+      self.assertEqual(self.register("second", "10.0.0.1").status_code, 201)
+      self.assertEqual(self.register("third", "10.0.0.1").status_code, 429)
+
+@override_settings(AUTH_THROTTLE=AUTH_THROTTLE)
+class TokenBucketTests(ApiTestCase):
+  def test_bucket_refills_at_its_rate(self):
+    limiter = TokenBucketLimiter("test")
+
+    with patch("PhotosStore.helpers.throttleHelper.time.time", return_value=1000.0):
+      self.assertEqual(limiter.take("client", 60, 2), 0)
+      self.assertEqual(limiter.take("client", 60, 2), 0)
+      self.assertAlmostEqual(limiter.take("client", 60, 2), 1.0)
+
+    with patch("PhotosStore.helpers.throttleHelper.time.time", return_value=1001.0):
+      self.assertEqual(limiter.take("client", 60, 2), 0)
+      self.assertGreater(limiter.take("client", 60, 2), 0)
+
+  def test_zero_rate_disables_the_limit(self):
+    limiter = TokenBucketLimiter("test")
+
+    self.assertEqual([limiter.take("client", 0, 2) for _ in range(5)], [0] * 5)
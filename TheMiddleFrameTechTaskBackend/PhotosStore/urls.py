@@ -1,5 +1,6 @@
+from django.conf import settings
 from django.urls import path
-from .controllers import authController, photosController, albumsController
+from .controllers import authController, photosController, albumsController, searchController
 
 urlpatterns = [
   ##############
@@ -7,7 +8,7 @@ urlpatterns = [
   ##############
   path(
     'auth/login',
-    authController.login,
+    authController.loginAsync if settings.ASYNC_VIEWS else authController.login,
     name='login'
   ),
   path(
@@ -21,7 +22,7 @@ urlpatterns = [
   ##############
   path(
     'photos/',
-    photosController.getPhotos,
+    photosController.getPhotosAsync if settings.ASYNC_VIEWS else photosController.getPhotos,
     name='get_photos'
   ),
   path(
@@ -29,6 +30,21 @@ urlpatterns = [
     photosController.uploadPhotos,
     name='upload_photos'
   ),
+  path(
+    'photos/upload/raw',
+    photosController.uploadPhotoRaw,
+    name='upload_photo_raw'
+  ),
+  path(
+    'photos/status',
+    photosController.getPhotosStatus,
+    name='get_photos_status'
+  ),
+  path(
+    'photos/delete',
+    photosController.bulkDeletePhotos,
+    name='bulk_delete_photos'
+  ),
   path(
     'photos/delete/<int:photo_id>',
     photosController.deletePhoto,
@@ -38,9 +54,23 @@ urlpatterns = [
   ##############
   # Albums
   ##############
+  path(
+    'albums/',
+    albumsController.getAlbums,
+    name='get_albums'
+  ),
   path(
     'albums/<int:album_id>',
-    albumsController.getAlbumDetails,
+    albumsController.getAlbumDetailsAsync if settings.ASYNC_VIEWS else albumsController.getAlbumDetails,
     name='get_album_details'
   ),
-]
\ No newline at end of file
+
+  ##############
+  # Search
+  ##############
+  path(
+    'search/',
+    searchController.search,
+    name='search'
+  ),
+]
@@ -13,4 +13,11 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'TheMiddleFrameTechTask.settings')
 
+# Serve the feed, album details and login with their native async views
+os.environ.setdefault('DJANGO_ASYNC_VIEWS', 'true')
+
+# Async views query from executor threads, which must not keep persistent
+# connections of their own; hand connections back to a pool instead
+os.environ.setdefault('DATABASE_CONNECTIONS', 'pool')
+
 application = get_asgi_application()
@@ -1,5 +1,3 @@
-import psycopg2
-
 """
 Django settings for TheMiddleFrameTechTask project.
 
@@ -12,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
+
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -24,6 +24,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = 'django-insecure-+pkb)$-%+%p(1!^29kywwpp12e5o!+f4#e#zty$w8iaq(%5@d1'
 
+# Signing secret of the JWTs issued by login and register
+SECRET = os.getenv("SECRET")
+
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
@@ -79,16 +82,61 @@ WSGI_APPLICATION = 'TheMiddleFrameTechTask.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'themiddleframe',
-        'USER': 'root',
-        'PASSWORD': 'root',
-        'HOST': 'localhost',
-        'PORT': '5432'
+#
+# DATABASE_ENGINE=sqlite switches to a local SQLite file, which is enough for
+# local testing without PostgreSQL. DATABASE_CONNECTIONS controls how
+# connections are reused:
+#   "per-request": a new connection for every request (Django's default)
+#   "persistent":  each worker thread keeps its connection for
+#                  DATABASE_CONN_MAX_AGE seconds and checks that it is still
+#                  alive before reusing it
+#   "pool":        a bounded psycopg 3 pool per process; requests wait up to
+#                  DATABASE_POOL_TIMEOUT seconds for a free connection
+#                  (PostgreSQL only, SQLite falls back to "per-request")
+# "persistent" is the default under WSGI. Under ASGI the async views run
+# their queries on executor threads that Django's per-request cleanup never
+# visits, so a connection kept by such a thread outlives its request
+# unchecked; asgi.py therefore defaults DATABASE_CONNECTIONS to "pool", where
+# every connection is returned at the end of the request.
+# `python manage.py benchmarkdbconnections` compares the modes.
+
+DATABASE_ENGINE = os.getenv("DATABASE_ENGINE", "postgresql")
+DATABASE_CONNECTIONS = os.getenv("DATABASE_CONNECTIONS", "persistent")
+
+if DATABASE_ENGINE == "sqlite":
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv("DATABASE_NAME", str(BASE_DIR / 'db.sqlite3')),
+        }
     }
-}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv("DATABASE_NAME", 'themiddleframe'),
+            'USER': os.getenv("DATABASE_USER", 'root'),
+            'PASSWORD': os.getenv("DATABASE_PASSWORD", 'root'),
+            'HOST': os.getenv("DATABASE_HOST", 'localhost'),
+            'PORT': os.getenv("DATABASE_PORT", '5432'),
+        }
+    }
+
+if DATABASE_CONNECTIONS == "pool" and DATABASE_ENGINE != "sqlite":
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.getenv("DATABASE_POOL_MIN_SIZE", "2")),
+            'max_size': int(os.getenv("DATABASE_POOL_MAX_SIZE", "10")),
+            'timeout': float(os.getenv("DATABASE_POOL_TIMEOUT", "10")),
+        }
+    }
+elif DATABASE_CONNECTIONS == "persistent":
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv("DATABASE_CONN_MAX_AGE", "600"))
+
+# Persistent and pooled connections are checked before they are reused
+DATABASES['default']['CONN_HEALTH_CHECKS'] = DATABASE_CONNECTIONS == "persistent" or (
+    DATABASE_CONNECTIONS == "pool" and DATABASE_ENGINE != "sqlite"
+)
 
 
 # Password validation
@@ -132,5 +180,190 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Media storage
+# MEDIA_STORAGE=filesystem keeps media in MEDIA_ROOT, which every API node must
+# share. MEDIA_STORAGE=s3 keeps it in an S3-compatible bucket (needs boto3), so
+# nodes are stateless; local-s3 is an in-process stand-in storing objects under
+# MEDIA_STORAGE_LOCAL_ROOT, for development and tests. Files from
+# MULTIPART_THRESHOLD bytes up are uploaded in PART_SIZE parts, UPLOAD_WORKERS
+# at a time. With WRITE_BEHIND, an upload is acknowledged once fsynced to
+# SPOOL_DIR (a local disk) and sent to the bucket in the background; run
+# "manage.py flushmediaspool" before retiring a node to upload what is left.
+# PUBLIC_URL serves media from the bucket or a CDN instead of through Django.
+MEDIA_STORAGE = os.getenv("MEDIA_STORAGE", "filesystem").lower()
+OBJECT_STORAGE = {
+    "client": "local" if MEDIA_STORAGE == "local-s3" else "s3",
+    "bucket": os.getenv("MEDIA_STORAGE_BUCKET", ""),
+    "endpoint_url": os.getenv("MEDIA_STORAGE_ENDPOINT_URL", ""),
+    "region": os.getenv("MEDIA_STORAGE_REGION", ""),
+    "access_key": os.getenv("MEDIA_STORAGE_ACCESS_KEY", ""),
+    "secret_key": os.getenv("MEDIA_STORAGE_SECRET_KEY", ""),
+    "local_root": os.getenv("MEDIA_STORAGE_LOCAL_ROOT", str(BASE_DIR / "object-store")),
+    "public_url": os.getenv("MEDIA_STORAGE_PUBLIC_URL", ""),
+    "multipart_threshold": int(os.getenv("MEDIA_STORAGE_MULTIPART_THRESHOLD", str(16 * 1024 * 1024))),
+    "part_size": int(os.getenv("MEDIA_STORAGE_PART_SIZE", str(8 * 1024 * 1024))),
+    "upload_workers": int(os.getenv("MEDIA_STORAGE_UPLOAD_WORKERS", "4")),
+    "write_behind": os.getenv("MEDIA_STORAGE_WRITE_BEHIND", "false").lower() == "true",
+    "spool_dir": os.getenv("MEDIA_STORAGE_SPOOL_DIR", str(BASE_DIR / "media-spool")),
+}
+
+# Uploaded files are stored under names that embed a digest of their content,
+# so a media URL never changes content and can be cached as immutable.
+STORAGES = {
+    "default": {
+        "BACKEND": "PhotosStore.storages.objectStorage.HashedObjectStorage",
+        "OPTIONS": OBJECT_STORAGE,
+    } if MEDIA_STORAGE in ("s3", "local-s3") else {
+        "BACKEND": "PhotosStore.storages.hashedStorage.HashedFileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
+# Media serving
+# Best is a web server serving MEDIA_ROOT at MEDIA_URL itself (SERVE_MEDIA=false).
+# Otherwise Django routes MEDIA_URL and either hands the file back to the web
+# server (MEDIA_OFFLOAD=x-accel-redirect for nginx, with an internal location at
+# MEDIA_ACCEL_REDIRECT_PREFIX aliased to MEDIA_ROOT; x-sendfile for Apache or
+# lighttpd) or streams it itself, with range support and sendfile when the WSGI
+# server offers it. Hashed names are cached for a year as immutable, older
+# names for MEDIA_CACHE_MAX_AGE seconds.
+SERVE_MEDIA = os.getenv("SERVE_MEDIA", "true").lower() == "true"
+MEDIA_OFFLOAD = os.getenv("MEDIA_OFFLOAD", "").lower()
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv("MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+MEDIA_CACHE_MAX_AGE = int(os.getenv("MEDIA_CACHE_MAX_AGE", "3600"))
+
 # CORS Settings
-CORS_ALLOW_ALL_ORIGINS = True
\ No newline at end of file
+CORS_ALLOW_ALL_ORIGINS = True
+
+# Async views
+# The photo feed, album details and login have native async versions, routed
+# when ASYNC_VIEWS is true. asgi.py turns it on, so an ASGI server (see the
+# README) gets them; under WSGI the sync views are kept, since async streamed
+# responses would be buffered there.
+ASYNC_VIEWS = os.getenv("DJANGO_ASYNC_VIEWS", "false").lower() == "true"
+
+# Photo processing jobs
+# Uploads store the original and queue a job; `python manage.py processphotojobs`
+# compresses and watermarks them. Set PHOTO_JOBS_INLINE=true to process in the
+# request instead (handy for local development without a worker running).
+PHOTO_JOBS_INLINE = os.getenv("PHOTO_JOBS_INLINE", "false").lower() == "true"
+PHOTO_JOBS_WORKERS = int(os.getenv("PHOTO_JOBS_WORKERS", "2"))
+PHOTO_JOBS_MAX_ATTEMPTS = int(os.getenv("PHOTO_JOBS_MAX_ATTEMPTS", "3"))
+PHOTO_JOBS_STALE_SECONDS = int(os.getenv("PHOTO_JOBS_STALE_SECONDS", "600"))
+
+# A failed attempt is retried after RETRY_DELAY seconds, doubled after each
+# further failure up to RETRY_MAX_DELAY, so transient errors (e.g. storage or
+# database hiccups) have time to clear before the attempts run out.
+PHOTO_JOBS_RETRY_DELAY = int(os.getenv("PHOTO_JOBS_RETRY_DELAY", "30"))
+PHOTO_JOBS_RETRY_MAX_DELAY = int(os.getenv("PHOTO_JOBS_RETRY_MAX_DELAY", "3600"))
+
+# An original not in storage yet (still in the write-behind spool of the node
+# that took the upload) is looked for again every MISSING_ORIGINAL_DELAY
+# seconds without using up an attempt, until the job is MISSING_ORIGINAL_TIMEOUT
+# seconds old; after that it counts as an ordinary failure.
+PHOTO_JOBS_MISSING_ORIGINAL_DELAY = int(os.getenv("PHOTO_JOBS_MISSING_ORIGINAL_DELAY", "5"))
+PHOTO_JOBS_MISSING_ORIGINAL_TIMEOUT = int(os.getenv("PHOTO_JOBS_MISSING_ORIGINAL_TIMEOUT", "3600"))
+
+# Media garbage collection
+# Deleting photos or albums only records their files as tombstones;
+# `python manage.py collectmediagarbage` removes the ones no row references
+# any more. Tombstones younger than FILE_TOMBSTONE_GRACE_SECONDS are kept, so
+# a file reused by an upload that is still committing is never removed.
+FILE_TOMBSTONE_GRACE_SECONDS = int(os.getenv("FILE_TOMBSTONE_GRACE_SECONDS", "600"))
+
+# Derivatives rendered for every photo (name -> maximum width), each encoded in
+# every listed format this Pillow build supports. The widest JPEG is also used
+# as the photo's compressed image.
+PHOTO_DERIVATIVE_WIDTHS = {
+    "thumbnail": 320,
+    "medium": 800,
+    "large": 1200,
+}
+PHOTO_DERIVATIVE_FORMATS = ["jpeg", "webp", "avif"]
+
+# Largest single photo accepted by the raw (PUT image/*) upload endpoint
+PHOTO_UPLOAD_MAX_BYTES = int(os.getenv("PHOTO_UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# Threads used to decode and hash the photos of one upload batch (and to run
+# their jobs when PHOTO_JOBS_INLINE is set)
+PHOTO_UPLOAD_WORKERS = int(os.getenv("PHOTO_UPLOAD_WORKERS", "4"))
+
+# Image decoding limits
+# Images above MAX_PIXELS are rejected at upload, from their header. Every
+# process decoding images (API with PHOTO_JOBS_INLINE, the processphotojobs
+# worker pool as a whole) keeps the estimated memory of decodes in flight under
+# MEMORY_BUDGET bytes: inline uploads wait up to WAIT_SECONDS for room, then get
+# 503 with Retry-After RETRY_AFTER; the worker leaves jobs queued until room frees.
+IMAGE_DECODE = {
+    "MAX_PIXELS": int(os.getenv("IMAGE_DECODE_MAX_PIXELS", "100000000")),
+    "MEMORY_BUDGET": int(os.getenv("IMAGE_DECODE_MEMORY_BUDGET", str(1024 * 1024 * 1024))),
+    "WAIT_SECONDS": float(os.getenv("IMAGE_DECODE_WAIT_SECONDS", "10")),
+    "RETRY_AFTER": int(os.getenv("IMAGE_DECODE_RETRY_AFTER", "5")),
+}
+
+# Request/response logging (PhotosStore.middlewares.loggerMiddleware)
+# Lines are written by a background thread in batches and files rotate at
+# MAX_FILE_BYTES. Bodies are only logged for BODY_CONTENT_TYPES, for a
+# BODY_SAMPLE_RATE fraction of requests, and cut at MAX_BODY_BYTES.
+REQUEST_LOGGING = {
+    "DIR": os.getenv("REQUEST_LOGGING_DIR", "PhotosStore/logs"),
+    "MAX_FILE_BYTES": int(os.getenv("REQUEST_LOGGING_MAX_FILE_BYTES", str(10 * 1024 * 1024))),
+    "BACKUP_COUNT": int(os.getenv("REQUEST_LOGGING_BACKUP_COUNT", "5")),
+    "BATCH_SIZE": 200,
+    "QUEUE_SIZE": 10000,
+    "MAX_BODY_BYTES": int(os.getenv("REQUEST_LOGGING_MAX_BODY_BYTES", "2048")),
+    "BODY_SAMPLE_RATE": float(os.getenv("REQUEST_LOGGING_BODY_SAMPLE_RATE", "1.0")),
+    "BODY_CONTENT_TYPES": ["application/json", "application/x-www-form-urlencoded", "text/"],
+}
+
+# Authenticated principal caching (PhotosStore.middlewares.authMiddleware)
+# Decoded tokens and users are kept in a per-process LRU for TTL seconds and
+# invalidated when a user is saved or deleted. Set SHARED_CACHE to the alias of
+# a CACHES entry (e.g. Redis) to also share principals across processes.
+AUTH_PRINCIPAL_CACHE = {
+    "TTL": int(os.getenv("AUTH_PRINCIPAL_CACHE_TTL", "300")),
+    "MAX_ENTRIES": int(os.getenv("AUTH_PRINCIPAL_CACHE_MAX_ENTRIES", "10000")),
+    "SHARED_CACHE": os.getenv("AUTH_PRINCIPAL_SHARED_CACHE") or None,
+}
+
+# Password hashing (login and register)
+# Hashes are computed on a dedicated pool of WORKERS threads (hashlib releases
+# the GIL), so sign-ins use at most that many cores whatever the load. Up to
+# QUEUE more wait for a thread; beyond that requests get 503 with Retry-After
+# instead of tying up the workers serving everything else. Stored hashes are
+# upgraded on login when the hasher or its parameters change.
+PASSWORD_HASHING = {
+    "WORKERS": int(os.getenv("PASSWORD_HASHING_WORKERS", "2")),
+    "QUEUE": int(os.getenv("PASSWORD_HASHING_QUEUE", "16")),
+    "RETRY_AFTER": int(os.getenv("PASSWORD_HASHING_RETRY_AFTER", "1")),
+}
+
+# Login and register throttling
+# Token buckets per client IP (login and register) and per account (login):
+# each holds up to BURST attempts and refills at RATE per minute; an empty
+# bucket answers 429 with Retry-After. A RATE of 0 disables that limit.
+# Buckets are per process unless SHARED_CACHE names a CACHES entry (e.g.
+# Redis); shared buckets are approximated by sliding-window counters updated
+# only with the cache's atomic incr, so processes never race. Enable TRUST_X_FORWARDED_FOR only behind a reverse proxy that sets it.
+AUTH_THROTTLE = {
+    "IP_RATE": float(os.getenv("AUTH_THROTTLE_IP_RATE", "30")),
+    "IP_BURST": int(os.getenv("AUTH_THROTTLE_IP_BURST", "20")),
+    "ACCOUNT_RATE": float(os.getenv("AUTH_THROTTLE_ACCOUNT_RATE", "5")),
+    "ACCOUNT_BURST": int(os.getenv("AUTH_THROTTLE_ACCOUNT_BURST", "10")),
+    "MAX_ENTRIES": int(os.getenv("AUTH_THROTTLE_MAX_ENTRIES", "100000")),
+    "SHARED_CACHE": os.getenv("AUTH_THROTTLE_SHARED_CACHE") or None,
+    "TRUST_X_FORWARDED_FOR": os.getenv("AUTH_THROTTLE_TRUST_X_FORWARDED_FOR", "false").lower() == "true",
+}
+
+# Response caching of the public photo feed and album details
+# Entries are keyed by content versions bumped on every write, so they never
+# need to be deleted; TIMEOUT only bounds memory use. CACHE is a CACHES alias.
+# The feed version is spread over FEED_VERSION_STRIPES rows so concurrent
+# writers rarely wait on each other; it may be raised but never lowered.
+RESPONSE_CACHE = {
+    "CACHE": os.getenv("RESPONSE_CACHE_ALIAS", "default"),
+    "TIMEOUT": int(os.getenv("RESPONSE_CACHE_TIMEOUT", "300")),
+    "FEED_VERSION_STRIPES": int(os.getenv("RESPONSE_CACHE_FEED_VERSION_STRIPES", "16")),
+}
@@ -2,34 +2,48 @@ import { useState, useEffect } from 'react';
 import { apiInstance, SERVER_URL } from '../utils/api';
 import PhotoCard from './PhotoCard';
 
+const PAGE_SIZE = 60;
+
 export default function AlbumPhotosModal({ album, onClose, onViewDetails }) {
   const [photos, setPhotos] = useState([]);
   const [albumDetails, setAlbumDetails] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
 
-  const getAlbumDetails = async (albumId) => {
+  const getAlbumDetails = async (albumId, cursor) => {
     try {
-      const response = await apiInstance.get(`albums/${albumId}`);
+      const params = { limit: PAGE_SIZE };
+      if (cursor) {
+        params.cursor = cursor;
+      }
+      const response = await apiInstance.get(`albums/${albumId}`, { params });
       return response.data;
     } catch (error) {
       return { success: false, error: 'Failed to fetch collection details' };
     }
   };
 
+  // Pages carry the album (and uploader) once; each photo gets them back here
+  const formatPhotos = (res) => res.photos.map(p => ({
+    ...p,
+    uploader: res.album.uploader,
+    album: { id: res.album.id, title: res.album.title },
+    captureDate: p.capture_date,
+    dominantColor: p.dominant_color,
+    url: p.image?.startsWith('http') ? p.image : `${SERVER_URL}${p.image}`,
+    watermarkedUrl: p.image?.startsWith('http') ? p.image : `${SERVER_URL}${p.image}`,
+    hqUrl: p.original_image?.startsWith('http') ? p.original_image : `${SERVER_URL}${p.original_image}`
+  }));
+
   const fetchAlbumPhotos = async () => {
     setIsLoading(true);
     try {
       const res = await getAlbumDetails(album.id);
       if (res.success && Array.isArray(res.photos)) {
         setAlbumDetails(res.album);
-        const formatted = res.photos.map(p => ({
-          ...p,
-          captureDate: p.capture_date,
-          url: p.image?.startsWith('http') ? p.image : `${SERVER_URL}${p.image}`,
-          watermarkedUrl: p.image?.startsWith('http') ? p.image : `${SERVER_URL}${p.image}`,
-          hqUrl: p.original_image?.startsWith('http') ? p.original_image : `${SERVER_URL}${p.original_image}`
-        }));
-        setPhotos(formatted);
+        setPhotos(formatPhotos(res));
+        setNextCursor(res.next_cursor);
       }
     } catch (err) {
       console.error("Failed to fetch album photos", err);
@@ -37,6 +51,20 @@ export default function AlbumPhotosModal({ album, onClose, onViewDetails }) {
     setIsLoading(false);
   };
 
+  const fetchMorePhotos = async () => {
+    setIsLoadingMore(true);
+    try {
+      const res = await getAlbumDetails(album.id, nextCursor);
+      if (res.success && Array.isArray(res.photos)) {
+        setPhotos(current => [...current, ...formatPhotos(res)]);
+        setNextCursor(res.next_cursor);
+      }
+    } catch (err) {
+      console.error("Failed to fetch more album photos", err);
+    }
+    setIsLoadingMore(false);
+  };
+
   useEffect(() => {
     if (album) {
       fetchAlbumPhotos();
@@ -63,7 +91,7 @@ export default function AlbumPhotosModal({ album, onClose, onViewDetails }) {
             </h2>
             <div className="flex items-center space-x-4 mt-4">
               <p className="text-slate-400 text-sm font-bold tracking-widest uppercase">
-                {photos.length} Professional Assets
+                {photos.length}{nextCursor ? '+' : ''} Professional Assets
               </p>
               <span className="w-1 h-1 rounded-full bg-slate-200"></span>
               <p className="text-slate-400 text-sm font-bold tracking-widest uppercase italic">
@@ -105,6 +133,17 @@ export default function AlbumPhotosModal({ album, onClose, onViewDetails }) {
                   aspectRatio="aspect-square"
                 />
               ))}
+              {nextCursor && (
+                <div className="col-span-full flex justify-center">
+                  <button
+                    onClick={fetchMorePhotos}
+                    disabled={isLoadingMore}
+                    className="px-8 py-4 bg-white border border-slate-100 rounded-2xl text-[11px] font-black text-indigo-600 uppercase tracking-widest shadow-sm hover:shadow-lg hover:bg-indigo-50 transition-all disabled:opacity-50"
+                  >
+                    {isLoadingMore ? 'Loading...' : 'Load More'}
+                  </button>
+                </div>
+              )}
             </div>
           )}
         </div>
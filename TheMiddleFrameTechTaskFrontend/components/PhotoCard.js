@@ -1,12 +1,21 @@
 export default function PhotoCard({ photo, onViewDetails, onAlbumClick, aspectRatio = 'aspect-[3/2]' }) {
-  const { title, captureDate, url, uploader, album } = photo;
+  const { title, captureDate, url, uploader, album, dominantColor, placeholder } = photo;
 
   return (
     <div className="group flex flex-col bg-white rounded-xl overflow-hidden transition-all hover:shadow-2xl hover:shadow-slate-200/60 border border-slate-100">
-      <div className={`relative ${aspectRatio} overflow-hidden bg-slate-100`}>
+      {/* The dominant color and blurred placeholder show until the image has loaded */}
+      <div
+        className={`relative ${aspectRatio} overflow-hidden bg-slate-100 bg-cover bg-center`}
+        style={{
+          backgroundColor: dominantColor || undefined,
+          backgroundImage: placeholder ? `url(${placeholder})` : undefined
+        }}
+      >
         <img
           src={url}
           alt={title}
+          loading="lazy"
+          decoding="async"
           className="w-full h-full object-cover transition-transform duration-500 group-hover:scale-105"
         />
         <div
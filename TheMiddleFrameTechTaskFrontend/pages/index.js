@@ -44,7 +44,9 @@ export default function Home() {
         watermarkedUrl: photo.image?.startsWith('http') ? photo.image : `${SERVER_URL}${photo.image}`,
         hqUrl: photo.original_image?.startsWith('http') ? photo.original_image : `${SERVER_URL}${photo.original_image}`,
         uploader: photo.user?.username || 'Unknown',
-        album: photo.album
+        album: photo.album,
+        dominantColor: photo.dominant_color,
+        placeholder: photo.placeholder
       }));
       setPhotos(formatted);
     }